@@ -0,0 +1,169 @@
+import re
+import json
+import time
+import sqlite3
+import threading
+from text_core.tardio import ModuloTardio
+
+requests = ModuloTardio("requests")
+
+# Cache HTTP persistente para os backends do BUSCADOR
+#
+# As respostas ficam numa tabela SQLite, com chave (backend, título
+# normalizado). Dentro do TTL a resposta volta direto do disco. Depois do
+# TTL, se o servidor mandou ETag ou Last-Modified, a requisição vai
+# condicional (If-None-Match / If-Modified-Since): um 304 só renova a
+# validade, sem baixar o corpo de novo. Respostas 404 também são guardadas
+# (cache negativo, com TTL mais curto), para não consultar de novo títulos
+# que não existem. Se o servidor falhar e houver uma cópia vencida, ela é
+# usada. O tamanho é limitado com despejo LRU.
+
+ESPACOS = re.compile(r'\s+')
+MAX_AGE = re.compile(r'(?<![\w-])max-age=(\d+)', re.IGNORECASE)
+
+
+# Função para normalizar títulos como a Wikipedia: espaços viram "_" e a primeira letra é maiúscula
+def normalizar_titulo(titulo):
+    titulo = ESPACOS.sub('_', titulo.strip())
+    return titulo[:1].upper() + titulo[1:]
+
+
+class CacheRespostas:
+    def __init__(self, caminho=":memory:", max_entradas=50_000):
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        # Compartilhado entre as threads do buscador; o lock serializa o uso
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                dados TEXT,
+                cabecalhos TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expira_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+        """)
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_respostas_acesso ON respostas (ultimo_acesso)")
+        self._conexao.commit()
+
+    def obter(self, chave):
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT status, dados, cabecalhos, etag, last_modified, expira_em FROM respostas WHERE chave = ?",
+                (chave,)).fetchone()
+            if linha is None:
+                return None
+            self._conexao.execute("UPDATE respostas SET ultimo_acesso = ? WHERE chave = ?", (time.time(), chave))
+            self._conexao.commit()
+        status, dados, cabecalhos, etag, last_modified, expira_em = linha
+        return {
+            "status": status,
+            "dados": json.loads(dados) if dados is not None else None,
+            "cabecalhos": json.loads(cabecalhos),
+            "etag": etag,
+            "last_modified": last_modified,
+            "expira_em": expira_em,
+        }
+
+    def guardar(self, chave, resposta, ttl):
+        agora = time.time()
+        cabecalhos = resposta["cabecalhos"]
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (chave, resposta["status"],
+                 json.dumps(resposta["dados"], ensure_ascii=False) if resposta["dados"] is not None else None,
+                 json.dumps(cabecalhos, ensure_ascii=False),
+                 cabecalhos.get("etag"), cabecalhos.get("last-modified"), agora + ttl, agora))
+            self._despejar()
+            self._conexao.commit()
+
+    def renovar(self, chave, ttl):
+        agora = time.time()
+        with self._lock:
+            self._conexao.execute("UPDATE respostas SET expira_em = ?, ultimo_acesso = ? WHERE chave = ?",
+                                  (agora + ttl, agora, chave))
+            self._conexao.commit()
+
+    # Função para remover as entradas acessadas há mais tempo acima do limite
+    def _despejar(self):
+        total = self._conexao.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+        if total > self.max_entradas:
+            self._conexao.execute("""
+                DELETE FROM respostas WHERE chave IN (
+                    SELECT chave FROM respostas ORDER BY ultimo_acesso LIMIT ?
+                )
+            """, (total - self.max_entradas,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+
+class BackendComCache:
+    def __init__(self, backend, cache, ttl=24 * 3600, ttl_negativo=3600, max_ttl=7 * 24 * 3600):
+        self.backend = backend
+        self.cache = cache
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.max_ttl = max_ttl
+        self.contadores = {'acertos': 0, 'revalidados': 0, 'faltas': 0, 'negativos': 0, 'vencidos_usados': 0}
+        self._lock = threading.Lock()
+
+    # O resto da interface (nome, host, timeout, credibilidade, fonte) é o do backend original
+    def __getattr__(self, nome):
+        return getattr(self.backend, nome)
+
+    def _contar(self, contador):
+        with self._lock:
+            self.contadores[contador] += 1
+
+    # Função para escolher o TTL: max-age do servidor quando houver, senão o padrão
+    def _ttl(self, resposta):
+        if resposta["status"] == 404:
+            return self.ttl_negativo
+        encontrado = MAX_AGE.search(resposta["cabecalhos"].get("cache-control", ""))
+        ttl = int(encontrado.group(1)) if encontrado else self.ttl
+        return min(max(ttl, 60), self.max_ttl)
+
+    def obter(self, titulo, cabecalhos=None, timeout=None):
+        chave = f"{self.backend.nome}:{normalizar_titulo(titulo)}"
+        entrada = self.cache.obter(chave)
+        if entrada is not None and entrada["expira_em"] > time.time():
+            self._contar('negativos' if entrada["status"] == 404 else 'acertos')
+            return entrada
+
+        condicionais = dict(cabecalhos or {})
+        if entrada is not None and entrada["status"] == 200:
+            if entrada["etag"]:
+                condicionais["If-None-Match"] = entrada["etag"]
+            if entrada["last_modified"]:
+                condicionais["If-Modified-Since"] = entrada["last_modified"]
+        try:
+            resposta = self.backend.obter(titulo, condicionais, timeout=timeout)
+        except (requests.RequestException, ValueError):
+            # Servidor fora do ar: uma cópia vencida é melhor que nada
+            if entrada is not None and entrada["status"] == 200:
+                self._contar('vencidos_usados')
+                return entrada
+            raise
+
+        if resposta["status"] == 304 and entrada is not None:
+            self.cache.renovar(chave, self._ttl({**resposta, "status": 200}))
+            self._contar('revalidados')
+            return entrada
+        self._contar('faltas')
+        if resposta["status"] in (200, 404):
+            self.cache.guardar(chave, resposta, self._ttl(resposta))
+        return resposta
+
+    def estatisticas(self):
+        return {**self.contadores, 'entradas': len(self.cache)}
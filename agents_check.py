@@ -1,137 +1,120 @@
-import streamlit as st
-import requests
-import json
-import re
-from datetime import datetime
+import os
+import tempfile
+from text_core.tardio import recurso_streamlit
+from agents_retrieval import BuscadorFontes, BackendWikipedia
+from agents_cache import CacheRespostas, BackendComCache
+from evidence_index import IndiceEvidencias, BackendIndiceLocal
+from agents_pipeline import extrair_palavras_chave, analisar_fontes, sintetizar
 
-st.title("🔍 Verificador de Fatos com Agentes")
-st.write("Um experimento com múltiplos agentes para fact-checking")
+# Função para criar o buscador uma vez por processo (pool de conexões compartilhado entre sessões)
+# As respostas da Wikipedia ficam num cache SQLite, que pode ser trocado com AGENTS_CACHE.
+# Com AGENTS_INDICE_LOCAL (diretório criado pelo evidence_index.py) a busca é offline
+@recurso_streamlit
+def carregar_buscador():
+    if os.environ.get("AGENTS_INDICE_LOCAL"):
+        return BuscadorFontes([BackendIndiceLocal(IndiceEvidencias.abrir(os.environ["AGENTS_INDICE_LOCAL"]))])
+    caminho = os.environ.get("AGENTS_CACHE", os.path.join(tempfile.gettempdir(), "agents_check_cache.sqlite"))
+    return BuscadorFontes([BackendComCache(BackendWikipedia(), CacheRespostas(caminho))])
 
-# Input da afirmação
-claim = st.text_input("Que afirmação você quer verificar?", 
-                     placeholder="Ex: Python foi criado em 1991")
+# Função da interface Streamlit (o streamlit só é importado aqui, então o módulo pode ser reutilizado sem ele)
+def main():
+    import streamlit as st
 
-if st.button("Verificar") and claim:
+    st.title("🔍 Verificador de Fatos com Agentes")
+    st.write("Um experimento com múltiplos agentes para fact-checking")
+
+    # Input da afirmação
+    claim = st.text_input("Que afirmação você quer verificar?", 
+                         placeholder="Ex: Python foi criado em 1991")
+
+    if st.button("Verificar") and claim:
     
-    # AGENTE 1: BUSCADOR
-    st.write("---")
-    st.write("**🔍 AGENTE 1 - BUSCADOR**")
+        # AGENTE 1: BUSCADOR
+        st.write("---")
+        st.write("**🔍 AGENTE 1 - BUSCADOR**")
     
-    # Extrair palavras-chave básicas
-    keywords = []
-    words = claim.split()
-    for word in words:
-        if len(word) > 3 and word.isalpha():
-            keywords.append(word)
+        # Extrair palavras-chave básicas
+        keywords = extrair_palavras_chave(claim)
     
-    st.write(f"Palavras-chave encontradas: {', '.join(keywords[:3])}")
+        st.write(f"Palavras-chave encontradas: {', '.join(keywords[:3])}")
     
-    # Buscar no Wikipedia
-    sources = []
-    for keyword in keywords[:2]: 
-        try:
-            url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{keyword}"
-            response = requests.get(url, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                sources.append({
-                    'titulo': data.get('title', ''),
-                    'texto': data.get('extract', ''),
-                    'link': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                    'keyword': keyword
-                })
+        # Buscar no Wikipedia (todas as palavras-chave em paralelo, com prazo global)
+        sources = []
+        for resultado in carregar_buscador().buscar(keywords[:2], afirmacao=claim):
+            keyword = resultado['keyword']
+            if resultado['status'] == "ok":
+                sources.extend(resultado['fontes'])
                 st.write(f"✅ Encontrei algo sobre: {keyword}")
-            else:
+            elif resultado['status'] == "nao_encontrado":
                 st.write(f"❌ Nada encontrado para: {keyword}")
-        except:
-            st.write(f"⚠️ Erro buscando: {keyword}")
+            elif resultado['status'] == "prazo":
+                st.write(f"⏱️ Tempo esgotado buscando: {keyword}")
+            else:
+                st.write(f"⚠️ Erro buscando: {keyword}")
     
-    # AGENTE 2: ANALISADOR  
-    st.write("**📊 AGENTE 2 - ANALISADOR**")
+        # AGENTE 2: ANALISADOR  
+        st.write("**📊 AGENTE 2 - ANALISADOR**")
     
-    analyzed = []  
+        analyzed = []  
     
-    if not sources:
-        st.write("❌ Sem fontes para analisar")
-    else:
-        for source in sources:
-            # Análise bem básica de relevância
-            claim_words = set(claim.lower().split())
-            source_words = set(source['texto'].lower().split())
-            overlap = len(claim_words.intersection(source_words))
-            
-            relevance = overlap / len(claim_words) if claim_words else 0
-            
-            # Credibilidade simples (Wikipedia = 0.8)
-            credibility = 0.8
-            
-            analyzed.append({
-                **source,
-                'relevancia': relevance,
-                'credibilidade': credibility,
-                'score': relevance * credibility
-            })
-            
-            st.write(f"📄 {source['titulo']}: Relevância {relevance:.2f}, Score final {relevance * credibility:.2f}")
+        if not sources:
+            st.write("❌ Sem fontes para analisar")
+        else:
+            # Análise bem básica de relevância, todas as fontes de uma vez (credibilidade definida pelo backend)
+            analyzed = analisar_fontes(claim, sources)
+            for source, analysis in zip(sources, analyzed):
+                st.write(f"📄 {source['titulo']}: Relevância {analysis['relevancia']:.2f}, Score final {analysis['score']:.2f}")
     
-    # AGENTE 3: SINTETIZADOR
-    st.write("**⚖️ AGENTE 3 - SINTETIZADOR**") 
+        # AGENTE 3: SINTETIZADOR
+        st.write("**⚖️ AGENTE 3 - SINTETIZADOR**") 
     
-    if analyzed==True:
-        # Pega a melhor fonte
-        best_source = max(analyzed, key=lambda x: x['score'])
-        avg_score = sum(s['score'] for s in analyzed) / len(analyzed)
-        
-        # Veredito bem simples
-        if avg_score > 0.3:
-            verdict = "PROVÁVEL"
-            cor = "green"
-        elif avg_score > 0.1:
-            verdict = "INCERTO" 
-            cor = "orange"
-        else:
-            verdict = "IMPROVÁVEL"
-            cor = "red"
+        synthesis = sintetizar(claim, analyzed)
+    
+        if synthesis:
+            best_source = synthesis['melhor_fonte']
+            avg_score = synthesis['score_medio']
+            verdict, cor = synthesis['veredito'], synthesis['cor']
         
-        st.markdown(f"### Resultado: <span style='color:{cor}'>{verdict}</span>", unsafe_allow_html=True)
-        st.write(f"Score médio: {avg_score:.3f}")
+            st.markdown(f"### Resultado: <span style='color:{cor}'>{verdict}</span>", unsafe_allow_html=True)
+            st.write(f"Score médio: {avg_score:.3f}")
         
-        # Melhor evidência
-        st.write("**Melhor evidência encontrada:**")
-        st.write(f"📚 Fonte: {best_source['titulo']}")
+            # Melhor evidência
+            st.write("**Melhor evidência encontrada:**")
+            st.write(f"📚 Fonte: {best_source['titulo']}")
         
-        # Pega apenas as primeiras 2 frases relevantes
-        sentences = best_source['texto'].split('.')[:2]
-        for sentence in sentences:
-            if any(word.lower() in sentence.lower() for word in claim.split()):
-                st.write(f"💡 {sentence.strip()}")
+            # Primeiras 2 frases relevantes
+            for sentence in synthesis['evidencias']:
+                st.write(f"💡 {sentence}")
         
-        if best_source['link']:
-            st.write(f"🔗 [Ver fonte completa]({best_source['link']})")
+            if best_source['link']:
+                st.write(f"🔗 [Ver fonte completa]({best_source['link']})")
         
-        # Debug info (mostra que você entende o que está fazendo)
-        with st.expander("🔧 Debug - Ver detalhes"):
-            st.json({
-                'afirmacao_original': claim,
-                'palavras_chave': keywords[:3],
-                'num_fontes': len(sources),
-                'scores': [s['score'] for s in analyzed],
-                'melhor_fonte': best_source['titulo']
-            })
+            # Debug info (mostra que você entende o que está fazendo)
+            with st.expander("🔧 Debug - Ver detalhes"):
+                st.json({
+                    'afirmacao_original': claim,
+                    'palavras_chave': keywords[:3],
+                    'num_fontes': len(sources),
+                    'scores': [s['score'] for s in analyzed],
+                    'melhor_fonte': best_source['titulo']
+                })
     
-    else:
-        st.write("❌ Não consegui encontrar informações suficientes para verificar")
-        st.write("Tente reformular a afirmação ou usar termos mais específicos")
+        else:
+            st.write("❌ Não consegui encontrar informações suficientes para verificar")
+            st.write("Tente reformular a afirmação ou usar termos mais específicos")
+
+    # Seção de exemplo
+    st.write("---")
+    st.write("**💡 Dicas de teste:**")
+    st.write("- 'Python foi criado por Guido van Rossum'")
+    st.write("- 'Einstein nasceu na Alemanha'") 
+    st.write("- 'Tesla foi fundada em 2003'")
+
+    st.write("**⚠️ Limitações atuais:**")
+    st.write("- Só busca no Wikipedia (em inglês)")
+    st.write("- Análise de relevância muito básica") 
+    st.write("- Não detecta informações conflitantes ainda")
 
-# Seção de exemplo
-st.write("---")
-st.write("**💡 Dicas de teste:**")
-st.write("- 'Python foi criado por Guido van Rossum'")
-st.write("- 'Einstein nasceu na Alemanha'") 
-st.write("- 'Tesla foi fundada em 2003'")
 
-st.write("**⚠️ Limitações atuais:**")
-st.write("- Só busca no Wikipedia (em inglês)")
-st.write("- Análise de relevância muito básica") 
-st.write("- Não detecta informações conflitantes ainda")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
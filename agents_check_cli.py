@@ -0,0 +1,91 @@
+import sys
+import json
+import asyncio
+import argparse
+
+from agents_retrieval import BuscadorFontes, BackendWikipedia, WIKIPEDIA_URL
+from agents_cache import CacheRespostas, BackendComCache
+from agents_pipeline import PipelineVerificacao
+from evidence_index import IndiceEvidencias, BackendIndiceLocal
+
+# Verificação de fatos em lote, sem Streamlit
+#
+#   python agents_check_cli.py afirmacoes.txt --concorrencia 64 --cache cache.sqlite > resultados.jsonl
+#   cat afirmacoes.jsonl | python agents_check_cli.py - --saida resultados.jsonl
+#   python agents_check_cli.py afirmacoes.txt --indice-local evidencias/     # offline
+#
+# A entrada é um texto com uma afirmação por linha ou um JSONL com
+# {"id": ..., "afirmacao": ...} por linha ("-" = stdin). A saída é um JSONL
+# com uma linha por afirmação, escrita conforme as verificações terminam
+# (o campo "id" liga cada linha à entrada).
+
+
+def ler_afirmacoes(entrada):
+    """Gera pares (id, afirmação) a partir de texto simples ou JSONL"""
+    arquivo = sys.stdin if entrada == "-" else open(entrada, encoding='utf-8')
+    try:
+        for numero, linha in enumerate(arquivo):
+            linha = linha.strip()
+            if not linha:
+                continue
+            if linha.startswith("{"):
+                registro = json.loads(linha)
+                yield registro.get('id', numero), registro['afirmacao']
+            else:
+                yield numero, linha
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+async def processar(afirmacoes, pipeline, saida, concorrencia):
+    # A entrada é consumida aos poucos, conforme abrem vagas na concorrência
+    ids = []
+
+    def textos():
+        for identificador, afirmacao in afirmacoes:
+            ids.append(identificador)
+            yield afirmacao
+
+    async for posicao, resultado in pipeline.verificar_muitos(textos(), concorrencia):
+        saida.write(json.dumps({'id': ids[posicao], **resultado}, ensure_ascii=False) + "\n")
+        saida.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verificador de fatos em lote (saída JSONL)")
+    parser.add_argument("entrada", help="Arquivo com uma afirmação por linha, .jsonl ou '-' para stdin")
+    parser.add_argument("--saida", default="-", help="Arquivo JSONL de saída ('-' = stdout)")
+    parser.add_argument("--concorrencia", type=int, default=32, help="Afirmações verificadas ao mesmo tempo")
+    parser.add_argument("--threads", type=int, default=16, help="Threads de requisição HTTP")
+    parser.add_argument("--limite-por-host", type=int, default=8, help="Requisições simultâneas por servidor")
+    parser.add_argument("--prazo", type=float, default=8.0, help="Prazo (s) das buscas de cada afirmação")
+    parser.add_argument("--limiar-saida", type=float, default=0.5,
+                        help="Score médio que encerra a verificação sem esperar as demais fontes (negativo desliga)")
+    parser.add_argument("--cache", help="Arquivo SQLite de cache das respostas HTTP")
+    parser.add_argument("--wikipedia-url", default=WIKIPEDIA_URL, help="URL base da API REST da Wikipedia")
+    parser.add_argument("--indice-local", help="Diretório do índice de evidências (evidence_index.py); busca offline")
+    parser.add_argument("--trechos", type=int, default=5, help="Trechos do índice local por afirmação")
+    args = parser.parse_args(argv)
+
+    if args.indice_local:
+        backend = BackendIndiceLocal(IndiceEvidencias.abrir(args.indice_local), k=args.trechos)
+    else:
+        backend = BackendWikipedia(args.wikipedia_url)
+        if args.cache:
+            backend = BackendComCache(backend, CacheRespostas(args.cache))
+    buscador = BuscadorFontes([backend], max_threads=args.threads, prazo=args.prazo,
+                              limite_por_host=args.limite_por_host)
+    pipeline = PipelineVerificacao(buscador, limiar_saida=args.limiar_saida if args.limiar_saida >= 0 else None)
+
+    saida = sys.stdout if args.saida == "-" else open(args.saida, 'w', encoding='utf-8')
+    try:
+        asyncio.run(processar(ler_afirmacoes(args.entrada), pipeline, saida, args.concorrencia))
+    finally:
+        buscador.fechar()
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import time
+import asyncio
+from agents_retrieval import BuscadorFontes, resultado_prazo
+from agents_scoring import obter_pontuador
+
+# Os três agentes do verificador (BUSCADOR, ANALISADOR, SINTETIZADOR) como
+# etapas de um pipeline assíncrono, sem Streamlit
+#
+# Cada verificação liga as etapas por filas asyncio: o BUSCADOR publica cada
+# fonte assim que a requisição volta, o ANALISADOR pontua a fonte na hora e
+# o SINTETIZADOR acumula as pontuações. Se o score médio já passou de
+# `limiar_saida`, o SINTETIZADOR encerra sem esperar as buscas restantes
+# (que são canceladas). Várias afirmações rodam ao mesmo tempo, limitadas
+# por `concorrencia`, compartilhando o mesmo BuscadorFontes (pool de
+# conexões, limite por host e, se configurado, cache HTTP).
+#
+# As funções de análise e síntese são as mesmas usadas pelo app.
+
+CREDIBILIDADE_PADRAO = 0.8
+# Marca o fim de uma fila
+FIM = object()
+
+
+# Função para extrair as palavras-chave básicas (palavras com mais de 3 letras)
+def extrair_palavras_chave(afirmacao):
+    return [word for word in afirmacao.split() if len(word) > 3 and word.isalpha()]
+
+
+# Função para a análise (bem básica) de relevância de várias fontes de uma vez
+# A afirmação é tokenizada uma vez e todas as fontes são pontuadas num só produto esparso
+def analisar_fontes(afirmacao, fontes):
+    if not fontes:
+        return []
+    relevancias = obter_pontuador().relevancias([afirmacao], [fonte['texto'] for fonte in fontes])[0]
+    analisados = []
+    for fonte, relevance in zip(fontes, relevancias):
+        credibility = fonte.get('credibilidade', CREDIBILIDADE_PADRAO)
+        analisados.append({
+            **fonte,
+            'relevancia': float(relevance),
+            'credibilidade': credibility,
+            'score': float(relevance) * credibility,
+        })
+    return analisados
+
+
+# Função para analisar uma única fonte
+def analisar_fonte(afirmacao, fonte):
+    return analisar_fontes(afirmacao, [fonte])[0]
+
+
+# Função para o veredito a partir do score médio
+def classificar_veredito(score_medio):
+    if score_medio > 0.3:
+        return "PROVÁVEL", "green"
+    if score_medio > 0.1:
+        return "INCERTO", "orange"
+    return "IMPROVÁVEL", "red"
+
+
+# Função para sintetizar o resultado; retorna None se não houver fontes analisadas
+def sintetizar(afirmacao, analisados):
+    if not analisados:
+        return None
+    best_source = max(analisados, key=lambda x: x['score'])
+    avg_score = sum(s['score'] for s in analisados) / len(analisados)
+    veredito, cor = classificar_veredito(avg_score)
+    # Pega apenas as primeiras 2 frases relevantes
+    evidencias = [
+        sentence.strip() for sentence in best_source['texto'].split('.')[:2]
+        if any(word.lower() in sentence.lower() for word in afirmacao.split())
+    ]
+    return {
+        'veredito': veredito,
+        'cor': cor,
+        'score_medio': avg_score,
+        'melhor_fonte': best_source,
+        'evidencias': evidencias,
+    }
+
+
+class PipelineVerificacao:
+    def __init__(self, buscador=None, max_palavras_chave=2, limiar_saida=0.5, prazo=None):
+        self.buscador = buscador or BuscadorFontes()
+        self.max_palavras_chave = max_palavras_chave
+        # None desliga a saída antecipada
+        self.limiar_saida = limiar_saida
+        self.prazo = prazo
+
+    # Etapa BUSCADOR: publica cada resultado de busca assim que ele chega
+    async def _buscar(self, afirmacao, keywords, saida):
+        pendentes, limite = self.buscador.submeter(keywords, self.prazo, afirmacao)
+        # Cancelar o futuro asyncio cancela também a tarefa que ainda está na fila do pool
+        tarefas = {asyncio.wrap_future(futuro): chave for futuro, chave in pendentes.items()}
+        try:
+            while tarefas:
+                prontas, _ = await asyncio.wait(tarefas, timeout=max(0.0, limite - time.monotonic()),
+                                                return_when=asyncio.FIRST_COMPLETED)
+                if not prontas:
+                    break
+                for tarefa in prontas:
+                    tarefas.pop(tarefa)
+                    await saida.put(tarefa.result())
+            for tarefa, (backend, keyword) in list(tarefas.items()):
+                tarefas.pop(tarefa).cancel()
+                await saida.put(resultado_prazo(backend, keyword))
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            saida.put_nowait(FIM)
+
+    # Etapa ANALISADOR: pontua cada fonte assim que ela chega
+    async def _analisar(self, afirmacao, entrada, saida):
+        while True:
+            busca = await entrada.get()
+            if busca is FIM:
+                await saida.put(FIM)
+                return
+            analises = analisar_fontes(afirmacao, busca['fontes'])
+            await saida.put((busca, analises))
+
+    # Etapa SINTETIZADOR: acumula as análises e decide se já pode encerrar
+    async def _sintetizar(self, entrada):
+        buscas, analisados = [], []
+        while True:
+            item = await entrada.get()
+            if item is FIM:
+                return buscas, analisados, False
+            busca, analises = item
+            buscas.append({k: v for k, v in busca.items() if k != 'fontes'})
+            if analises:
+                analisados.extend(analises)
+                media = sum(a['score'] for a in analisados) / len(analisados)
+                if self.limiar_saida is not None and media >= self.limiar_saida:
+                    return buscas, analisados, True
+
+    async def verificar(self, afirmacao):
+        inicio = time.perf_counter()
+        keywords = extrair_palavras_chave(afirmacao)
+        fontes, analises = asyncio.Queue(), asyncio.Queue()
+        etapas = [
+            asyncio.create_task(self._buscar(afirmacao, keywords[:self.max_palavras_chave], fontes)),
+            asyncio.create_task(self._analisar(afirmacao, fontes, analises)),
+        ]
+        try:
+            buscas, analisados, antecipada = await self._sintetizar(analises)
+        finally:
+            for etapa in etapas:
+                etapa.cancel()
+            await asyncio.gather(*etapas, return_exceptions=True)
+        return {
+            'afirmacao': afirmacao,
+            'palavras_chave': keywords[:3],
+            'buscas': buscas,
+            'analisados': analisados,
+            'sintese': sintetizar(afirmacao, analisados),
+            'saida_antecipada': antecipada,
+            'tempo_s': time.perf_counter() - inicio,
+        }
+
+    # Função para verificar muitas afirmações com no máximo `concorrencia` em andamento;
+    # gera (posição, resultado) na ordem em que terminam
+    async def verificar_muitos(self, afirmacoes, concorrencia=32):
+        em_andamento = set()
+        for posicao, afirmacao in enumerate(afirmacoes):
+            em_andamento.add(asyncio.create_task(self._verificar_posicao(posicao, afirmacao)))
+            if len(em_andamento) >= concorrencia:
+                prontas, em_andamento = await asyncio.wait(em_andamento, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontas:
+                    yield tarefa.result()
+        while em_andamento:
+            prontas, em_andamento = await asyncio.wait(em_andamento, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in prontas:
+                yield tarefa.result()
+
+    async def _verificar_posicao(self, posicao, afirmacao):
+        return posicao, await self.verificar(afirmacao)
+
+
+# Função síncrona para verificar um lote de afirmações; resultados na ordem da entrada
+def verificar_lote(afirmacoes, pipeline=None, concorrencia=32):
+    pipeline = pipeline or PipelineVerificacao()
+    afirmacoes = list(afirmacoes)
+
+    async def rodar():
+        resultados = [None] * len(afirmacoes)
+        async for posicao, resultado in pipeline.verificar_muitos(afirmacoes, concorrencia):
+            resultados[posicao] = resultado
+        return resultados
+
+    return asyncio.run(rodar())
@@ -0,0 +1,161 @@
+import os
+import time
+import threading
+from urllib.parse import quote, urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from text_core.tardio import ModuloTardio
+
+# O requests só é carregado quando a primeira sessão é criada (o índice local não precisa dele)
+requests = ModuloTardio("requests")
+
+# Camada de busca de fontes do agente BUSCADOR
+#
+# Todas as palavras-chave são buscadas ao mesmo tempo num pool de threads,
+# sobre uma sessão HTTP com keep-alive (uma conexão TLS reaproveitada por
+# host em vez de um handshake por requisição). Um prazo global limita a
+# busca inteira: o que não voltou a tempo é marcado como "prazo" e a
+# verificação segue com o que chegou. Um semáforo por host limita quantas
+# requisições simultâneas cada servidor recebe.
+#
+# Os backends são plugáveis: qualquer objeto com `nome`, `host`,
+# `obter(titulo, cabecalhos, timeout)` e `fontes(titulo, resposta)` serve.
+# Por padrão cada palavra-chave é uma consulta; backends com
+# `consulta = "afirmacao"` (ex.: o índice local do evidence_index) recebem
+# uma única consulta com a afirmação inteira. A URL da Wikipedia pode ser
+# trocada por AGENTS_WIKIPEDIA_URL (ex.: um servidor local com respostas
+# gravadas, nos testes).
+
+WIKIPEDIA_URL = os.environ.get("AGENTS_WIKIPEDIA_URL", "https://en.wikipedia.org/api/rest_v1")
+USER_AGENT = "VerificadorDeFatos/1.0 (https://github.com/Pires-De-Andrade/Projetos-VC-NLP-AGENTS)"
+
+
+# Função para criar uma sessão com pool de conexões keep-alive
+def criar_sessao(conexoes=16):
+    sessao = requests.Session()
+    adaptador = requests.adapters.HTTPAdapter(pool_connections=conexoes, pool_maxsize=conexoes, max_retries=0)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    sessao.headers["User-Agent"] = USER_AGENT
+    return sessao
+
+
+# Função para o resultado de uma busca que não terminou dentro do prazo
+def resultado_prazo(backend, keyword):
+    return {'keyword': keyword, 'backend': backend.nome, 'fontes': [], 'status': "prazo"}
+
+
+class BackendWikipedia:
+    nome = "wikipedia"
+    credibilidade = 0.8
+
+    def __init__(self, base_url=WIKIPEDIA_URL, sessao=None, timeout=5):
+        self.base_url = base_url.rstrip("/")
+        self.sessao = sessao or criar_sessao()
+        self.timeout = timeout
+
+    @property
+    def host(self):
+        return urlsplit(self.base_url).netloc
+
+    # Função para buscar o resumo de um título; retorna status, dados (JSON) e cabeçalhos
+    # (com os nomes em minúsculas, já que um dict comum perde a busca sem distinção de caixa)
+    def obter(self, titulo, cabecalhos=None, timeout=None):
+        url = f"{self.base_url}/page/summary/{quote(titulo, safe='')}"
+        resposta = self.sessao.get(url, headers=cabecalhos or {}, timeout=timeout or self.timeout)
+        dados = resposta.json() if resposta.status_code == 200 else None
+        return {"status": resposta.status_code, "dados": dados,
+                "cabecalhos": {nome.lower(): valor for nome, valor in resposta.headers.items()}}
+
+    # Função para converter a resposta no formato de fonte usado pelos agentes
+    def fonte(self, titulo, resposta):
+        dados = resposta["dados"] or {}
+        return {
+            'titulo': dados.get('title', ''),
+            'texto': dados.get('extract', ''),
+            'link': dados.get('content_urls', {}).get('desktop', {}).get('page', ''),
+            'keyword': titulo,
+            'backend': self.nome,
+            'credibilidade': self.credibilidade,
+        }
+
+    def fontes(self, titulo, resposta):
+        return [self.fonte(titulo, resposta)]
+
+
+class BuscadorFontes:
+    def __init__(self, backends=None, max_threads=8, prazo=8.0, limite_por_host=4):
+        self.backends = backends or [BackendWikipedia()]
+        self.prazo = prazo
+        self.limite_por_host = limite_por_host
+        self._pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="buscador")
+        self._semaforos = {}
+        self._lock = threading.Lock()
+
+    def _semaforo(self, host):
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.limite_por_host)
+            return self._semaforos[host]
+
+    # Função executada no pool: respeita o limite do host e o tempo que resta do prazo
+    def _buscar_uma(self, backend, keyword, limite):
+        resultado = {'keyword': keyword, 'backend': backend.nome, 'fontes': []}
+        semaforo = self._semaforo(backend.host)
+        if not semaforo.acquire(timeout=max(0.0, limite - time.monotonic())):
+            return {**resultado, 'status': "prazo"}
+        try:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return {**resultado, 'status': "prazo"}
+            resposta = backend.obter(keyword, timeout=min(restante, getattr(backend, "timeout", restante)))
+        except Exception as e:
+            # Qualquer falha do backend (rede, JSON, bug) vira erro só desta consulta
+            return {**resultado, 'status': "erro", 'erro': str(e)}
+        finally:
+            semaforo.release()
+        try:
+            if resposta["status"] == 200:
+                return {**resultado, 'status': "ok", 'fontes': backend.fontes(keyword, resposta)}
+            return {**resultado, 'status': "nao_encontrado", 'http_status': resposta["status"]}
+        except Exception as e:
+            return {**resultado, 'status': "erro", 'erro': str(e)}
+
+    # Função para montar as consultas de um backend
+    def _consultas(self, backend, keywords, afirmacao):
+        if getattr(backend, "consulta", "palavra_chave") == "afirmacao":
+            return [afirmacao or " ".join(keywords)]
+        return keywords
+
+    # Função para disparar as buscas no pool; retorna {futuro: (backend, consulta)} e o instante limite
+    def submeter(self, keywords, prazo=None, afirmacao=None):
+        limite = time.monotonic() + (self.prazo if prazo is None else prazo)
+        pendentes = {
+            self._pool.submit(self._buscar_uma, backend, consulta, limite): (backend, consulta)
+            for backend in self.backends for consulta in self._consultas(backend, keywords, afirmacao)
+        }
+        return pendentes, limite
+
+    # Função para buscar todas as palavras-chave em todos os backends, gerando os
+    # resultados na ordem em que chegam; o que passar do prazo sai com status "prazo"
+    def buscar_conforme_chegam(self, keywords, prazo=None, afirmacao=None):
+        pendentes, limite = self.submeter(keywords, prazo, afirmacao)
+        while pendentes:
+            prontos, _ = wait(pendentes, timeout=max(0.0, limite - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not prontos:
+                break
+            for futuro in prontos:
+                pendentes.pop(futuro)
+                yield futuro.result()
+        for futuro, (backend, keyword) in pendentes.items():
+            futuro.cancel()
+            yield resultado_prazo(backend, keyword)
+
+    # Função para buscar tudo e devolver os resultados na ordem dos backends e das palavras-chave
+    def buscar(self, keywords, prazo=None, afirmacao=None):
+        resultados = list(self.buscar_conforme_chegam(keywords, prazo, afirmacao))
+        ordem = {keyword: i for i, keyword in enumerate(keywords)}
+        nomes = [backend.nome for backend in self.backends]
+        return sorted(resultados, key=lambda r: (nomes.index(r['backend']), ordem.get(r['keyword'], -1)))
+
+    def fechar(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
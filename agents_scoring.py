@@ -0,0 +1,28 @@
+from text_core.similaridade import sobreposicao
+
+# Pontuação de relevância do ANALISADOR em lote
+#
+# A relevância continua sendo a do app: fração das palavras (distintas,
+# minúsculas, separadas por espaço) da afirmação que aparecem na fonte.
+# O cálculo é o `sobreposicao` do text_core: um único produto de matrizes
+# esparsas para o lote inteiro de afirmações x fontes, com um vocabulário
+# por lote (exato, sem as colisões do hashing trick) e as palavras de cada
+# texto vindas do cache de tokens compartilhado com o detector de plágio.
+
+
+class PontuadorRelevancia:
+    # Função para a matriz de relevância (afirmações x fontes) de uma vez
+    # Afirmação sem palavras tem relevância 0 (como no app)
+    def relevancias(self, afirmacoes, fontes):
+        return sobreposicao(afirmacoes, fontes)
+
+
+_pontuador = None
+
+
+# Função para obter o pontuador compartilhado do processo
+def obter_pontuador():
+    global _pontuador
+    if _pontuador is None:
+        _pontuador = PontuadorRelevancia()
+    return _pontuador
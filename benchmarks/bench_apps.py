@@ -0,0 +1,319 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks import carga
+
+# Benchmark de ponta a ponta dos três apps, sem Streamlit e sem rede
+#
+#   python -m benchmarks.bench_apps --apps agents copy emotion --clientes 1 4 16 \
+#       --requisicoes 200 --saida bench_apps.json
+#   python -m benchmarks.bench_apps ... --comparar bench_apps_anterior.json
+#
+# Cada app é exercitado pelo mesmo caminho que a interface percorre numa
+# sessão, com os recursos compartilhados (buscador, índice, modelos)
+# criados uma vez por processo, como no st.cache_resource:
+#   agents   palavras-chave, BuscadorFontes.buscar, analisar_fontes e
+#            sintetizar, contra o stub local da Wikipedia (stub_wikipedia)
+#   copy     dividir_em_sentencas, detectar_plagio e sugestões de reescrita,
+#            com base e documentos do GeradorCorpus
+#   emotion  decode_image e analyze_image, com imagens sintéticas de rostos
+#            (rostos.py) ou uma pasta de fotos (--imagens)
+#
+# N clientes são N threads fazendo uma requisição por vez, como N sessões
+# do Streamlit no mesmo servidor. Cada cenário (app, clientes) roda num
+# processo novo, para que o pico de RSS seja só dele, e reporta latência
+# p50/p95/p99, vazão e, numa passada sequencial separada (para não
+# distorcer os tempos da carga), duração e pico de memória de cada etapa.
+# O stub da Wikipedia roda no processo principal.
+
+APPS = ("agents", "copy", "emotion")
+AFIRMACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "afirmacoes.txt")
+
+
+def encadear(etapas):
+    """Requisição que roda as etapas em sequência sobre um estado novo"""
+    def requisicao(item):
+        estado = {'item': item}
+        for _, funcao in etapas:
+            funcao(estado)
+        return estado
+    return requisicao
+
+
+def preparar_agents(cenario):
+    """Verificador de fatos: buscador compartilhado apontando para o stub"""
+    from agents_retrieval import BuscadorFontes, BackendWikipedia
+    from agents_cache import CacheRespostas, BackendComCache
+    from agents_pipeline import extrair_palavras_chave, analisar_fontes, sintetizar
+    from benchmarks.sintetico import GeradorCorpus
+
+    backend = BackendWikipedia(cenario['wikipedia_url'])
+    if cenario['cache_http']:
+        backend = BackendComCache(backend, CacheRespostas())
+    buscador = BuscadorFontes([backend], max_threads=cenario['threads'], limite_por_host=cenario['limite_por_host'])
+
+    def palavras_chave(estado):
+        estado['keywords'] = extrair_palavras_chave(estado['item'])
+
+    def busca(estado):
+        resultados = buscador.buscar(estado['keywords'][:2], afirmacao=estado['item'])
+        estado['fontes'] = [fonte for resultado in resultados for fonte in resultado['fontes']]
+
+    def analise(estado):
+        estado['analisados'] = analisar_fontes(estado['item'], estado['fontes'])
+
+    def sintese(estado):
+        estado['sintese'] = sintetizar(estado['item'], estado['analisados'])
+
+    etapas = [("palavras_chave", palavras_chave), ("busca", busca), ("analise", analise), ("sintese", sintese)]
+
+    with open(AFIRMACOES, encoding='utf-8') as f:
+        gravadas = [linha.strip() for linha in f if linha.strip()]
+    gerador = GeradorCorpus(semente=cenario['semente'])
+
+    # Metade das afirmações usa os resumos gravados (palavras-chave que se
+    # repetem), metade é sintética (palavras-chave novas)
+    def itens(n):
+        return [gravadas[i // 2 % len(gravadas)] if i % 2 == 0 else gerador.sentenca() for i in range(n)]
+
+    return encadear(etapas), etapas, itens
+
+
+def preparar_copy(cenario):
+    """Detector de plágio: índice TF-IDF da base sintética ajustado uma vez"""
+    from copy_detector import IndiceSimilaridade, dividir_em_sentencas, detectar_plagio, sugerir_reescrita
+    from score_cache import CacheSimilaridade
+    from benchmarks.sintetico import GeradorCorpus
+
+    gerador = GeradorCorpus(cenario['vocabulario'], semente=cenario['semente'])
+    base = gerador.base(cenario['corpus'])
+    indice = IndiceSimilaridade().ajustar(base)
+    cache = CacheSimilaridade() if cenario['cache_similaridade'] else None
+
+    def segmentacao(estado):
+        estado['sentencas'] = dividir_em_sentencas(estado['item'])
+
+    def pontuacao(estado):
+        estado['resultados'] = detectar_plagio(estado['sentencas'], indice, cenario['limiar'], cache=cache)
+
+    def reescrita(estado):
+        estado['sugestoes'] = [sugerir_reescrita(r['sentenca']) for r in estado['resultados']
+                               if r['status'] == "alto_risco"]
+
+    etapas = [("segmentacao", segmentacao), ("pontuacao", pontuacao), ("reescrita", reescrita)]
+
+    def itens(n):
+        return [". ".join(gerador.documento(base, cenario['sentencas'])[0]) + "." for _ in range(n)]
+
+    return encadear(etapas), etapas, itens
+
+
+def preparar_emotion(cenario):
+    """EmoScan: modelos aquecidos uma vez e imagens lidas como uploads"""
+    import emotion_detection as app
+    from emotion_models import get_registry
+    from benchmarks.rostos import gerar_pasta, ler_pasta
+
+    registry = get_registry().warm_up()
+    pasta = cenario['imagens']
+    if not pasta:
+        pasta = tempfile.mkdtemp(prefix="bench_rostos_")
+        try:
+            gerar_pasta(pasta, cenario['n_imagens'], cenario['semente'], cenario['lado'], cenario['lado'] * 3 // 4,
+                        cenario['max_rostos'])
+            imagens = ler_pasta(pasta)
+        finally:
+            shutil.rmtree(pasta, ignore_errors=True)
+    else:
+        imagens = ler_pasta(pasta)
+    if not imagens:
+        raise ValueError(f"Nenhuma imagem em {pasta}")
+
+    def requisicao(dados):
+        # Mesmo caminho do botão "Analisar": decodifica e roda as etapas em paralelo
+        resultados, erro = app.analyze_image(app.decode_image(dados))
+        if erro:
+            raise RuntimeError(erro)
+        return resultados
+
+    def decodificacao(estado):
+        estado['imagem'] = app.decode_image(estado['item'])
+
+    def rostos(estado):
+        estado['rostos'] = registry.detect_faces(estado['imagem'])
+
+    def emocoes(estado):
+        recortes = [recorte for _, recorte in estado['rostos']]
+        estado['probabilidades'] = registry.predict_emotions(recortes) if recortes else None
+
+    def contexto(estado):
+        estado['contexto'] = app.detect_context(estado['imagem'])
+
+    def regras(estado):
+        if estado['probabilidades'] is not None:
+            estado['ajustes'] = app.CONTEXT_RULES.adjust_batch(
+                estado['probabilidades'], [estado['contexto']] * len(estado['rostos']))
+
+    etapas = [("decodificacao", decodificacao), ("rostos", rostos), ("emocoes", emocoes),
+              ("contexto", contexto), ("regras", regras)]
+
+    def itens(n):
+        return [imagens[i % len(imagens)] for i in range(n)]
+
+    return requisicao, etapas, itens
+
+
+PREPARADORES = {'agents': preparar_agents, 'copy': preparar_copy, 'emotion': preparar_emotion}
+
+
+def rodar_cenario(cenario):
+    """Executa um cenário e devolve as métricas (roda em processo separado)"""
+    (requisicao, etapas, gerar_itens), tempo_preparo, _ = carga.medir(PREPARADORES[cenario['app']], cenario)
+    itens = gerar_itens(cenario['aquecimento'] + cenario['requisicoes'])
+    aquecimento, medidos = itens[:cenario['aquecimento']], itens[cenario['aquecimento']:]
+
+    # O aquecimento tira da medição as cargas tardias (imports, grafos do TF, conexões)
+    carga.executar_clientes(requisicao, aquecimento, 1)
+    execucao = carga.executar_clientes(requisicao, medidos, cenario['clientes'])
+    amostra = medidos[:cenario['amostra_etapas']]
+
+    return {
+        **cenario,
+        'tempo_preparo_s': tempo_preparo,
+        'latencia': carga.percentis(execucao['latencias']),
+        'vazao_rps': len(execucao['latencias']) / execucao['duracao_s'] if execucao['duracao_s'] else None,
+        'duracao_s': execucao['duracao_s'],
+        'erros': len(execucao['erros']),
+        'exemplos_erros': sorted(set(execucao['erros']))[:5],
+        'etapas': carga.perfil_etapas(etapas, amostra) if amostra else {},
+        'pico_rss_bytes': carga.pico_rss(),
+    }
+
+
+def metadados():
+    return carga.metadados({
+        'numpy': 'numpy', 'sklearn': 'scikit-learn', 'requests': 'requests',
+        'opencv': ('opencv-python', 'opencv-python-headless', 'opencv-contrib-python',
+                   'opencv-contrib-python-headless'),
+        'deepface': 'deepface', 'tensorflow': 'tensorflow',
+    })
+
+
+def comparar(atuais, anteriores):
+    """Imprime a razão atual/anterior das latências, vazão e memória para cenários iguais"""
+    chave = lambda r: (r['app'], r['clientes'], r['requisicoes'])
+    anteriores = {chave(r): r for r in anteriores}
+    for r in atuais:
+        antigo = anteriores.get(chave(r))
+        if not antigo:
+            continue
+        metricas = {
+            'p50': (r['latencia'].get('p50_ms'), antigo['latencia'].get('p50_ms')),
+            'p95': (r['latencia'].get('p95_ms'), antigo['latencia'].get('p95_ms')),
+            'p99': (r['latencia'].get('p99_ms'), antigo['latencia'].get('p99_ms')),
+            'vazao': (r.get('vazao_rps'), antigo.get('vazao_rps')),
+            'pico_rss': (r.get('pico_rss_bytes'), antigo.get('pico_rss_bytes')),
+        }
+        razoes = {m: atual / anterior for m, (atual, anterior) in metricas.items() if atual and anterior}
+        print(chave(r), " ".join(f"{m}={v:.2f}x" for m, v in razoes.items()), file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de latência e vazão dos três apps")
+    parser.add_argument("--apps", nargs="+", choices=APPS, default=list(APPS))
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 4, 16], help="Clientes concorrentes")
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições medidas por cenário")
+    parser.add_argument("--aquecimento", type=int, default=5, help="Requisições antes da medição")
+    parser.add_argument("--amostra-etapas", type=int, default=20,
+                        help="Requisições do perfil por etapa (0 desliga)")
+    parser.add_argument("--semente", type=int, default=0)
+
+    grupo = parser.add_argument_group("agents")
+    grupo.add_argument("--wikipedia-url", help="Usa este servidor em vez de subir o stub local")
+    grupo.add_argument("--atraso", type=float, default=0.02, help="Atraso (s) de cada resposta do stub")
+    grupo.add_argument("--fracao-404", type=float, default=0.2)
+    grupo.add_argument("--threads", type=int, default=8, help="Threads do BuscadorFontes")
+    grupo.add_argument("--limite-por-host", type=int, default=4)
+    grupo.add_argument("--cache-http", action="store_true", help="Liga o cache de respostas (em memória)")
+
+    grupo = parser.add_argument_group("copy")
+    grupo.add_argument("--corpus", type=int, default=5000, help="Sentenças na base")
+    grupo.add_argument("--sentencas", type=int, default=20, help="Sentenças por documento")
+    grupo.add_argument("--vocabulario", type=int, default=5000)
+    grupo.add_argument("--limiar", type=float, default=0.3)
+    grupo.add_argument("--cache-similaridade", action="store_true", help="Liga o CacheSimilaridade (em memória)")
+
+    grupo = parser.add_argument_group("emotion")
+    grupo.add_argument("--imagens", help="Pasta com fotos; sem ela, usa rostos sintéticos")
+    grupo.add_argument("--n-imagens", type=int, default=50, help="Imagens sintéticas geradas")
+    grupo.add_argument("--lado", type=int, default=640, help="Largura das imagens sintéticas")
+    grupo.add_argument("--max-rostos", type=int, default=2, help="Rostos por imagem sintética (1 a N)")
+
+    parser.add_argument("--saida", default="-", help="Arquivo JSON de saída ('-' = stdout)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    stub = None
+    if "agents" in args.apps and not args.wikipedia_url:
+        from benchmarks.stub_wikipedia import ServidorWikipedia
+        stub = ServidorWikipedia(atraso=args.atraso, fracao_404=args.fracao_404).iniciar()
+
+    opcoes = {
+        'agents': {'wikipedia_url': args.wikipedia_url or (stub and stub.url), 'atraso': args.atraso,
+                   'fracao_404': args.fracao_404, 'threads': args.threads,
+                   'limite_por_host': args.limite_por_host, 'cache_http': args.cache_http},
+        'copy': {'corpus': args.corpus, 'sentencas': args.sentencas, 'vocabulario': args.vocabulario,
+                 'limiar': args.limiar, 'cache_similaridade': args.cache_similaridade},
+        'emotion': {'imagens': args.imagens, 'n_imagens': args.n_imagens, 'lado': args.lado,
+                    'max_rostos': args.max_rostos},
+    }
+    cenarios = [
+        {
+            'app': app, 'clientes': clientes, 'requisicoes': args.requisicoes,
+            'aquecimento': args.aquecimento, 'amostra_etapas': args.amostra_etapas, 'semente': args.semente,
+            **opcoes[app],
+        }
+        for app, clientes in itertools.product(args.apps, args.clientes)
+    ]
+
+    resultados = []
+    contexto = multiprocessing.get_context("spawn")
+    try:
+        for cenario in cenarios:
+            respostas_antes = dict(stub.contadores) if stub else {}
+            with ProcessPoolExecutor(1, mp_context=contexto) as pool:
+                resultado = pool.submit(rodar_cenario, cenario).result()
+            if stub and cenario['app'] == "agents":
+                resultado['respostas_stub'] = {str(status): total - respostas_antes.get(status, 0)
+                                               for status, total in stub.contadores.items()}
+            latencia = resultado['latencia']
+            print(f"{resultado['app']} clientes={resultado['clientes']}: "
+                  f"p50 {latencia.get('p50_ms', 0):.1f}ms, p95 {latencia.get('p95_ms', 0):.1f}ms, "
+                  f"p99 {latencia.get('p99_ms', 0):.1f}ms, {resultado['vazao_rps']:.1f} req/s, "
+                  f"erros {resultado['erros']}", file=sys.stderr)
+            resultados.append(resultado)
+    finally:
+        if stub:
+            stub.parar()
+
+    relatorio = {'metadados': metadados(), 'resultados': resultados}
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f)['resultados'])
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida == "-":
+        print(texto)
+    else:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import sys
+import json
+import time
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks import carga
+
+# Benchmark de escala do detector de plágio
+#
+#   python -m benchmarks.bench_copy_detector --corpus 1000 10000 --sentencas 100 500 \
+#       --saida bench_copy_detector.json
+#   python -m benchmarks.bench_copy_detector ... --comparar bench_anterior.json
+#
+# Cada combinação (tamanho do corpus, sentenças no documento, ngram_range,
+# max_features) roda num processo novo, para que o pico de RSS medido seja
+# só dela. Mede tempo de ajuste, transform e pontuação, pico de RSS, pico
+# alocado por etapa (opcional, tracemalloc) e precisão/recall das paráfrases
+# plantadas pelo gerador sintético.
+
+
+def rodar_cenario(cenario):
+    """Executa um cenário e devolve as métricas (roda em processo separado)"""
+    from benchmarks.sintetico import GeradorCorpus
+    from copy_detector import IndiceSimilaridade, calcular_similaridade, detectar_plagio
+
+    gerador = GeradorCorpus(cenario['vocabulario'], semente=cenario['semente'])
+    base = gerador.base(cenario['corpus'])
+    sentencas, gabarito = gerador.documento(base, cenario['sentencas'], cenario['fracao_plantada'])
+
+    indice = IndiceSimilaridade(tuple(cenario['ngram_range']), cenario['max_features'])
+    memoria = cenario['medir_memoria']
+    _, tempo_ajuste, memoria_ajuste = carga.medir(indice.ajustar, base, medir_memoria=memoria)
+    _, tempo_transform, memoria_transform = carga.medir(indice.transformar, sentencas, medir_memoria=memoria)
+    resultados, tempo_pontuacao, memoria_pontuacao = carga.medir(
+        detectar_plagio, sentencas, indice, cenario['limiar'], medir_memoria=memoria)
+
+    # Caminho antigo (reajusta o TF-IDF a cada sentença), numa amostra
+    amostra = sentencas[:cenario['amostra_legado']]
+    inicio = time.perf_counter()
+    for sentenca in amostra:
+        calcular_similaridade(sentenca, base)
+    tempo_legado = (time.perf_counter() - inicio) / len(amostra) if amostra else None
+
+    plantadas = sum(1 for g in gabarito if g is not None)
+    sinalizadas = [r for r in resultados if r['status'] != "ok"]
+    acertos = sum(1 for r in sinalizadas
+                  if gabarito[r['posicao']] is not None and r['texto_similar'] == base[gabarito[r['posicao']]])
+
+    return {
+        **cenario,
+        'tempo_ajuste_s': tempo_ajuste,
+        'tempo_transform_s': tempo_transform,
+        'tempo_pontuacao_s': tempo_pontuacao,
+        'tempo_legado_por_sentenca_s': tempo_legado,
+        'sentencas_por_s': len(sentencas) / tempo_pontuacao if tempo_pontuacao else None,
+        'pico_alocado_ajuste_bytes': memoria_ajuste,
+        'pico_alocado_transform_bytes': memoria_transform,
+        'pico_alocado_pontuacao_bytes': memoria_pontuacao,
+        'pico_rss_bytes': carga.pico_rss(),
+        'precisao': acertos / len(sinalizadas) if sinalizadas else None,
+        'recall': acertos / plantadas if plantadas else None,
+    }
+
+
+def metadados():
+    return carga.metadados({'sklearn': 'scikit-learn', 'numpy': 'numpy'})
+
+
+def comparar(atuais, anteriores):
+    """Imprime a razão atual/anterior dos tempos para cenários iguais"""
+    chave = lambda r: (r['corpus'], r['sentencas'], tuple(r['ngram_range']), r['max_features'])
+    anteriores = {chave(r): r for r in anteriores}
+    for r in atuais:
+        antigo = anteriores.get(chave(r))
+        if not antigo:
+            continue
+        razoes = {
+            metrica: r[metrica] / antigo[metrica]
+            for metrica in ('tempo_ajuste_s', 'tempo_transform_s', 'tempo_pontuacao_s', 'pico_rss_bytes')
+            if r.get(metrica) and antigo.get(metrica)
+        }
+        print(chave(r), " ".join(f"{m}={v:.2f}x" for m, v in razoes.items()), file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escala do copy_detector")
+    parser.add_argument("--corpus", type=int, nargs="+", default=[1000, 10000], help="Sentenças na base")
+    parser.add_argument("--sentencas", type=int, nargs="+", default=[100, 500], help="Sentenças no documento")
+    parser.add_argument("--ngram-max", type=int, nargs="+", default=[2], help="Maior n do ngram_range (1, n)")
+    parser.add_argument("--max-features", type=int, nargs="+", default=[1000])
+    parser.add_argument("--vocabulario", type=int, default=5000)
+    parser.add_argument("--fracao-plantada", type=float, default=0.3)
+    parser.add_argument("--limiar", type=float, default=0.3)
+    parser.add_argument("--amostra-legado", type=int, default=5,
+                        help="Sentenças medidas no caminho que reajusta por sentença (0 desliga)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Mede o pico alocado por etapa (deixa os tempos mais lentos)")
+    parser.add_argument("--saida", default="-", help="Arquivo JSON de saída ('-' = stdout)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    args = parser.parse_args(argv)
+
+    cenarios = [
+        {
+            'corpus': corpus, 'sentencas': sentencas, 'ngram_range': [1, ngram_max],
+            'max_features': max_features, 'vocabulario': args.vocabulario,
+            'fracao_plantada': args.fracao_plantada, 'limiar': args.limiar,
+            'amostra_legado': args.amostra_legado, 'semente': args.semente,
+            'medir_memoria': args.tracemalloc,
+        }
+        for corpus, sentencas, ngram_max, max_features in itertools.product(
+            args.corpus, args.sentencas, args.ngram_max, args.max_features)
+    ]
+
+    resultados = []
+    contexto = multiprocessing.get_context("spawn")
+    for cenario in cenarios:
+        with ProcessPoolExecutor(1, mp_context=contexto) as pool:
+            resultado = pool.submit(rodar_cenario, cenario).result()
+        print(f"corpus={resultado['corpus']} sentencas={resultado['sentencas']} "
+              f"ngram={resultado['ngram_range']} max_features={resultado['max_features']}: "
+              f"ajuste {resultado['tempo_ajuste_s']:.3f}s, pontuação {resultado['tempo_pontuacao_s']:.3f}s, "
+              f"recall {resultado['recall']}", file=sys.stderr)
+        resultados.append(resultado)
+
+    relatorio = {'metadados': metadados(), 'resultados': resultados}
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultados, json.load(f)['resultados'])
+
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida == "-":
+        print(texto)
+    else:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+
+
+if __name__ == "__main__":
+    main()
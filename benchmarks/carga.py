@@ -0,0 +1,155 @@
+import time
+import platform
+import resource
+import threading
+import subprocess
+import tracemalloc
+from importlib import metadata
+
+# Utilitários comuns dos benchmarks: cronometragem com pico de memória,
+# percentis, clientes concorrentes e perfil por etapa
+#
+# Os percentis são exatos (np.percentile sobre todas as amostras), como no
+# resumo do emotion_metrics. O pico alocado vem do tracemalloc, que enxerga
+# o Python e os arrays do numpy mas não a memória nativa de TensorFlow ou
+# OpenCV; para essa, o relatório traz o quanto cada etapa empurrou o pico
+# de RSS do processo.
+
+
+def medir(funcao, *args, medir_memoria=False, **kwargs):
+    """(resultado, segundos, pico alocado em bytes ou None)
+
+    O tracemalloc deixa o código bem mais lento, então só é ligado quando
+    pedido; nesse caso os tempos não são comparáveis com execuções sem ele.
+    """
+    if medir_memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    duracao = time.perf_counter() - inicio
+    pico = None
+    if medir_memoria:
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return resultado, duracao, pico
+
+
+def pico_rss():
+    """Pico de RSS do processo em bytes (ru_maxrss vem em KiB no Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentis(segundos):
+    """Resumo de uma lista de durações em ms: p50, p95, p99, média e máximo"""
+    import numpy as np
+    if not segundos:
+        return {}
+    ms = 1000 * np.asarray(segundos, dtype=np.float64)
+    return {
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'media_ms': float(ms.mean()),
+        'max_ms': float(ms.max()),
+    }
+
+
+def executar_clientes(requisicao, itens, clientes):
+    """Processa `itens` com `clientes` threads, cada uma fazendo uma requisição por vez
+
+    Retorna as latências (s) das requisições que terminaram sem erro, as
+    exceções das que falharam (que ficam fora dos percentis) e a duração
+    total, de onde sai a vazão.
+    """
+    proximo = iter(itens)
+    lock = threading.Lock()
+    latencias, erros = [], []
+
+    def cliente():
+        while True:
+            with lock:
+                item = next(proximo, None)
+            if item is None:
+                return
+            inicio = time.perf_counter()
+            try:
+                requisicao(item)
+            except Exception as e:
+                erros.append(repr(e))
+            else:
+                latencias.append(time.perf_counter() - inicio)
+
+    threads = [threading.Thread(target=cliente, name=f"cliente-{i}") for i in range(clientes)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'latencias': latencias, 'erros': erros, 'duracao_s': time.perf_counter() - inicio}
+
+
+def perfil_etapas(etapas, itens):
+    """Duração e memória de cada etapa, rodando as etapas em sequência para cada item
+
+    `etapas` é uma lista de (nome, função); cada função recebe o dicionário
+    de estado (que começa com {'item': item}) e guarda nele o que as etapas
+    seguintes usam. A primeira passada mede só o tempo; a segunda repete
+    com o tracemalloc ligado e guarda o maior pico de cada etapa acima do
+    que já estava alocado quando ela começou.
+    """
+    duracoes = {nome: [] for nome, _ in etapas}
+    picos = dict.fromkeys(duracoes, 0)
+    aumentos_rss = dict.fromkeys(duracoes, 0)
+
+    for item in itens:
+        estado = {'item': item}
+        for nome, funcao in etapas:
+            inicio = time.perf_counter()
+            funcao(estado)
+            duracoes[nome].append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        for item in itens:
+            estado = {'item': item}
+            for nome, funcao in etapas:
+                atual, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                rss = pico_rss()
+                funcao(estado)
+                _, pico = tracemalloc.get_traced_memory()
+                picos[nome] = max(picos[nome], pico - atual)
+                aumentos_rss[nome] += pico_rss() - rss
+    finally:
+        tracemalloc.stop()
+
+    return {
+        nome: {**percentis(duracoes[nome]), 'pico_alocado_bytes': picos[nome],
+               'aumento_pico_rss_bytes': aumentos_rss[nome]}
+        for nome in duracoes
+    }
+
+
+def metadados(pacotes=()):
+    """Data, commit, Python, plataforma e versão dos pacotes (nome no relatório -> distribuição)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    versoes = {}
+    for chave, distribuicoes in dict(pacotes).items():
+        # Uma tupla lista nomes alternativos da mesma biblioteca (ex.: opencv-python-headless)
+        versoes[chave] = None
+        for distribuicao in (distribuicoes,) if isinstance(distribuicoes, str) else distribuicoes:
+            try:
+                versoes[chave] = metadata.version(distribuicao)
+                break
+            except metadata.PackageNotFoundError:
+                continue
+    return {
+        'data': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        **versoes,
+    }
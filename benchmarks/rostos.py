@@ -0,0 +1,72 @@
+import os
+import random
+
+# Imagens sintéticas de rostos para os benchmarks do EmoScan
+#
+# Cada rosto é um desenho frontal simples (oval de pele, olhos, sobrancelhas,
+# nariz e boca) que o detector OpenCV/Haar reconhece como rosto. O fundo
+# é escuro, para contrastar com a pele, e tem retângulos sorteados, para a
+# etapa de contexto ter o que analisar. Servem para medir tempo e memória,
+# não a qualidade das emoções: para isso, use uma pasta com fotos reais
+# (--imagens no bench_apps).
+
+EXTENSOES = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def desenhar_rosto(imagem, centro, raio, rng):
+    """Desenha um rosto frontal de altura ~2*raio com centro em `centro`"""
+    import cv2
+    cx, cy = centro
+    pele = [rng.randint(120, 190), rng.randint(150, 200), rng.randint(190, 235)]
+    cv2.ellipse(imagem, (cx, cy), (int(raio * 0.8), raio), 0, 0, 360, pele, -1)
+    olhos_y, olhos_dx = cy - raio // 4, int(raio * 0.33)
+    for lado in (-1, 1):
+        cv2.ellipse(imagem, (cx + lado * olhos_dx, olhos_y), (raio // 7, raio // 14), 0, 0, 360, (40, 40, 40), -1)
+        cv2.line(imagem, (cx + lado * olhos_dx - raio // 6, olhos_y - raio // 5),
+                 (cx + lado * olhos_dx + raio // 6, olhos_y - raio // 5), (30, 30, 30), max(2, raio // 25))
+    cv2.line(imagem, (cx, olhos_y + raio // 10), (cx, cy + raio // 6), [int(c * 0.8) for c in pele], max(2, raio // 20))
+    # Boca sorrindo ou fechada
+    inicio = 0 if rng.random() < 0.5 else 180
+    cv2.ellipse(imagem, (cx, cy + raio // 2), (raio // 3, raio // 8), 0, inicio, inicio + 180, (50, 50, 120),
+                max(2, raio // 20))
+
+
+def gerar_imagem(rng, largura=640, altura=480, rostos=1):
+    """Imagem BGR com `rostos` rostos lado a lado sobre um fundo sorteado"""
+    import cv2
+    import numpy as np
+    imagem = np.full((altura, largura, 3), [rng.randint(20, 110) for _ in range(3)], dtype=np.uint8)
+    for _ in range(rng.randint(0, 6)):
+        x, y = rng.randrange(largura), rng.randrange(altura)
+        cor = [rng.randint(0, 255) for _ in range(3)]
+        cv2.rectangle(imagem, (x, y), (x + rng.randint(20, 120), y + rng.randint(20, 90)), cor, -1)
+    celula = largura // rostos
+    raio = int(min(celula * 0.4, altura * 0.3))
+    for i in range(rostos):
+        centro = (celula * i + celula // 2 + rng.randint(-celula // 10, celula // 10),
+                  altura // 2 + rng.randint(-altura // 10, altura // 10))
+        desenhar_rosto(imagem, centro, raio, rng)
+    return cv2.GaussianBlur(imagem, (5, 5), 0)
+
+
+def gerar_pasta(diretorio, n, semente=0, largura=640, altura=480, max_rostos=2):
+    """Grava `n` imagens JPEG em `diretorio` e retorna os caminhos"""
+    import cv2
+    rng = random.Random(semente)
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for i in range(n):
+        caminho = os.path.join(diretorio, f"rosto_{i:04d}.jpg")
+        cv2.imwrite(caminho, gerar_imagem(rng, largura, altura, rng.randint(1, max_rostos)))
+        caminhos.append(caminho)
+    return caminhos
+
+
+def ler_pasta(diretorio):
+    """Bytes de cada imagem da pasta (como um upload), em ordem de nome"""
+    imagens = []
+    for nome in sorted(os.listdir(diretorio)):
+        if nome.lower().endswith(EXTENSOES):
+            with open(os.path.join(diretorio, nome), 'rb') as f:
+                imagens.append(f.read())
+    return imagens
@@ -0,0 +1,81 @@
+import random
+
+# Gerador de corpus sintético "parecido com português" para os benchmarks
+#
+# As palavras de conteúdo são montadas com sílabas e terminações comuns do
+# português e sorteadas com distribuição de Zipf; as palavras funcionais
+# são reais. Os documentos misturam sentenças novas com paráfrases
+# plantadas (troca, remoção e inserção de palavras) de sentenças da base,
+# e guardam qual sentença da base originou cada paráfrase.
+
+FUNCIONAIS = [
+    "de", "a", "o", "que", "e", "do", "da", "em", "um", "para", "com", "não",
+    "uma", "os", "no", "se", "na", "por", "mais", "as", "dos", "como", "mas",
+    "ao", "das", "à", "seu", "sua", "ou", "quando", "muito", "nos", "já",
+]
+SILABAS = [
+    "ba", "be", "ca", "co", "da", "de", "di", "fa", "ga", "la", "le", "li",
+    "ma", "me", "mi", "mo", "na", "ne", "no", "pa", "pe", "po", "ra", "re",
+    "ri", "ro", "sa", "se", "si", "ta", "te", "ti", "to", "va", "ve", "vi",
+]
+TERMINACOES = ["ção", "mente", "dade", "ar", "er", "ir", "ado", "ido", "ivo", "al", "ista", "ismo", "o", "a"]
+
+
+class GeradorCorpus:
+    """Gera base de referência e documentos com paráfrases plantadas"""
+
+    def __init__(self, tamanho_vocabulario=5000, semente=0):
+        self.rng = random.Random(semente)
+        vistas = set()
+        while len(vistas) < tamanho_vocabulario:
+            palavra = "".join(self.rng.choices(SILABAS, k=self.rng.randint(1, 3))) + self.rng.choice(TERMINACOES)
+            vistas.add(palavra)
+        self.vocabulario = sorted(vistas)
+        self.rng.shuffle(self.vocabulario)
+        # Pesos de Zipf: a k-ésima palavra mais comum tem peso 1/k
+        self.pesos = [1 / (k + 1) for k in range(len(self.vocabulario))]
+
+    def _palavras(self, n):
+        return self.rng.choices(self.vocabulario, weights=self.pesos, k=n)
+
+    def sentenca(self, minimo=8, maximo=25):
+        """Sentença com ~30% de palavras funcionais"""
+        n = self.rng.randint(minimo, maximo)
+        palavras = []
+        for conteudo in self._palavras(n):
+            if self.rng.random() < 0.3:
+                palavras.append(self.rng.choice(FUNCIONAIS))
+            palavras.append(conteudo)
+        return " ".join(palavras).capitalize()
+
+    def base(self, n_sentencas):
+        return [self.sentenca() + "." for _ in range(n_sentencas)]
+
+    def parafrasear(self, sentenca, intensidade=0.25):
+        """Troca, remove e insere uma fração `intensidade` das palavras"""
+        palavras = sentenca.rstrip(".").lower().split()
+        resultado = []
+        for palavra in palavras:
+            sorteio = self.rng.random()
+            if sorteio < intensidade / 3:
+                continue
+            elif sorteio < 2 * intensidade / 3:
+                resultado.append(self._palavras(1)[0])
+            else:
+                resultado.append(palavra)
+                if sorteio > 1 - intensidade / 3:
+                    resultado.append(self.rng.choice(FUNCIONAIS))
+        return " ".join(resultado).capitalize()
+
+    def documento(self, base, n_sentencas, fracao_plantada=0.3, intensidade=0.25):
+        """Retorna (sentenças, gabarito); gabarito[i] = id na base ou None"""
+        sentencas, gabarito = [], []
+        for _ in range(n_sentencas):
+            if base and self.rng.random() < fracao_plantada:
+                origem = self.rng.randrange(len(base))
+                sentencas.append(self.parafrasear(base[origem], intensidade))
+                gabarito.append(origem)
+            else:
+                sentencas.append(self.sentenca())
+                gabarito.append(None)
+        return sentencas, gabarito
@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+import threading
+from urllib.parse import quote, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from agents_cache import normalizar_titulo
+from benchmarks.sintetico import GeradorCorpus
+
+# Servidor local no lugar da API REST da Wikipedia, para os benchmarks
+#
+#   python -m benchmarks.stub_wikipedia servir --porta 8765 --atraso 0.02
+#   AGENTS_WIKIPEDIA_URL=http://127.0.0.1:8765 streamlit run agents_check.py
+#   python -m benchmarks.stub_wikipedia gravar Python "Albert Einstein"    # regrava da API real
+#
+# Responde GET .../page/summary/<título> com o resumo gravado em
+# benchmarks/fixtures/wikipedia/<Título>.json (mesmo JSON da API; o nome do
+# arquivo é o título normalizado). Títulos sem gravação recebem um resumo
+# sintético determinístico (texto do GeradorCorpus semeado pelo título),
+# exceto uma fração `fracao_404` deles, que dá 404 como uma palavra-chave
+# sem artigo. `atraso` simula o tempo de rede e de servidor de cada
+# resposta. As respostas 200 levam ETag e Cache-Control, e um If-None-Match
+# igual devolve 304, como na API real.
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "wikipedia")
+API_REAL = "https://en.wikipedia.org/api/rest_v1"
+
+
+def carregar_fixtures(diretorio=FIXTURES):
+    """Resumos gravados: título normalizado -> JSON da API"""
+    resumos = {}
+    if os.path.isdir(diretorio):
+        for nome in sorted(os.listdir(diretorio)):
+            if nome.endswith(".json"):
+                with open(os.path.join(diretorio, nome), encoding='utf-8') as f:
+                    resumos[normalizar_titulo(nome[:-len(".json")])] = json.load(f)
+    return resumos
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        stub = self.server.stub
+        if "/page/summary/" not in self.path:
+            return self._responder(404, {})
+        titulo = unquote(self.path.rsplit("/page/summary/", 1)[1].split("?", 1)[0])
+        if stub.atraso:
+            time.sleep(stub.atraso)
+        dados = stub.resumo(titulo)
+        if dados is None:
+            return self._responder(404, {'type': "https://mediawiki.org/wiki/HyperSwitch/errors/not_found",
+                                         'title': "Not found."})
+        etag = f'"{zlib.crc32(json.dumps(dados, sort_keys=True).encode("utf-8")):08x}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._responder(304, None, {"ETag": etag})
+        self._responder(200, dados, {"ETag": etag, "Cache-Control": f"max-age={stub.max_age}"})
+
+    def _responder(self, status, dados, cabecalhos=None):
+        corpo = b"" if dados is None else json.dumps(dados, ensure_ascii=False).encode('utf-8')
+        self.server.stub.contar(status)
+        self.send_response(status)
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        if dados is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class ServidorWikipedia:
+    """Stub HTTP da API de resumos; `iniciar()` sobe numa thread e `url` é a base para o BackendWikipedia"""
+
+    def __init__(self, fixtures=FIXTURES, atraso=0.0, fracao_404=0.2, sinteticos=True, max_age=3600,
+                 host="127.0.0.1", porta=0):
+        self.resumos = carregar_fixtures(fixtures)
+        self.atraso = atraso
+        self.fracao_404 = fracao_404
+        self.sinteticos = sinteticos
+        self.max_age = max_age
+        self.contadores = {}
+        self._gerados = {}
+        self._lock = threading.Lock()
+        self._servidor = ThreadingHTTPServer((host, porta), _Manipulador)
+        self._servidor.daemon_threads = True
+        self._servidor.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def contar(self, status):
+        with self._lock:
+            self.contadores[status] = self.contadores.get(status, 0) + 1
+
+    def resumo(self, titulo):
+        """JSON do resumo de um título, ou None (404)"""
+        chave = normalizar_titulo(titulo)
+        if chave in self.resumos:
+            return self.resumos[chave]
+        if chave not in self._gerados:
+            self._gerados[chave] = self._sintetico(titulo, chave)
+        return self._gerados[chave]
+
+    def _sintetico(self, titulo, chave):
+        semente = zlib.crc32(chave.encode('utf-8'))
+        if not self.sinteticos or semente % 1000 < self.fracao_404 * 1000:
+            return None
+        gerador = GeradorCorpus(tamanho_vocabulario=300, semente=semente)
+        # O título aparece no texto, como num artigo de verdade
+        extrato = " ".join([titulo.replace("_", " ").capitalize(), gerador.sentenca().lower() + "."]
+                           + [gerador.sentenca() + "." for _ in range(2)])
+        return {
+            'type': "standard",
+            'title': chave.replace("_", " "),
+            'extract': extrato,
+            'content_urls': {'desktop': {'page': f"{self.url}/wiki/{quote(chave)}"}},
+        }
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="stub-wikipedia", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        # shutdown() espera o serve_forever, então só vale se o servidor foi iniciado
+        if self._thread is not None:
+            self._servidor.shutdown()
+            self._thread = None
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *erro):
+        self.parar()
+
+
+def gravar(titulos, diretorio=FIXTURES, base_url=API_REAL):
+    """Baixa os resumos da API real e grava como fixtures"""
+    from agents_retrieval import BackendWikipedia
+    backend = BackendWikipedia(base_url)
+    os.makedirs(diretorio, exist_ok=True)
+    for titulo in titulos:
+        resposta = backend.obter(titulo)
+        if resposta["status"] != 200:
+            print(f"{titulo}: HTTP {resposta['status']}", file=sys.stderr)
+            continue
+        with open(os.path.join(diretorio, normalizar_titulo(titulo) + ".json"), 'w', encoding='utf-8') as f:
+            json.dump(resposta["dados"], f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"{titulo}: gravado", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub local da API de resumos da Wikipedia")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_servir = sub.add_parser("servir", help="Sobe o stub e fica servindo até Ctrl+C")
+    p_servir.add_argument("--porta", type=int, default=8765)
+    p_servir.add_argument("--atraso", type=float, default=0.0, help="Atraso (s) de cada resposta")
+    p_servir.add_argument("--fracao-404", type=float, default=0.2,
+                          help="Fração dos títulos sem fixture que dão 404")
+    p_servir.add_argument("--sem-sinteticos", action="store_true", help="Títulos sem fixture sempre dão 404")
+    p_servir.add_argument("--fixtures", default=FIXTURES)
+
+    p_gravar = sub.add_parser("gravar", help="Grava resumos da API real como fixtures")
+    p_gravar.add_argument("titulos", nargs="+")
+    p_gravar.add_argument("--fixtures", default=FIXTURES)
+    p_gravar.add_argument("--url", default=API_REAL)
+    args = parser.parse_args(argv)
+
+    if args.comando == "gravar":
+        gravar(args.titulos, args.fixtures, args.url)
+        return
+    stub = ServidorWikipedia(args.fixtures, args.atraso, args.fracao_404, not args.sem_sinteticos,
+                             porta=args.porta).iniciar()
+    print(f"Servindo {len(stub.resumos)} resumos gravados em {stub.url}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
-import streamlit as st
-import numpy as np
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import random
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+from corpus_index import IndiceCorpus
+from score_cache import CacheSimilaridade
+from text_core.tardio import ModuloTardio, recurso_streamlit
+from text_core.sentencas import SEPARADOR_SENTENCAS, dividir_em_sentencas, segmentar_fluxo
+from text_core.similaridade import cosseno, topk_similares
 
-st.title("📝 Assistente de Escrita Acadêmica")
-st.write("Detecta plágio semântico e sugere melhorias")
+# numpy, sklearn e streamlit só são importados quando usados: o CLI e os
+# workers de lote importam este módulo sem carregar a interface
+np = ModuloTardio("numpy")
 
 # Base de conhecimento simulada (textos "conhecidos")
 BASE_TEXTOS = {
@@ -37,91 +43,441 @@ def preparar_base_conhecimento():
         todos_textos.extend(textos)
     return todos_textos
 
-def dividir_em_sentencas(texto):
-    """Divide texto em sentenças"""
-    # Regex simples para dividir sentenças
-    sentencas = re.split(r'[.!?]+', texto)
-    # Remove sentenças muito curtas
-    sentencas = [s.strip() for s in sentencas if len(s.strip()) > 20]
-    return sentencas
+def em_lotes(iteravel, tamanho):
+    """Agrupa um iterável em listas de até `tamanho` itens"""
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+class IndiceSimilaridade:
+    """Índice TF-IDF da base: ajusta uma vez e mantém a matriz em memória"""
+
+    def __init__(self, ngram_range=(1, 2), max_features=1000):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self.vectorizer = TfidfVectorizer(
+            stop_words=None,  # Mantém simples
+            ngram_range=ngram_range,  # Uni e bigramas
+            max_features=max_features
+        )
+        self.textos = []
+        self.matriz = None
+
+    def ajustar(self, base_textos):
+        """Ajusta o TF-IDF na base e guarda a matriz esparsa (linhas normalizadas)"""
+        self.textos = list(base_textos)
+        self.matriz = self.vectorizer.fit_transform(self.textos).tocsr()
+        self._chave_versao = None
+        return self
+
+    @property
+    def chave_versao(self):
+        """Identifica o conteúdo do índice (usado como parte da chave do cache)"""
+        if getattr(self, '_chave_versao', None) is None:
+            conteudo = repr(sorted(self.vectorizer.get_params().items())) + "\x00" + "\x00".join(self.textos)
+            self._chave_versao = hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+        return self._chave_versao
+
+    def similaridades(self, sentencas):
+        """Similaridade de cosseno de cada sentença com toda a base
+
+        Um único transform e um único produto esparso para o lote inteiro;
+        retorna uma matriz densa (n_sentencas x n_base).
+        """
+        consultas = self.transformar(sentencas)
+        # TF-IDF já normaliza as linhas (norma L2), então o produto é o cosseno
+        return cosseno(consultas, self.matriz)
+
+    def transformar(self, sentencas):
+        if self.matriz is None:
+            raise ValueError("Índice ainda não foi ajustado")
+        return self.vectorizer.transform(list(sentencas))
+
+    def linhas(self, ids):
+        """Linhas TF-IDF da base para os ids dados"""
+        return self.matriz[np.asarray(ids, dtype=np.int64)]
+
+    def itens(self):
+        return enumerate(self.textos)
+
+    def blocos_base(self, tamanho):
+        """Fatias (ids, linhas) da base com no máximo `tamanho` linhas"""
+        for inicio in range(0, len(self.textos), tamanho):
+            fim = min(inicio + tamanho, len(self.textos))
+            yield np.arange(inicio, fim), self.matriz[inicio:fim]
+
+    def __len__(self):
+        return len(self.textos)
+
+    def texto(self, i):
+        return self.textos[i]
+
+    def salvar(self, caminho):
+        """Salva o índice ajustado em disco"""
+        with open(caminho, 'wb') as f:
+            pickle.dump({'vectorizer': self.vectorizer, 'textos': self.textos, 'matriz': self.matriz}, f)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Carrega um índice salvo com `salvar`"""
+        with open(caminho, 'rb') as f:
+            dados = pickle.load(f)
+        indice = cls.__new__(cls)
+        indice.vectorizer = dados['vectorizer']
+        indice.textos = dados['textos']
+        indice.matriz = dados['matriz']
+        return indice
+
+@recurso_streamlit
+def carregar_indice():
+    """Ajusta o índice da base uma única vez por processo (compartilhado entre sessões)
+
+    Se COPY_DETECTOR_INDICE apontar para um índice criado com corpus_index.py,
+    usa o corpus em disco no lugar de BASE_TEXTOS.
+    """
+    diretorio = os.environ.get("COPY_DETECTOR_INDICE")
+    if diretorio:
+        return IndiceCorpus.abrir(diretorio)
+    return IndiceSimilaridade().ajustar(preparar_base_conhecimento())
+
+@recurso_streamlit
+def carregar_cache():
+    """Cache de resultados em disco, compartilhado entre sessões
+
+    O arquivo pode ser trocado com COPY_DETECTOR_CACHE.
+    """
+    caminho = os.environ.get("COPY_DETECTOR_CACHE",
+                             os.path.join(tempfile.gettempdir(), "copy_detector_cache.sqlite"))
+    return CacheSimilaridade(caminho)
 
 def calcular_similaridade(texto_usuario, base_textos):
     """Calcula similaridade usando TF-IDF"""
-    # Combina texto do usuário com base
-    todos_textos = [texto_usuario] + base_textos
-    
-    # TF-IDF
-    vectorizer = TfidfVectorizer(
-        stop_words=None,  # Mantém simples
-        ngram_range=(1, 2),  # Uni e bigramas
-        max_features=1000
-    )
+    indice = base_textos if hasattr(base_textos, 'similaridades') else IndiceSimilaridade().ajustar(base_textos)
     
     try:
-        tfidf_matrix = vectorizer.fit_transform(todos_textos)
-        
-        # Similaridade do texto do usuário com cada texto da base
-        similaridades = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:]).flatten()
-        
-        return similaridades
+        return indice.similaridades([texto_usuario]).flatten()
     except:
         # Se der erro, retorna similaridades baixas
-        return np.zeros(len(base_textos))
+        return np.zeros(len(indice))
 
-def detectar_plagio(sentencas_usuario, base_textos, threshold=0.3):
-    """Detecta possível plágio em cada sentença"""
+def classificar(max_sim, threshold=0.3):
+    """Status de risco a partir da similaridade máxima"""
+    if max_sim > 0.6:
+        return "alto_risco"
+    elif max_sim > threshold:
+        return "suspeito"
+    return "ok"
+
+def pontuar_topk(sentencas, indice, top_k=5, cache=None, **blocos):
+    """(scores, ids) dos `top_k` mais similares de cada sentença
+
+    Com `cache` (um `CacheSimilaridade`), só as sentenças que não estão no
+    cache para a versão atual do índice são pontuadas.
+    """
+    n = len(sentencas)
+    scores = np.full((n, top_k), -1.0, dtype=np.float32)
+    ids = np.full((n, top_k), -1, dtype=np.int64)
+    faltando = list(range(n))
+    
+    if cache is not None:
+        achados = cache.obter(sentencas, indice.chave_versao, top_k)
+        for posicao, (sc, ii) in achados.items():
+            scores[posicao], ids[posicao] = sc, ii
+        faltando = [i for i in range(n) if i not in achados]
+    
+    if faltando:
+        novas = [sentencas[i] for i in faltando]
+        sc, ii = topk_similares(indice.transformar(novas), indice, top_k, **blocos)
+        scores[faltando], ids[faltando] = sc, ii
+        if cache is not None:
+            cache.guardar(novas, indice.chave_versao, sc, ii)
+    
+    return scores, ids
+
+def detectar_plagio(sentencas_usuario, base_textos, threshold=0.3, candidatos=None, top_k=50, cache=None):
+    """Detecta possível plágio em cada sentença
+
+    `base_textos` pode ser a lista de textos ou um índice já pronto
+    (`IndiceSimilaridade` ou `IndiceCorpus`); neste caso o modelo não é
+    reajustado a cada chamada.
+
+    Com `candidatos` (um `IndiceLSH`), o cosseno exato é calculado só contra
+    os `top_k` candidatos de cada sentença em vez de contra toda a base.
+
+    Com `cache` (um `CacheSimilaridade`), sentenças já vistas com a mesma
+    versão do índice não são pontuadas de novo; só o limiar é reaplicado.
+    Com os dois, o cache (que só guarda resultados exatos) responde o que
+    já tem e só as faltas passam pelos candidatos do LSH; os resultados
+    aproximados do LSH não são guardados.
+    """
+    if hasattr(base_textos, 'similaridades'):
+        indice = base_textos
+    else:
+        indice = IndiceSimilaridade().ajustar(base_textos)
+    
     resultados = []
+    if not sentencas_usuario:
+        return resultados
+    
+    n = len(sentencas_usuario)
+    maximos = np.zeros(n)
+    indices_similares = np.zeros(n, dtype=np.int64)
+    
+    if candidatos is None:
+        # Todas as sentenças de uma vez, em blocos da base: só o melhor de cada
+        # sentença é guardado, sem a matriz densa sentenças x base inteira
+        try:
+            scores, ids = pontuar_topk(sentencas_usuario, indice, 1, cache)
+        except ValueError:
+            scores, ids = np.zeros((n, 1)), np.zeros((n, 1), dtype=np.int64)
+        maximos = np.maximum(scores[:, 0], 0)
+        indices_similares = np.maximum(ids[:, 0], 0)
+    else:
+        faltando = list(range(n))
+        if cache is not None:
+            achados = cache.obter(sentencas_usuario, indice.chave_versao, 1)
+            for posicao, (sc, ii) in achados.items():
+                maximos[posicao], indices_similares[posicao] = max(sc[0], 0), max(ii[0], 0)
+            faltando = [i for i in range(n) if i not in achados]
+        consultas = indice.transformar([sentencas_usuario[i] for i in faltando]) if faltando else None
+        for linha, i in enumerate(faltando):
+            ids = candidatos.candidatos(sentencas_usuario[i], top_k)
+            if not ids:
+                continue
+            similaridades = (consultas[linha] @ indice.linhas(ids).T).toarray().ravel()
+            melhor = int(np.argmax(similaridades))
+            maximos[i] = similaridades[melhor]
+            indices_similares[i] = ids[melhor]
     
     for i, sentenca in enumerate(sentencas_usuario):
-        similaridades = calcular_similaridade(sentenca, base_textos)
-        max_sim = np.max(similaridades)
-        idx_similar = np.argmax(similaridades)
-        
-        status = "ok"
-        if max_sim > 0.6:
-            status = "alto_risco"
-        elif max_sim > threshold:
-            status = "suspeito"
+        max_sim = float(maximos[i])
         
         resultados.append({
             'sentenca': sentenca,
             'similaridade_maxima': max_sim,
-            'texto_similar': base_textos[idx_similar] if len(base_textos) > idx_similar else "",
-            'status': status,
+            'texto_similar': indice.texto(int(indices_similares[i])) if max_sim > 0 else "",
+            'status': classificar(max_sim, threshold),
             'posicao': i
         })
     
     return resultados
 
-def sugerir_reescrita(sentenca):
-    """Sugere reescritas simples"""
-    sugestoes = []
+def detectar_plagio_fluxo(fluxo, base_textos, threshold=0.3, tamanho_lote=256, **kwargs):
+    """Versão em streaming de `detectar_plagio` para documentos muito grandes
+
+    Lê o texto com `segmentar_fluxo` e pontua lotes fixos de sentenças,
+    gerando os resultados conforme cada lote termina; a memória depende do
+    tamanho do lote, não do tamanho do documento.
+    """
+    if not hasattr(base_textos, 'similaridades'):
+        base_textos = IndiceSimilaridade().ajustar(base_textos)
     
-    # Regras simples de reescrita
-    regras = [
-        # Voz passiva para ativa
-        (r'é (usado|utilizado|empregado)', r'usa-se'),
-        (r'são (usados|utilizados|empregados)', r'usam-se'),
-        
-        # Sinônimos comuns
-        (r'utilizar', r'usar'),
-        (r'realizar', r'fazer'),
-        (r'desenvolver', r'criar'),
-        (r'implementar', r'aplicar'),
-        
-        # Estruturas alternativas
-        (r'é possível', r'pode-se'),
-        (r'é importante', r'cabe destacar'),
-        (r'é necessário', r'deve-se'),
-    ]
+    deslocamento = 0
+    for lote in em_lotes(segmentar_fluxo(fluxo), tamanho_lote):
+        for resultado in detectar_plagio(lote, base_textos, threshold, **kwargs):
+            resultado['posicao'] += deslocamento
+            yield resultado
+        deslocamento += len(lote)
+
+def verificar_documentos(documentos, indice, top_k=5, threshold=0.3, bloco_sentencas=256, bloco_base=32768,
+                         cache=None):
+    """Verifica vários documentos de uma vez; gera um resultado por documento
+
+    `documentos` é um iterável de textos ou de pares (id, texto). As sentenças
+    de vários documentos são agrupadas em lotes de ~`bloco_sentencas` e
+    pontuadas com `topk_similares`, então a memória fica limitada pelo
+    tamanho do lote e não pelo número de documentos. Com `cache`, só as
+    sentenças que mudaram desde a última verificação são pontuadas.
+    """
+    pendentes = []
+    total = 0
+
+    def processar(pendentes):
+        todas = [s for _, sentencas in pendentes for s in sentencas]
+        if todas:
+            scores, ids = pontuar_topk(todas, indice, top_k, cache,
+                                       bloco_consultas=bloco_sentencas, bloco_base=bloco_base)
+        linha = 0
+        for id_doc, sentencas in pendentes:
+            itens = []
+            for posicao, sentenca in enumerate(sentencas):
+                similares = [
+                    {'id': int(i), 'texto': indice.texto(int(i)), 'similaridade': float(sc)}
+                    for sc, i in zip(scores[linha], ids[linha]) if i >= 0 and sc > 0
+                ]
+                max_sim = similares[0]['similaridade'] if similares else 0.0
+                itens.append({
+                    'sentenca': sentenca,
+                    'posicao': posicao,
+                    'similaridade_maxima': max_sim,
+                    'status': classificar(max_sim, threshold),
+                    'similares': similares
+                })
+                linha += 1
+            yield {
+                'documento': id_doc,
+                'sentencas': itens,
+                'resumo': {status: sum(1 for item in itens if item['status'] == status)
+                           for status in ("alto_risco", "suspeito", "ok")}
+            }
+
+    for numero, documento in enumerate(documentos):
+        id_doc, texto = documento if isinstance(documento, tuple) else (numero, documento)
+        sentencas = dividir_em_sentencas(texto)
+        pendentes.append((id_doc, sentencas))
+        total += len(sentencas)
+        if total >= bloco_sentencas:
+            yield from processar(pendentes)
+            pendentes, total = [], 0
+    if pendentes:
+        yield from processar(pendentes)
+
+# Regras simples de reescrita (padrão, substituto)
+REGRAS_REESCRITA = [
+    # Voz passiva para ativa
+    (r'é (usado|utilizado|empregado)', r'usa-se'),
+    (r'são (usados|utilizados|empregados)', r'usam-se'),
     
-    texto_reescrito = sentenca
-    mudancas_feitas = []
+    # Sinônimos comuns
+    (r'utilizar', r'usar'),
+    (r'realizar', r'fazer'),
+    (r'desenvolver', r'criar'),
+    (r'implementar', r'aplicar'),
     
-    for padrao, substituto in regras:
-        if re.search(padrao, texto_reescrito, re.IGNORECASE):
-            texto_reescrito = re.sub(padrao, substituto, texto_reescrito, flags=re.IGNORECASE)
-            mudancas_feitas.append(f"'{padrao}' → '{substituto}'")
+    # Estruturas alternativas
+    (r'é possível', r'pode-se'),
+    (r'é importante', r'cabe destacar'),
+    (r'é necessário', r'deve-se'),
+]
+
+def _isolar_grupos(padrao, prefixo):
+    """Reescreve os grupos de uma regra como grupos nomeados `<prefixo><n>`
+
+    Na alternação de todas as regras a numeração dos grupos de cada uma é
+    deslocada (e nomes podem se repetir entre regras), então retrovisores
+    como \\1, (?P=nome) e (?(1)...) passam a apontar para os nomes novos.
+    """
+    saida, nomes, grupo, i, n = [], {}, 0, 0, len(padrao)
+
+    def referencia(ref):
+        return f"{prefixo}{int(ref) if ref.isdigit() else nomes[ref]}"
+
+    while i < n:
+        c = padrao[i]
+        if c == '\\':
+            j = i + 1
+            if j < n and padrao[j] in '123456789':
+                # Como no sre: até dois dígitos, a não ser que três octais formem um escape
+                k = j + 1
+                if k < n and padrao[k].isdigit():
+                    if padrao[j] in '01234567' and padrao[k] in '01234567' and k + 1 < n \
+                            and padrao[k + 1] in '01234567':
+                        saida.append(padrao[i:k + 2])
+                        i = k + 2
+                        continue
+                    k += 1
+                saida.append(f"(?P={referencia(padrao[j:k])})")
+                i = k
+            else:
+                saida.append(padrao[i:j + 1])
+                i = j + 1
+        elif c == '[':
+            # Classe de caracteres: copiada como está (\\1 aqui é octal); um ] logo no início é literal
+            j = i + 1
+            if j < n and padrao[j] == '^':
+                j += 1
+            if j < n and padrao[j] == ']':
+                j += 1
+            while j < n and padrao[j] != ']':
+                j += 2 if padrao[j] == '\\' else 1
+            saida.append(padrao[i:j + 1])
+            i = j + 1
+        elif c == '(' and not padrao.startswith('(?', i):
+            grupo += 1
+            saida.append(f"(?P<{prefixo}{grupo}>")
+            i += 1
+        elif padrao.startswith('(?P<', i):
+            fim = padrao.index('>', i)
+            grupo += 1
+            nomes[padrao[i + 4:fim]] = grupo
+            saida.append(f"(?P<{prefixo}{grupo}>")
+            i = fim + 1
+        elif padrao.startswith('(?P=', i) or padrao.startswith('(?(', i):
+            inicio = i + 3 if padrao[i + 2] == '(' else i + 4
+            fim = padrao.index(')', i)
+            saida.append(f"{padrao[i:inicio]}{referencia(padrao[inicio:fim])})")
+            i = fim + 1
+        elif padrao.startswith('(?#', i):
+            fim = padrao.index(')', i)
+            saida.append(padrao[i:fim + 1])
+            i = fim + 1
+        else:
+            saida.append(c)
+            i += 1
+    return "".join(saida)
+
+class MotorReescrita:
+    """Aplica todas as regras de reescrita numa única passada pelo texto
+
+    As regras são compiladas uma vez numa alternação só, cada uma dentro de
+    um grupo nomeado (r0, r1, ...); o grupo que casou identifica a regra.
+    Em caso de sobreposição vale a regra que aparece primeiro na lista.
+    O substituto é expandido casando a regra sozinha na mesma posição do
+    texto inteiro, então lookarounds e retrovisores funcionam como em
+    `re.sub` com a regra isolada.
+    """
+
+    def __init__(self, regras):
+        self.regras = [(padrao, substituto, re.compile(padrao, re.IGNORECASE)) for padrao, substituto in regras]
+        partes = [f"(?P<r{i}>{_isolar_grupos(padrao, f'r{i}_')})" for i, (padrao, _, _) in enumerate(self.regras)]
+        try:
+            self.padrao = re.compile("|".join(partes), re.IGNORECASE) if partes else None
+        except re.error as erro:
+            # Ex.: flags globais como (?i) no meio de uma regra; aponta qual regra não pode ser combinada
+            for (padrao, _, _), parte in zip(self.regras, partes):
+                try:
+                    re.compile(parte, re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"Regra de reescrita não suportada: {padrao!r} ({e})") from e
+            raise ValueError(f"Regras de reescrita não podem ser combinadas: {erro}") from erro
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        """Carrega regras de um JSON: lista de [padrão, substituto] ou de
+        objetos {"padrao": ..., "substituto": ...}"""
+        with open(caminho, encoding='utf-8') as f:
+            dados = json.load(f)
+        regras = [(r['padrao'], r['substituto']) if isinstance(r, dict) else tuple(r) for r in dados]
+        return cls(regras)
+
+    def aplicar(self, texto):
+        """Retorna (texto reescrito, índices das regras que foram aplicadas)"""
+        if self.padrao is None:
+            return texto, []
+        disparadas = set()
+
+        def substituir(m):
+            # O grupo externo da regra fecha por último, então lastgroup é ele
+            i = int(m.lastgroup[1:])
+            disparadas.add(i)
+            _, substituto, regra = self.regras[i]
+            return regra.match(m.string, m.start()).expand(substituto)
+
+        return self.padrao.sub(substituir, texto), sorted(disparadas)
+
+MOTOR_REESCRITA = MotorReescrita(REGRAS_REESCRITA)
+
+def sugerir_reescrita(sentenca, motor=None):
+    """Sugere reescritas simples"""
+    motor = motor or MOTOR_REESCRITA
+    sugestoes = []
+    
+    texto_reescrito, disparadas = motor.aplicar(sentenca)
+    mudancas_feitas = [f"'{motor.regras[i][0]}' → '{motor.regras[i][1]}'" for i in disparadas]
     
     if mudancas_feitas:
         sugestoes.append({
@@ -142,132 +498,147 @@ def sugerir_reescrita(sentenca):
     
     return sugestoes
 
-# Interface principal
-st.subheader("📄 Cole seu texto acadêmico")
+def main():
+    """Interface Streamlit"""
+    import streamlit as st
+
+    st.title("📝 Assistente de Escrita Acadêmica")
+    st.write("Detecta plágio semântico e sugere melhorias")
+
+    st.subheader("📄 Cole seu texto acadêmico")
+
+    texto_usuario = st.text_area(
+        "Texto para análise:",
+        placeholder="Cole aqui o texto que deseja verificar...",
+        height=200
+    )
 
-texto_usuario = st.text_area(
-    "Texto para análise:",
-    placeholder="Cole aqui o texto que deseja verificar...",
-    height=200
-)
+    col1, col2 = st.columns([1, 3])
 
-col1, col2 = st.columns([1, 3])
+    with col1:
+        analisar_btn = st.button("🔍 Analisar", type="primary")
 
-with col1:
-    analisar_btn = st.button("🔍 Analisar", type="primary")
+    with col2:
+        threshold = st.slider("Sensibilidade", 0.1, 0.8, 0.3, 0.1, 
+                             help="Quão similar precisa ser para considerar suspeito")
 
-with col2:
-    threshold = st.slider("Sensibilidade", 0.1, 0.8, 0.3, 0.1, 
-                         help="Quão similar precisa ser para considerar suspeito")
+    # O resultado continua na tela quando outro widget (ex.: o slider) roda o
+    # script de novo; com o cache, só a classificação é refeita
+    if analisar_btn and texto_usuario.strip():
+        st.session_state['texto_analisado'] = texto_usuario
+    mostrar_resultado = bool(texto_usuario.strip()) and st.session_state.get('texto_analisado') == texto_usuario
 
-if analisar_btn and texto_usuario.strip():
+    if mostrar_resultado:
     
-    st.write("---")
-    st.subheader("📊 Resultado da Análise")
+        st.write("---")
+        st.subheader("📊 Resultado da Análise")
     
-    # Preparar dados
-    base_textos = preparar_base_conhecimento()
-    sentencas = dividir_em_sentencas(texto_usuario)
+        # Preparar dados
+        indice = carregar_indice()
+        sentencas = dividir_em_sentencas(texto_usuario)
     
-    if not sentencas:
-        st.warning("⚠️ Texto muito curto ou sem sentenças válidas")
-    else:
-        # Análise de plágio
-        with st.spinner("Analisando similaridades semânticas..."):
-            resultados = detectar_plagio(sentencas, base_textos, threshold)
+        if not sentencas:
+            st.warning("⚠️ Texto muito curto ou sem sentenças válidas")
+        else:
+            # Análise de plágio
+            with st.spinner("Analisando similaridades semânticas..."):
+                resultados = detectar_plagio(sentencas, indice, threshold, cache=carregar_cache())
         
-        # Estatísticas gerais
-        total_sentencas = len(resultados)
-        alto_risco = len([r for r in resultados if r['status'] == 'alto_risco'])
-        suspeito = len([r for r in resultados if r['status'] == 'suspeito'])
-        ok = len([r for r in resultados if r['status'] == 'ok'])
+            # Estatísticas gerais
+            total_sentencas = len(resultados)
+            alto_risco = len([r for r in resultados if r['status'] == 'alto_risco'])
+            suspeito = len([r for r in resultados if r['status'] == 'suspeito'])
+            ok = len([r for r in resultados if r['status'] == 'ok'])
         
-        col1, col2, col3, col4 = st.columns(4)
+            col1, col2, col3, col4 = st.columns(4)
         
-        with col1:
-            st.metric("Total de sentenças", total_sentencas)
-        with col2:
-            st.metric("Alto risco", alto_risco, delta=f"{alto_risco/total_sentencas*100:.1f}%")
-        with col3:
-            st.metric("Suspeitas", suspeito, delta=f"{suspeito/total_sentencas*100:.1f}%")
-        with col4:
-            st.metric("OK", ok, delta=f"{ok/total_sentencas*100:.1f}%")
+            with col1:
+                st.metric("Total de sentenças", total_sentencas)
+            with col2:
+                st.metric("Alto risco", alto_risco, delta=f"{alto_risco/total_sentencas*100:.1f}%")
+            with col3:
+                st.metric("Suspeitas", suspeito, delta=f"{suspeito/total_sentencas*100:.1f}%")
+            with col4:
+                st.metric("OK", ok, delta=f"{ok/total_sentencas*100:.1f}%")
         
-        # Análise detalhada
-        st.write("### 🔍 Análise Detalhada")
+            # Análise detalhada
+            st.write("### 🔍 Análise Detalhada")
         
-        for resultado in resultados:
+            for resultado in resultados:
             
-            if resultado['status'] == 'alto_risco':
-                cor = '🔴'
-                tipo = 'ALTO RISCO'
-                color = 'red'
-            elif resultado['status'] == 'suspeito':
-                cor = '🟡'
-                tipo = 'SUSPEITO'
-                color = 'orange'
-            else:
-                cor = '🟢'
-                tipo = 'OK'
-                color = 'green'
+                if resultado['status'] == 'alto_risco':
+                    cor = '🔴'
+                    tipo = 'ALTO RISCO'
+                    color = 'red'
+                elif resultado['status'] == 'suspeito':
+                    cor = '🟡'
+                    tipo = 'SUSPEITO'
+                    color = 'orange'
+                else:
+                    cor = '🟢'
+                    tipo = 'OK'
+                    color = 'green'
             
-            with st.expander(f"{cor} Sentença {resultado['posicao']+1} - {tipo} ({resultado['similaridade_maxima']:.1%})"):
+                with st.expander(f"{cor} Sentença {resultado['posicao']+1} - {tipo} ({resultado['similaridade_maxima']:.1%})"):
                 
-                st.markdown(f"**Texto analisado:**")
-                st.write(f"_{resultado['sentenca']}_")
+                    st.markdown(f"**Texto analisado:**")
+                    st.write(f"_{resultado['sentenca']}_")
                 
-                if resultado['status'] != 'ok':
-                    st.markdown(f"**Texto similar encontrado:**")
-                    st.write(f"_{resultado['texto_similar']}_")
+                    if resultado['status'] != 'ok':
+                        st.markdown(f"**Texto similar encontrado:**")
+                        st.write(f"_{resultado['texto_similar']}_")
                     
-                    st.markdown(f"**Similaridade:** {resultado['similaridade_maxima']:.1%}")
+                        st.markdown(f"**Similaridade:** {resultado['similaridade_maxima']:.1%}")
                     
-                    # Sugestões de reescrita
-                    if resultado['status'] == 'alto_risco':
-                        st.write("**💡 Sugestões de Reescrita:**")
-                        sugestoes = sugerir_reescrita(resultado['sentenca'])
+                        # Sugestões de reescrita
+                        if resultado['status'] == 'alto_risco':
+                            st.write("**💡 Sugestões de Reescrita:**")
+                            sugestoes = sugerir_reescrita(resultado['sentenca'])
                         
-                        for sugestao in sugestoes:
-                            st.write(f"**{sugestao['tipo']}:**")
-                            st.write(f"🔄 _{sugestao['sugestao']}_")
-                            if sugestao['mudancas']:
-                                st.write(f"Mudanças: {', '.join(sugestao['mudancas'])}")
-                            st.write("---")
-
-elif analisar_btn:
-    st.warning("⚠️ Por favor, cole um texto para análise")
-
-# Informações e exemplos
-if not analisar_btn or not texto_usuario.strip():
-    st.write("---")
-    st.subheader("ℹ️ Como funciona")
+                            for sugestao in sugestoes:
+                                st.write(f"**{sugestao['tipo']}:**")
+                                st.write(f"🔄 _{sugestao['sugestao']}_")
+                                if sugestao['mudancas']:
+                                    st.write(f"Mudanças: {', '.join(sugestao['mudancas'])}")
+                                st.write("---")
+
+    elif analisar_btn:
+        st.warning("⚠️ Por favor, cole um texto para análise")
+
+    # Informações e exemplos
+    if not mostrar_resultado:
+        st.write("---")
+        st.subheader("ℹ️ Como funciona")
     
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.write("**🔍 Detecção Semântica**")
-        st.write("• Usa TF-IDF + Cosine Similarity")
-        st.write("• Detecta paráfrases, não só cópias")
-        st.write("• Analisa sentença por sentença")
+        with col1:
+            st.write("**🔍 Detecção Semântica**")
+            st.write("• Usa TF-IDF + Cosine Similarity")
+            st.write("• Detecta paráfrases, não só cópias")
+            st.write("• Analisa sentença por sentença")
     
-    with col2:
-        st.write("**💡 Sugestões Inteligentes**")
-        st.write("• Substituição de termos")
-        st.write("• Reestruturação de frases")
-        st.write("• Alternativas de escrita")
+        with col2:
+            st.write("**💡 Sugestões Inteligentes**")
+            st.write("• Substituição de termos")
+            st.write("• Reestruturação de frases")
+            st.write("• Alternativas de escrita")
     
-    st.write("**🎯 Diferencial:** Vai além do Ctrl+C/Ctrl+V - detecta ideias muito similares!")
+        st.write("**🎯 Diferencial:** Vai além do Ctrl+C/Ctrl+V - detecta ideias muito similares!")
     
-    st.subheader("🧪 Teste com este exemplo:")
+        st.subheader("🧪 Teste com este exemplo:")
     
-    exemplo = """
-    Machine learning é um subcampo da inteligência artificial que permite que computadores aprendam sem programação explícita.
-    Os algoritmos de ML constroem modelos baseados em dados de treino para fazer predições.
-    Deep learning usa redes neurais com várias camadas para modelar dados complexos.
-    """
+        exemplo = """
+        Machine learning é um subcampo da inteligência artificial que permite que computadores aprendam sem programação explícita.
+        Os algoritmos de ML constroem modelos baseados em dados de treino para fazer predições.
+        Deep learning usa redes neurais com várias camadas para modelar dados complexos.
+        """
     
-    if st.button("📋 Usar exemplo"):
-        st.experimental_rerun()
+        if st.button("📋 Usar exemplo"):
+            st.experimental_rerun()
+
+    st.write("---")
+    st.caption("⚡ Desenvolvido para auxiliar na escrita acadêmica ética")
 
-st.write("---")
-st.caption("⚡ Desenvolvido para auxiliar na escrita acadêmica ética")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
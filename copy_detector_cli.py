@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from corpus_index import IndiceCorpus
+from score_cache import CacheSimilaridade
+from copy_detector import preparar_base_conhecimento, verificar_documentos, detectar_plagio_fluxo, em_lotes
+
+# Execução em lote do detector de plágio, sem Streamlit
+#
+#   python copy_detector_cli.py textos/ --indice indice/ --processos 8 > resultados.jsonl
+#   cat documentos.jsonl | python copy_detector_cli.py - --saida resultados.jsonl
+#
+# A entrada é um diretório (cada .txt vira um documento, id = caminho
+# relativo) ou um JSONL com {"id": ..., "texto": ...} por linha ("-" = stdin).
+# Os documentos são divididos em lotes e distribuídos num pool de processos;
+# cada processo abre o mesmo índice em disco (mmap), então o corpus fica uma
+# vez só no page cache. A saída é um JSONL com uma linha por documento, na
+# mesma ordem da entrada, escrita conforme os lotes terminam.
+#
+# Com --fluxo a entrada é um único documento grande (arquivo ou stdin), lido
+# em blocos; sai uma linha por sentença, conforme os lotes são pontuados.
+
+_indice = None
+_opcoes = {}
+
+
+def ler_documentos(entrada):
+    """Gera pares (id, texto) a partir de um diretório ou de um JSONL"""
+    if entrada != "-" and os.path.isdir(entrada):
+        for raiz, _, arquivos in sorted(os.walk(entrada)):
+            for nome in sorted(arquivos):
+                if nome.endswith(".txt"):
+                    caminho = os.path.join(raiz, nome)
+                    with open(caminho, encoding='utf-8') as f:
+                        yield os.path.relpath(caminho, entrada), f.read()
+        return
+
+    arquivo = sys.stdin if entrada == "-" else open(entrada, encoding='utf-8')
+    try:
+        for numero, linha in enumerate(arquivo):
+            if not linha.strip():
+                continue
+            registro = json.loads(linha)
+            yield registro.get('id', numero), registro['texto']
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def _iniciar_worker(diretorio_indice, opcoes):
+    """Abre o índice (e o cache, se houver) uma vez por processo"""
+    global _indice, _opcoes
+    _indice = IndiceCorpus.abrir(diretorio_indice)
+    _opcoes = dict(opcoes)
+    caminho_cache = _opcoes.pop('cache', None)
+    if caminho_cache:
+        _opcoes['cache'] = CacheSimilaridade(caminho_cache)
+
+
+def _verificar_lote(documentos):
+    return list(verificar_documentos(documentos, _indice, **_opcoes))
+
+
+def processar(documentos, diretorio_indice, saida, processos=1, lote=16, **opcoes):
+    """Verifica os documentos e escreve uma linha JSON por resultado
+
+    Mantém no máximo 2 lotes por processo em andamento, para que a memória
+    não cresça com o tamanho da entrada.
+    """
+    def escrever(resultados):
+        for resultado in resultados:
+            saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        saida.flush()
+
+    if processos <= 1:
+        _iniciar_worker(diretorio_indice, opcoes)
+        for documentos_lote in em_lotes(documentos, lote):
+            escrever(_verificar_lote(documentos_lote))
+        return
+
+    with ProcessPoolExecutor(processos, initializer=_iniciar_worker,
+                             initargs=(diretorio_indice, opcoes)) as pool:
+        pendentes = deque()
+        for documentos_lote in em_lotes(documentos, lote):
+            pendentes.append(pool.submit(_verificar_lote, documentos_lote))
+            if len(pendentes) >= 2 * processos:
+                escrever(pendentes.popleft().result())
+        while pendentes:
+            escrever(pendentes.popleft().result())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detector de plágio em lote (saída JSONL)")
+    parser.add_argument("entrada", help="Diretório com .txt, arquivo .jsonl ou '-' para stdin")
+    parser.add_argument("--indice", help="Diretório do índice (corpus_index.py); padrão: BASE_TEXTOS")
+    parser.add_argument("--saida", default="-", help="Arquivo JSONL de saída ('-' = stdout)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--lote", type=int, default=16, help="Documentos por tarefa")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--limiar", type=float, default=0.3, help="Limiar de 'suspeito'")
+    parser.add_argument("--cache", help="Arquivo SQLite de cache dos resultados (reaproveita sentenças já vistas)")
+    parser.add_argument("--fluxo", action="store_true",
+                        help="Trata a entrada como um único documento lido em streaming")
+    args = parser.parse_args(argv)
+
+    opcoes = {'top_k': args.top_k, 'threshold': args.limiar, 'cache': args.cache}
+    saida = sys.stdout if args.saida == "-" else open(args.saida, 'w', encoding='utf-8')
+    try:
+        if args.fluxo:
+            indice = IndiceCorpus.abrir(args.indice) if args.indice else preparar_base_conhecimento()
+            fluxo = sys.stdin if args.entrada == "-" else args.entrada
+            cache = CacheSimilaridade(args.cache) if args.cache else None
+            for resultado in detectar_plagio_fluxo(fluxo, indice, args.limiar, cache=cache):
+                saida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+                saida.flush()
+        elif args.indice:
+            processar(ler_documentos(args.entrada), args.indice, saida, args.processos, args.lote, **opcoes)
+        else:
+            # Sem índice informado, grava a base padrão num índice temporário
+            # para que os processos também a compartilhem via mmap
+            with tempfile.TemporaryDirectory() as diretorio:
+                IndiceCorpus.criar(diretorio, preparar_base_conhecimento())
+                processar(ler_documentos(args.entrada), diretorio, saida, args.processos, args.lote, **opcoes)
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    main()
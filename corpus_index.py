@@ -0,0 +1,357 @@
+import os
+import json
+import hashlib
+import argparse
+from text_core.tardio import ModuloTardio
+
+np = ModuloTardio("numpy")
+sp = ModuloTardio("scipy.sparse")
+
+# Índice de corpus de referência em disco para o detector de plágio
+#
+# Layout do diretório:
+#   manifesto.json      versão, parâmetros do TF-IDF e lista de segmentos
+#   vocabulario.json    termo -> coluna (fixo depois de criado)
+#   idf.npy             vetor IDF (fixo depois de criado)
+#   removidos.npy       ids removidos (tombstones)
+#   seg_XXXXX/          data.npy, indices.npy, indptr.npy (CSR), ids.npy,
+#                       textos.jsonl e offsets.npy (posição de cada texto)
+#
+# Os arrays são abertos com mmap_mode='r', então vários processos lendo o
+# mesmo índice compartilham as páginas pelo page cache do sistema.
+# Novos documentos viram um novo segmento (sem reajustar o vocabulário) e
+# remoções apenas marcam o id; `compactar` reescreve tudo num segmento só.
+# O identificador do manifesto é um hash do conteúdo (textos, parâmetros e
+# cada adicionar/remover), então índices iguais, como o temporário que o
+# CLI cria a cada execução, compartilham o cache de resultados.
+
+MANIFESTO = "manifesto.json"
+
+
+def _salvar_json_atomico(caminho, dados):
+    """Escreve JSON num arquivo temporário e troca de uma vez"""
+    tmp = caminho + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+    os.replace(tmp, caminho)
+
+
+def _salvar_npy_atomico(caminho, array):
+    """Mesmo que `_salvar_json_atomico`, para arrays numpy"""
+    tmp = caminho + ".tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, caminho)
+
+
+def _hash_conteudo(*partes):
+    """SHA-1 de uma sequência de textos (identificador do índice)"""
+    h = hashlib.sha1()
+    for parte in partes:
+        h.update(parte.encode('utf-8'))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class Segmento:
+    """Bloco imutável de linhas TF-IDF mapeado em memória"""
+
+    def __init__(self, diretorio, n_colunas):
+        self.diretorio = diretorio
+        data = np.load(os.path.join(diretorio, "data.npy"), mmap_mode='r')
+        indices = np.load(os.path.join(diretorio, "indices.npy"), mmap_mode='r')
+        indptr = np.load(os.path.join(diretorio, "indptr.npy"), mmap_mode='r')
+        self.ids = np.load(os.path.join(diretorio, "ids.npy"), mmap_mode='r')
+        self.offsets = np.load(os.path.join(diretorio, "offsets.npy"), mmap_mode='r')
+        self.matriz = sp.csr_matrix((data, indices, indptr), shape=(len(self.ids), n_colunas), copy=False)
+        self._textos = None
+
+    @staticmethod
+    def escrever(diretorio, matriz, ids, textos):
+        """Grava um novo segmento (matriz CSR, ids globais e textos)"""
+        os.makedirs(diretorio, exist_ok=True)
+        matriz = matriz.tocsr()
+        np.save(os.path.join(diretorio, "data.npy"), matriz.data.astype(np.float32))
+        np.save(os.path.join(diretorio, "indices.npy"), matriz.indices.astype(np.int32))
+        np.save(os.path.join(diretorio, "indptr.npy"), matriz.indptr.astype(np.int64))
+        np.save(os.path.join(diretorio, "ids.npy"), np.asarray(ids, dtype=np.int64))
+
+        offsets = []
+        with open(os.path.join(diretorio, "textos.jsonl"), 'wb') as f:
+            for texto in textos:
+                offsets.append(f.tell())
+                f.write(json.dumps(texto, ensure_ascii=False).encode('utf-8') + b"\n")
+        np.save(os.path.join(diretorio, "offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+    def texto(self, linha):
+        """Lê o texto de uma linha do segmento sem carregar os demais"""
+        if self._textos is None:
+            self._textos = open(os.path.join(self.diretorio, "textos.jsonl"), 'rb')
+        self._textos.seek(int(self.offsets[linha]))
+        return json.loads(self._textos.readline())
+
+    def fechar(self):
+        if self._textos is not None:
+            self._textos.close()
+            self._textos = None
+
+
+class IndiceCorpus:
+    """Corpus de referência em disco com vocabulário e IDF fixos"""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, MANIFESTO), encoding='utf-8') as f:
+            self.manifesto = json.load(f)
+        with open(os.path.join(diretorio, "vocabulario.json"), encoding='utf-8') as f:
+            vocabulario = json.load(f)
+        self.idf = np.load(os.path.join(diretorio, "idf.npy"))
+
+        # Reconstrói o vectorizer a partir do vocabulário e IDF salvos
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self.vectorizer = TfidfVectorizer(
+            ngram_range=tuple(self.manifesto['ngram_range']),
+            vocabulary=vocabulario,
+            dtype=np.float32
+        )
+        self.vectorizer.idf_ = self.idf
+
+        self.segmentos = [
+            Segmento(os.path.join(diretorio, seg['nome']), len(vocabulario))
+            for seg in self.manifesto['segmentos']
+        ]
+        self.removidos = np.zeros(self.manifesto['proximo_id'], dtype=bool)
+        caminho_removidos = os.path.join(diretorio, "removidos.npy")
+        if os.path.exists(caminho_removidos):
+            self.removidos[np.load(caminho_removidos)] = True
+
+    @property
+    def versao(self):
+        return self.manifesto['versao']
+
+    @property
+    def chave_versao(self):
+        """Identificador do índice + versão (muda a cada adicionar/remover)"""
+        return f"{self.manifesto.get('identificador', os.path.abspath(self.diretorio))}:{self.versao}"
+
+    def _encadear(self, operacao, *partes):
+        """Identificador novo a partir do atual e de uma alteração"""
+        return _hash_conteudo(self.manifesto.get('identificador', ""), operacao, *partes)
+
+    @classmethod
+    def criar(cls, diretorio, textos, ngram_range=(1, 2), max_features=1000):
+        """Ajusta o TF-IDF nos textos e grava um índice novo"""
+        textos = list(textos)
+        os.makedirs(diretorio, exist_ok=True)
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(
+            stop_words=None,
+            ngram_range=ngram_range,
+            max_features=max_features,
+            dtype=np.float32
+        )
+        matriz = vectorizer.fit_transform(textos)
+
+        vocabulario = {termo: int(coluna) for termo, coluna in vectorizer.vocabulary_.items()}
+        with open(os.path.join(diretorio, "vocabulario.json"), 'w', encoding='utf-8') as f:
+            json.dump(vocabulario, f, ensure_ascii=False)
+        np.save(os.path.join(diretorio, "idf.npy"), vectorizer.idf_.astype(np.float64))
+
+        Segmento.escrever(os.path.join(diretorio, "seg_00000"), matriz, np.arange(len(textos)), textos)
+        _salvar_json_atomico(os.path.join(diretorio, MANIFESTO), {
+            'versao': 1,
+            'identificador': _hash_conteudo(repr((tuple(ngram_range), max_features)), *textos),
+            'ngram_range': list(ngram_range),
+            'proximo_id': len(textos),
+            'segmentos': [{'nome': "seg_00000", 'n': len(textos)}]
+        })
+        return cls(diretorio)
+
+    @classmethod
+    def abrir(cls, diretorio):
+        """Abre um índice existente (arrays mapeados em memória)"""
+        return cls(diretorio)
+
+    def __len__(self):
+        """Número de ids já atribuídos (inclui removidos)"""
+        return len(self.removidos)
+
+    def n_ativos(self):
+        return int(len(self.removidos) - self.removidos.sum())
+
+    def _proximo_segmento(self):
+        numeros = [int(seg['nome'].split('_')[1]) for seg in self.manifesto['segmentos']]
+        return f"seg_{max(numeros, default=-1) + 1:05d}"
+
+    def adicionar(self, textos):
+        """Acrescenta documentos num novo segmento; retorna os ids atribuídos"""
+        textos = list(textos)
+        if not textos:
+            return []
+        inicio = self.manifesto['proximo_id']
+        ids = np.arange(inicio, inicio + len(textos))
+        nome = self._proximo_segmento()
+        Segmento.escrever(os.path.join(self.diretorio, nome), self.vectorizer.transform(textos), ids, textos)
+
+        self.manifesto['segmentos'].append({'nome': nome, 'n': len(textos)})
+        self.manifesto['proximo_id'] = inicio + len(textos)
+        self.manifesto['identificador'] = self._encadear("adicionar", *textos)
+        self.manifesto['versao'] += 1
+        _salvar_json_atomico(os.path.join(self.diretorio, MANIFESTO), self.manifesto)
+
+        self.segmentos.append(Segmento(os.path.join(self.diretorio, nome), len(self.idf)))
+        self.removidos = np.concatenate([self.removidos, np.zeros(len(textos), dtype=bool)])
+        return ids.tolist()
+
+    def remover(self, ids):
+        """Marca documentos como removidos (tombstone), sem reescrever segmentos"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self.removidos)):
+            raise KeyError("Id fora do índice")
+        self.removidos[ids] = True
+        _salvar_npy_atomico(os.path.join(self.diretorio, "removidos.npy"), np.flatnonzero(self.removidos))
+        self.manifesto['identificador'] = self._encadear("remover", *map(str, ids.tolist()))
+        self.manifesto['versao'] += 1
+        _salvar_json_atomico(os.path.join(self.diretorio, MANIFESTO), self.manifesto)
+
+    def compactar(self):
+        """Reescreve os documentos ativos num único segmento, mantendo os ids"""
+        matrizes, ids, textos = [], [], []
+        for segmento in self.segmentos:
+            ativos = np.flatnonzero(~self.removidos[segmento.ids])
+            matrizes.append(segmento.matriz[ativos])
+            ids.append(np.asarray(segmento.ids[ativos]))
+            textos.extend(segmento.texto(linha) for linha in ativos)
+
+        nome = self._proximo_segmento()
+        matriz = sp.vstack(matrizes, format='csr') if matrizes else sp.csr_matrix((0, len(self.idf)))
+        Segmento.escrever(os.path.join(self.diretorio, nome), matriz, np.concatenate(ids) if ids else [], textos)
+
+        antigos = [seg['nome'] for seg in self.manifesto['segmentos']]
+        self.manifesto['segmentos'] = [{'nome': nome, 'n': len(textos)}]
+        self.manifesto['versao'] += 1
+        _salvar_json_atomico(os.path.join(self.diretorio, MANIFESTO), self.manifesto)
+
+        for segmento in self.segmentos:
+            segmento.fechar()
+        self.segmentos = [Segmento(os.path.join(self.diretorio, nome), len(self.idf))]
+        # Processos que ainda têm os arquivos antigos abertos continuam lendo
+        # normalmente até reabrirem o índice (no Linux o unlink é seguro)
+        for antigo in antigos:
+            for arquivo in os.listdir(os.path.join(self.diretorio, antigo)):
+                os.remove(os.path.join(self.diretorio, antigo, arquivo))
+            os.rmdir(os.path.join(self.diretorio, antigo))
+
+    def transformar(self, sentencas):
+        return self.vectorizer.transform(list(sentencas))
+
+    def similaridades(self, sentencas):
+        """Cosseno de cada sentença com todo o corpus (colunas = ids globais)
+
+        Documentos removidos ficam com similaridade zero. O resultado é denso
+        (sentenças x corpus), então serve para poucas sentenças; lotes devem
+        usar `topk_similares`, que percorre o corpus em blocos.
+        """
+        consultas = self.transformar(sentencas)
+        resultado = np.zeros((consultas.shape[0], len(self.removidos)), dtype=np.float32)
+        for segmento in self.segmentos:
+            resultado[:, segmento.ids] = (consultas @ segmento.matriz.T).toarray()
+        resultado[:, self.removidos] = 0
+        return resultado
+
+    def linhas(self, ids):
+        """Linhas TF-IDF dos ids dados (removidos voltam zeradas)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        partes, posicoes = [], []
+        for segmento in self.segmentos:
+            ids_segmento = np.asarray(segmento.ids)
+            if not len(ids_segmento):
+                continue
+            linhas = np.minimum(np.searchsorted(ids_segmento, ids), len(ids_segmento) - 1)
+            achados = np.flatnonzero((ids_segmento[linhas] == ids) & ~self.removidos[ids])
+            if achados.size:
+                partes.append(segmento.matriz[linhas[achados]])
+                posicoes.append(achados)
+
+        # Uma linha zerada no fim serve para os ids não encontrados/removidos
+        partes.append(sp.csr_matrix((1, len(self.idf)), dtype=np.float32))
+        mapa = np.full(len(ids), sum(p.shape[0] for p in partes) - 1)
+        if posicoes:
+            posicoes = np.concatenate(posicoes)
+            mapa[posicoes] = np.arange(len(posicoes))
+        return sp.vstack(partes, format='csr')[mapa]
+
+    def blocos_base(self, tamanho):
+        """Fatias (ids, linhas) dos documentos ativos, segmento a segmento"""
+        for segmento in self.segmentos:
+            for inicio in range(0, len(segmento.ids), tamanho):
+                fim = min(inicio + tamanho, len(segmento.ids))
+                ids = np.asarray(segmento.ids[inicio:fim])
+                linhas = segmento.matriz[inicio:fim]
+                ativos = ~self.removidos[ids]
+                if not ativos.all():
+                    ids, linhas = ids[ativos], linhas[np.flatnonzero(ativos)]
+                yield ids, linhas
+
+    def itens(self):
+        """Pares (id, texto) dos documentos ativos"""
+        for segmento in self.segmentos:
+            for linha, id_global in enumerate(segmento.ids):
+                if not self.removidos[id_global]:
+                    yield int(id_global), segmento.texto(linha)
+
+    def texto(self, id_global):
+        """Texto de referência de um id global"""
+        for segmento in self.segmentos:
+            linha = np.searchsorted(segmento.ids, id_global)
+            if linha < len(segmento.ids) and segmento.ids[linha] == id_global:
+                return segmento.texto(linha)
+        raise KeyError(id_global)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerencia o índice de corpus do detector de plágio")
+    parser.add_argument("diretorio", help="Diretório do índice")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_criar = sub.add_parser("criar", help="Cria o índice a partir de um arquivo (um texto por linha)")
+    p_criar.add_argument("arquivo")
+    p_criar.add_argument("--max-features", type=int, default=1000)
+
+    p_adicionar = sub.add_parser("adicionar", help="Acrescenta textos (um por linha)")
+    p_adicionar.add_argument("arquivo")
+
+    p_remover = sub.add_parser("remover", help="Remove documentos pelo id")
+    p_remover.add_argument("ids", type=int, nargs="+")
+
+    sub.add_parser("compactar", help="Junta os segmentos descartando removidos")
+    sub.add_parser("info", help="Mostra versão e tamanho do índice")
+
+    args = parser.parse_args()
+
+    def ler_linhas(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            return [linha.strip() for linha in f if linha.strip()]
+
+    if args.comando == "criar":
+        indice = IndiceCorpus.criar(args.diretorio, ler_linhas(args.arquivo), max_features=args.max_features)
+    else:
+        indice = IndiceCorpus.abrir(args.diretorio)
+        if args.comando == "adicionar":
+            ids = indice.adicionar(ler_linhas(args.arquivo))
+            print(f"Adicionados ids {ids[0]}..{ids[-1]}" if ids else "Nada para adicionar")
+        elif args.comando == "remover":
+            indice.remover(args.ids)
+        elif args.comando == "compactar":
+            indice.compactar()
+
+    print(json.dumps({
+        'versao': indice.versao,
+        'documentos': len(indice),
+        'ativos': indice.n_ativos(),
+        'segmentos': len(indice.segmentos),
+        'vocabulario': len(indice.idf)
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import os
+
+# Só CPU por padrão (mesma política do emotion_video); defina CUDA_VISIBLE_DEVICES para usar GPU
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+
+import sys
+import json
+import time
+import argparse
+import cv2
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from emotion_models import get_registry, EMOTION_LABELS
+from emotion_detection import decode_image, detect_context, CONTEXT_RULES
+
+# Análise de emoções em lote, sem Streamlit (auditoria de datasets)
+#
+#   python emotion_batch.py fotos/ --saida resultados.jsonl
+#   python emotion_batch.py manifesto.txt --saida resultados/ --formato parquet --batch 64
+#
+# A entrada é um diretório (percorrido recursivamente; id = caminho relativo)
+# ou um manifesto: um caminho por linha, ou JSONL com {"id": ..., "path": ...}.
+# A leitura, a decodificação e a detecção de contexto rodam num pool de
+# threads à frente do laço principal; o laço detecta as faces e junta os
+# recortes de várias imagens num único lote para a rede de emoções.
+#
+# O próprio arquivo de saída serve de checkpoint: ao reiniciar, os ids que
+# já estão nele são pulados. Em JSONL, uma última linha incompleta (processo
+# interrompido no meio da escrita) é descartada. Em Parquet a saída é um
+# diretório com um arquivo part-NNNNN.parquet por lote gravado.
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+# Função para listar (id, caminho) a partir de um diretório ou manifesto
+def read_inputs(source):
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                path = record["path"]
+                image_id = record.get("id", path)
+            else:
+                path = image_id = line
+            # Caminhos relativos são relativos ao manifesto
+            yield str(image_id), os.path.join(base_dir, path)
+
+
+# Função para ler, decodificar e detectar o contexto de uma imagem (roda no pool)
+def load_image(image_id, path):
+    try:
+        with open(path, "rb") as f:
+            image = decode_image(f.read())
+        return {"id": image_id, "path": path, "image": image, "context": detect_context(image)}
+    except (OSError, ValueError, cv2.error) as e:
+        return {"id": image_id, "path": path, "error": str(e)}
+
+
+# Função para decodificar as imagens à frente do consumo, com no máximo `prefetch` em andamento
+def prefetch_images(inputs, workers=4, prefetch=16):
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="emoscan-decode") as pool:
+        pending = deque()
+        for image_id, path in inputs:
+            pending.append(pool.submit(load_image, image_id, path))
+            if len(pending) >= prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# Função para montar o registro de saída de uma imagem
+def build_record(item, faces, probabilities, adjustments):
+    record = {"id": item["id"], "path": item["path"], "context": item.get("context"), "faces": []}
+    if "error" in item:
+        record["error"] = item["error"]
+        return record
+    for (region, _), row, adjustment in zip(faces, probabilities, adjustments):
+        emotion = dict(zip(EMOTION_LABELS, map(float, row)))
+        record["faces"].append({
+            "region": region,
+            "emotion": emotion,
+            "dominant_emotion": max(emotion, key=emotion.get),
+            "adjustment": adjustment,
+        })
+    return record
+
+
+# Função principal: gera um registro por imagem, classificando as faces em lotes
+def analyze_batch(inputs, batch_size=32, workers=4, prefetch=16, registry=None):
+    registry = registry or get_registry().warm_up()
+    pending, crops = [], []
+
+    def flush():
+        probabilities = registry.predict_emotions([crop for _, crop in crops])
+        # Ajuste por contexto de todas as faces do lote numa única operação
+        contexts = [item.get("context") for item, faces in pending for _ in faces]
+        adjustments = CONTEXT_RULES.adjust_batch(probabilities, contexts)
+        row = 0
+        for item, faces in pending:
+            yield build_record(item, faces, probabilities[row:row + len(faces)], adjustments[row:row + len(faces)])
+            row += len(faces)
+
+    for item in prefetch_images(inputs, workers, prefetch):
+        faces = []
+        if "error" not in item:
+            faces = registry.detect_faces(item.pop("image"))
+        pending.append((item, faces))
+        crops.extend(faces)
+        if len(crops) >= batch_size:
+            yield from flush()
+            pending, crops = [], []
+    if pending:
+        yield from flush()
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.path = path
+        self.done = self._recover()
+        self._file = open(path, "a", encoding="utf-8")
+
+    # Função para ler os ids já gravados e cortar uma última linha incompleta
+    def _recover(self):
+        done = set()
+        if not os.path.exists(self.path):
+            return done
+        valid_end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                # Sem o "\n" final a linha é cortada, então o id não conta como feito
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    done.add(json.loads(line)["id"])
+                except (ValueError, KeyError):
+                    break
+                valid_end = f.tell()
+        os.truncate(self.path, valid_end)
+        return done
+
+    def write(self, records):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        # pyarrow só é necessário para esta saída
+        import pyarrow
+        import pyarrow.parquet
+        self._pa, self._pq = pyarrow, pyarrow.parquet
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(name for name in os.listdir(path) if name.startswith("part-") and name.endswith(".parquet"))
+        self._next_part = len(parts)
+        self.done = set()
+        for name in parts:
+            self.done.update(self._pq.read_table(os.path.join(path, name), columns=["id"]).column("id").to_pylist())
+
+    def write(self, records):
+        if not records:
+            return
+        # Campos aninhados vão como JSON para manter um esquema fixo entre as partes
+        table = self._pa.table({
+            "id": [r["id"] for r in records],
+            "path": [r["path"] for r in records],
+            "context": [json.dumps(r["context"], ensure_ascii=False) for r in records],
+            "faces": [json.dumps(r["faces"], ensure_ascii=False) for r in records],
+            "error": [r.get("error") for r in records],
+        })
+        final = os.path.join(self.path, f"part-{self._next_part:05d}.parquet")
+        # Grava num temporário e renomeia, para nunca deixar uma parte pela metade
+        self._pq.write_table(table, final + ".tmp")
+        os.replace(final + ".tmp", final)
+        self._next_part += 1
+
+    def close(self):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise de emoções em lote (sem Streamlit)")
+    parser.add_argument("entrada", help="Diretório de imagens ou manifesto (caminhos ou JSONL)")
+    parser.add_argument("--saida", required=True, help="Arquivo JSONL ou diretório Parquet")
+    parser.add_argument("--formato", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--batch", type=int, default=32, help="Recortes de face por lote do modelo")
+    parser.add_argument("--threads", type=int, default=4, help="Threads de leitura/decodificação")
+    parser.add_argument("--prefetch", type=int, default=16, help="Imagens decodificadas à frente")
+    parser.add_argument("--checkpoint-every", type=int, default=256, help="Imagens por gravação")
+    args = parser.parse_args(argv)
+
+    writer = ParquetWriter(args.saida) if args.formato == "parquet" else JsonlWriter(args.saida)
+    inputs = ((image_id, path) for image_id, path in read_inputs(args.entrada) if image_id not in writer.done)
+    if writer.done:
+        print(f"Retomando: {len(writer.done)} imagens já processadas", file=sys.stderr)
+
+    start = time.perf_counter()
+    processed, faces, buffer = 0, 0, []
+    try:
+        for record in analyze_batch(inputs, args.batch, args.threads, args.prefetch):
+            buffer.append(record)
+            processed += 1
+            faces += len(record["faces"])
+            if len(buffer) >= args.checkpoint_every:
+                writer.write(buffer)
+                buffer = []
+    finally:
+        # Interrompido ou não, grava o que já foi analisado
+        writer.write(buffer)
+        writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"{processed} imagens, {faces} faces em {elapsed:.1f}s "
+          f"({processed / elapsed if elapsed else 0:.1f} imagens/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+# Cache de resultados do EmoScan por hash perceptual
+#
+# Imagens reenviadas (mesma foto, cópia redimensionada ou recomprimida)
+# geram o mesmo pHash, ou um muito próximo, então a análise completa não
+# precisa rodar de novo. A chave inclui a versão dos modelos: trocar o
+# detector, a rede de emoções ou a versão do DeepFace invalida o cache.
+# As regiões das faces são guardadas como frações do tamanho da imagem e
+# convertidas de volta para pixels da imagem consultada.
+#
+# Dois níveis: um LRU em memória (OrderedDict) e, opcionalmente, uma tabela
+# SQLite em disco compartilhada entre processos e reinícios.
+
+REGION_KEYS = ("x", "y", "w", "h")
+
+
+# Função para calcular o pHash (DCT) de 64 bits de uma imagem BGR
+def perceptual_hash(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    # Baixas frequências (8x8 do canto da DCT) comparadas com a mediana
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# Função para converter as regiões de pixels para frações da imagem (e de volta)
+def _scale_regions(results, sx, sy, convert):
+    scaled = []
+    for result in results:
+        region = dict(result["region"])
+        for key, scale in (("x", sx), ("y", sy), ("w", sx), ("h", sy)):
+            if key in region:
+                region[key] = convert(region[key] * scale)
+        for eye in ("left_eye", "right_eye"):
+            if region.get(eye) is not None:
+                region[eye] = [convert(region[eye][0] * sx), convert(region[eye][1] * sy)]
+        scaled.append({**result, "region": region})
+    return scaled
+
+
+def normalize_regions(results, width, height):
+    return _scale_regions(results, 1 / width, 1 / height, float)
+
+
+def denormalize_regions(results, width, height):
+    return _scale_regions(results, width, height, lambda v: int(round(v)))
+
+
+class ResultCache:
+    def __init__(self, model_version, max_entries=1024, path=None, max_disk_entries=100_000, max_distance=0):
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        # Distância de Hamming aceita para considerar duas imagens iguais (0 = hash idêntico)
+        self.max_distance = max_distance
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path:
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    model_version TEXT NOT NULL,
+                    phash INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model_version, phash)
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON results (last_access)")
+            self._connection.commit()
+
+    # Função para buscar o resultado de uma imagem; retorna None se não estiver no cache
+    def get(self, image, image_hash=None):
+        image_hash = perceptual_hash(image) if image_hash is None else image_hash
+        height, width = image.shape[:2]
+        with self._lock:
+            payload = self._memory.get(image_hash)
+            if payload is None and self.max_distance:
+                payload = self._nearest(image_hash)
+            if payload is not None:
+                if image_hash in self._memory:
+                    self._memory.move_to_end(image_hash)
+                self.memory_hits += 1
+                return denormalize_regions(payload, width, height)
+
+            payload = self._disk_get(image_hash)
+            if payload is not None:
+                self.disk_hits += 1
+                self._remember(image_hash, payload)
+                return denormalize_regions(payload, width, height)
+            self.misses += 1
+            return None
+
+    # Função para guardar o resultado (lista de faces de `analyze_image`) de uma imagem
+    def put(self, image, results, image_hash=None):
+        image_hash = perceptual_hash(image) if image_hash is None else image_hash
+        height, width = image.shape[:2]
+        payload = normalize_regions(results, width, height)
+        with self._lock:
+            self._remember(image_hash, payload)
+            if self._connection is not None:
+                # Signed: o SQLite só guarda inteiros de 64 bits com sinal
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO results (model_version, phash, payload, last_access) VALUES (?, ?, ?, ?)",
+                    (self.model_version, _signed(image_hash), json.dumps(payload, ensure_ascii=False), time.time()))
+                self._evict_disk()
+                self._connection.commit()
+
+    def _remember(self, image_hash, payload):
+        self._memory[image_hash] = payload
+        self._memory.move_to_end(image_hash)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # Função para achar no nível em memória o hash mais próximo dentro da distância aceita
+    def _nearest(self, image_hash):
+        if not self._memory:
+            return None
+        hashes = np.fromiter(self._memory.keys(), dtype=np.uint64, count=len(self._memory))
+        distances = np.unpackbits((hashes ^ np.uint64(image_hash)).view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        best = int(np.argmin(distances))
+        if distances[best] > self.max_distance:
+            return None
+        return self._memory[int(hashes[best])]
+
+    def _disk_get(self, image_hash):
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT payload FROM results WHERE model_version = ? AND phash = ?",
+            (self.model_version, _signed(image_hash))).fetchone()
+        if row is None:
+            return None
+        self._connection.execute("UPDATE results SET last_access = ? WHERE model_version = ? AND phash = ?",
+                                 (time.time(), self.model_version, _signed(image_hash)))
+        self._connection.commit()
+        return json.loads(row[0])
+
+    def _evict_disk(self):
+        total = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if total > self.max_disk_entries:
+            self._connection.execute("""
+                DELETE FROM results WHERE rowid IN (
+                    SELECT rowid FROM results ORDER BY last_access LIMIT ?
+                )
+            """, (total - self.max_disk_entries,))
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _signed(value):
+    return value - (1 << 64) if value >= 1 << 63 else value
@@ -1,220 +1,368 @@
-import streamlit as st
+import os
+import time
+import threading
 import cv2
 import numpy as np
-from deepface import DeepFace
-from PIL import Image
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-import tempfile
-import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as StageTimeout
+from emotion_models import get_registry
+from emotion_rules import ContextRules
+from emotion_cache import ResultCache, perceptual_hash
+from emotion_metrics import METRICS, PROFILER
+from text_core.tardio import recurso_streamlit
+
+# O streamlit só é importado pela interface (main) e pelos recursos em
+# cache, então as funções de análise servem também fora do app (emotion_batch)
 
-# Configuração da página
-st.set_page_config(
-    page_title="EmoScan - Análise de Emoções com Contexto",
-    page_icon="😊",
-    layout="wide"
-)
+# Pool compartilhado pelas etapas de análise; OpenCV, NumPy e TensorFlow
+# liberam o GIL, então threads bastam para rodar as etapas em paralelo.
+# É criado na primeira análise: quem só usa as funções de cada etapa
+# (emotion_batch) não leva o pool do app junto
+STAGE_POOL_WORKERS = 4
+_stage_pool = None
+_stage_pool_lock = threading.Lock()
+# Tempo máximo (s) de cada etapa; None = sem limite
+FACE_STAGE_TIMEOUT = 30
+CONTEXT_STAGE_TIMEOUT = 5
+# Regras de ajuste por contexto (padrão ou um JSON em EMOSCAN_RULES)
+CONTEXT_RULES = ContextRules.from_file(os.environ["EMOSCAN_RULES"]) if os.environ.get("EMOSCAN_RULES") else ContextRules()
 
-# Título e descrição
-st.title("😊 EmoScan - Análise de Emoções com Contexto")
-st.markdown("""
-Este sistema analisa emoções humanas considerando o contexto da imagem para uma interpretação mais precisa.
-Faça upload de uma imagem contendo rosto(s) humano(s) para análise.
-""")
+# Função para carregar os modelos uma vez por processo (compartilhados entre sessões e reruns)
+@recurso_streamlit(show_spinner="Carregando modelos...")
+def load_models():
+    return get_registry().warm_up()
+
+# Função para criar o cache de resultados (em memória; em disco se EMOSCAN_CACHE apontar um arquivo)
+@recurso_streamlit
+def load_cache():
+    # Os resultados guardados já trazem os ajustes, então a versão inclui as regras
+    version = f"{get_registry().model_version()}/rules-{CONTEXT_RULES.fingerprint()}"
+    # Distância 4 (de 64 bits) aceita cópias redimensionadas/recomprimidas da mesma foto
+    return ResultCache(version, path=os.environ.get("EMOSCAN_CACHE"), max_distance=4)
 
 # Função para carregar modelo YOLO (simplificado para demonstração)
 def load_yolo_context():
     # Em uma implementação real, carregaríamos um modelo YOLO pré-treinado
     # Para fins de demonstração, usaremos uma abordagem simplificada
+    import streamlit as st
     st.success("Modelo de contexto carregado com sucesso!")
     return None
 
-# Função para detectar contexto (simplificado)
-def detect_context(image):
-    # Esta é uma versão simplificada para demonstração
-    # Em uma implementação real, usaríamos YOLO ou outra rede para detecção de objetos
-    
-    context_items = []
-    
-    # Simulação de detecção de contexto baseada em cores e formas simples
-    img_array = np.array(image)
+# Função para decodificar o upload uma única vez num array BGR (formato do OpenCV/DeepFace)
+def decode_image(data):
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Não foi possível decodificar a imagem")
+    return image
+
+# Lado máximo da miniatura usada na análise de contexto
+CONTEXT_MAX_SIDE = 512
+# Área mínima (fração da miniatura) para um contorno contar como objeto
+CONTEXT_MIN_CONTOUR_AREA = 0.001
+
+# Função para reduzir a imagem para a análise de contexto (INTER_AREA evita serrilhado)
+def context_thumbnail(image, max_side=CONTEXT_MAX_SIDE):
+    height, width = image.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return image
+    return cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+# Função para extrair as características de contexto de uma miniatura
+def context_features(image):
+    thumb = context_thumbnail(image)
     
-    # Verificar se há tons de azul (possível escritório)
-    blue_dominant = np.mean(img_array[:, :, 2]) > np.mean(img_array[:, :, 1]) + 10
-    if blue_dominant:
-        context_items.append("escritório")
+    # Média dos três canais numa única passada (cv2.mean devolve B, G, R, alfa)
+    blue, green, red, _ = cv2.mean(thumb)
     
-    # Verificar se há formas retangulares (possível eletrônicos)
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    # Formas retangulares: só contornos com área relevante passam pelo approxPolyDP
+    gray = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
     edges = cv2.Canny(gray, 50, 150)
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    min_area = CONTEXT_MIN_CONTOUR_AREA * gray.shape[0] * gray.shape[1]
     
     rectangular_objects = 0
     for contour in contours:
+        # O retângulo envolvente é barato e descarta ruído antes de calcular a área real
+        _, _, w, h = cv2.boundingRect(contour)
+        if w * h < min_area or cv2.contourArea(contour) < min_area:
+            continue
         approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
         if len(approx) == 4:  # Forma quadrangular
             rectangular_objects += 1
     
-    if rectangular_objects > 2:
+    return {
+        "mean_bgr": (blue, green, red),
+        "rectangular_objects": rectangular_objects,
+    }
+
+# Função para detectar contexto (simplificado)
+def detect_context(image):
+    # Esta é uma versão simplificada para demonstração
+    # Em uma implementação real, usaríamos YOLO ou outra rede para detecção de objetos
+    # `image` é o array BGR decodificado do upload; a análise roda numa miniatura,
+    # então o custo fica praticamente constante com a resolução da foto
+    
+    context_items = []
+    features = context_features(image)
+    blue, green, red = features["mean_bgr"]
+    
+    # Verificar se há tons de azul (possível escritório)
+    if blue > green + 10:
+        context_items.append("escritório")
+    
+    # Verificar se há formas retangulares (possível eletrônicos)
+    if features["rectangular_objects"] > 2:
         context_items.append("dispositivos eletrônicos")
     
     # Verificar tons verdes (possível natureza)
-    green_dominant = np.mean(img_array[:, :, 1]) > np.mean(img_array[:, :, 0]) + 10
-    if green_dominant:
+    if green > red + 10:
         context_items.append("natureza")
     
     return context_items if context_items else ["contexto indefinido"]
 
 # Função para ajustar emoção com base no contexto
+# As regras ficam em `CONTEXT_RULES` (emotion_rules); para várias faces use
+# `CONTEXT_RULES.adjust_batch`, que ajusta os vetores de probabilidade inteiros
 def adjust_emotion(emotion, confidence, context):
-    original_emotion = emotion
-    original_confidence = confidence
-    
-    # Regras de ajuste baseadas no contexto
-    if "escritório" in context and emotion == "sad":
-        adjusted_emotion = "concentrado"
-        adjusted_confidence = min(95, confidence + 10)
-        reason = "Em ambiente de trabalho, expressões sérias são frequentemente concentração"
-    
-    elif "festa" in context and emotion == "angry":
-        adjusted_emotion = "animado"
-        adjusted_confidence = min(95, confidence + 5)
-        reason = "Em festas, expressões intensas podem indicar animação"
-    
-    elif "natureza" in context and emotion == "neutral":
-        adjusted_emotion = "pensativo"
-        adjusted_confidence = min(95, confidence + 8)
-        reason = "Em ambientes naturais, neutralidade pode refletir contemplação"
-    
-    else:
-        adjusted_emotion = emotion
-        adjusted_confidence = confidence
-        reason = "O contexto não alterou significativamente a interpretação da emoção"
-    
-    return {
-        "original_emotion": original_emotion,
-        "original_confidence": original_confidence,
-        "adjusted_emotion": adjusted_emotion,
-        "adjusted_confidence": adjusted_confidence,
-        "reason": reason
-    }
+    return CONTEXT_RULES.adjust(emotion, confidence, context)
+
+# Função para a etapa facial: detecção dos rostos e classificação das emoções
+# em lote, com os modelos já carregados pelo registro
+def analyze_faces(image, trace):
+    registry = get_registry()
+    with trace.stage("detect_faces"):
+        faces = registry.detect_faces(image)
+    if not faces:
+        raise ValueError("Nenhum rosto detectado na imagem. Confirme que a foto contém um rosto visível.")
+    with trace.stage("predict_emotions"):
+        probabilities = registry.predict_emotions([crop for _, crop in faces])
+    return [region for region, _ in faces], probabilities
+
+# Função para a etapa de contexto, cronometrada
+def analyze_context(image, trace):
+    with trace.stage("detect_context"):
+        return detect_context(image)
+
+# Função para o tempo (s) que ainda resta até um prazo de `time.monotonic()`; None = sem limite
+def remaining(deadline):
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+# Função para obter o pool das etapas (um por processo)
+def stage_pool():
+    global _stage_pool
+    with _stage_pool_lock:
+        if _stage_pool is None:
+            _stage_pool = ThreadPoolExecutor(max_workers=STAGE_POOL_WORKERS, thread_name_prefix="emoscan-stage")
+        return _stage_pool
+
+# Função para obter o contexto sem derrubar a análise: se a etapa falhar ou
+# estourar o tempo, as emoções seguem sem ajuste
+def context_or_fallback(future, timeout):
+    try:
+        return future.result(timeout=timeout)
+    except StageTimeout:
+        future.cancel()
+        return ["contexto indefinido"]
+    except Exception:
+        return ["contexto indefinido"]
 
 # Função principal de análise
-def analyze_image(image):
-    # Salvar imagem temporariamente para processamento
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-        image.save(tmp_file.name)
-        img_path = tmp_file.name
-    
+# `image` é o array BGR de `decode_image`; o mesmo buffer vai para os modelos
+# e para a detecção de contexto, sem arquivo temporário nem nova codificação.
+# As duas etapas são independentes até o ajuste, então rodam em paralelo e a
+# latência fica perto da mais lenta delas, não da soma.
+# Com `cache`, imagens repetidas (mesmo pHash) voltam sem nova inferência.
+# Cada etapa é cronometrada em `trace` (emotion_metrics)
+def analyze_image(image, face_timeout=FACE_STAGE_TIMEOUT, context_timeout=CONTEXT_STAGE_TIMEOUT, cache=None, trace=None):
+    trace = trace or METRICS.trace()
+    face_count, error = 0, None
     try:
-        # Detectar rostos e emoções com DeepFace
-        results = DeepFace.analyze(img_path, actions=['emotion'], enforce_detection=True)
-        
-        # Detectar contexto
-        context = detect_context(image)
-        
-        # Processar resultados
-        analysis_results = []
-        for result in results:
-            emotion = result['dominant_emotion']
-            confidence = result['emotion'][emotion]
-            region = result['region']
+        if cache is not None:
+            with trace.stage("cache_lookup"):
+                image_hash = perceptual_hash(image)
+                cached = cache.get(image, image_hash)
+            if cached is not None:
+                face_count = len(cached)
+                return cached, None
+        pool = stage_pool()
+        context_future = pool.submit(analyze_context, image, trace)
+        faces_future = pool.submit(analyze_faces, image, trace)
+        # Os prazos contam da submissão: as etapas correm juntas, então a
+        # espera total fica limitada pelo maior deles, não pela soma
+        submitted = time.monotonic()
+        face_deadline = None if face_timeout is None else submitted + face_timeout
+        context_deadline = None if context_timeout is None else submitted + context_timeout
+        try:
+            # Detectar rostos e emoções
+            try:
+                regions, probabilities = faces_future.result(timeout=remaining(face_deadline))
+            except StageTimeout:
+                faces_future.cancel()
+                raise TimeoutError(f"A análise facial excedeu {face_timeout}s")
+            face_count = len(regions)
             
-            # Ajustar emoção com base no contexto
-            adjustment = adjust_emotion(emotion, confidence, context)
+            # Detectar contexto (já em andamento desde o início)
+            context = context_or_fallback(context_future, remaining(context_deadline))
             
-            analysis_results.append({
-                "region": region,
-                "adjustment": adjustment,
-                "context": context
-            })
-        
-        return analysis_results, None
-        
-    except Exception as e:
-        return None, str(e)
-    
+            # Ajustar as emoções de todas as faces com base no contexto, numa única operação
+            with trace.stage("adjust_emotion"):
+                adjustments = CONTEXT_RULES.adjust_batch(probabilities, [context] * face_count)
+            
+            # Processar resultados
+            analysis_results = []
+            for region, adjustment in zip(regions, adjustments):
+                analysis_results.append({
+                    "region": region,
+                    "adjustment": adjustment,
+                    "context": context
+                })
+            
+            if cache is not None:
+                cache.put(image, analysis_results, image_hash)
+            return analysis_results, None
+            
+        except Exception as e:
+            context_future.cancel()
+            error = str(e)
+            return None, error
     finally:
-        # Limpar arquivo temporário
-        os.unlink(img_path)
-
-# Interface principal
-uploaded_file = st.file_uploader("Escolha uma imagem...", type=["jpg", "jpeg", "png"])
-
-if uploaded_file is not None:
-    # Carregar e exibir imagem
-    image = Image.open(uploaded_file)
-    st.image(image, caption="Imagem carregada", use_column_width=True)
-    
-    # Analisar imagem
-    with st.spinner("Analisando imagem..."):
-        results, error = analyze_image(image)
-    
-    if error:
-        st.error(f"Erro na análise: {error}")
-    else:
-        # Exibir resultados
-        st.success("Análise concluída!")
+        METRICS.finish(trace, image.shape, face_count, error)
+
+# Interface Streamlit
+def main():
+    import streamlit as st
+
+    # Configuração da página
+    st.set_page_config(
+        page_title="EmoScan - Análise de Emoções com Contexto",
+        page_icon="😊",
+        layout="wide"
+    )
+
+    # Título e descrição
+    st.title("😊 EmoScan - Análise de Emoções com Contexto")
+    st.markdown("""
+    Este sistema analisa emoções humanas considerando o contexto da imagem para uma interpretação mais precisa.
+    Faça upload de uma imagem contendo rosto(s) humano(s) para análise.
+    """)
+
+    models = load_models()
+    cache = load_cache()
+
+    with st.sidebar.expander("⚙️ Modelos carregados"):
+        report = models.report()
+        st.metric("Tempo de carga", f"{report['total_load_seconds']:.2f}s")
+        st.metric("Memória do processo", f"{report['rss_bytes'] / 2**20:.0f} MiB")
+        st.json(report["models"])
+
+    with st.sidebar.expander("🗃️ Cache de resultados"):
+        st.json(cache.stats())
+
+    with st.sidebar.expander("⏱️ Desempenho"):
+        st.json(METRICS.summary())
+        if METRICS.recent:
+            st.dataframe([
+                {"faces": r["faces"], "tamanho": f"{r['width']}x{r['height']}",
+                 "total_ms": 1000 * r["total_seconds"],
+                 **{f"{k}_ms": 1000 * v for k, v in r["stages"].items()}}
+                for r in reversed(METRICS.recent)
+            ])
+        st.download_button("Métricas (Prometheus)", METRICS.to_prometheus(),
+                           file_name="emoscan_metrics.prom", mime="text/plain")
+        if st.toggle("Profiler por amostragem", value=PROFILER.running):
+            PROFILER.start()
+            if PROFILER.total:
+                st.dataframe(PROFILER.top(15))
+        else:
+            PROFILER.stop()
+
+    # Interface principal
+    uploaded_file = st.file_uploader("Escolha uma imagem...", type=["jpg", "jpeg", "png"])
+
+    if uploaded_file is not None:
+        # Carregar e exibir imagem
+        trace = METRICS.trace()
+        try:
+            with trace.stage("decode"):
+                image = decode_image(uploaded_file.getvalue())
+        except ValueError as e:
+            st.error(str(e))
+            st.stop()
+        st.image(image, channels="BGR", caption="Imagem carregada", use_column_width=True)
+    
+        # Analisar imagem
+        with st.spinner("Analisando imagem..."):
+            results, error = analyze_image(image, cache=cache, trace=trace)
+    
+        if error:
+            st.error(f"Erro na análise: {error}")
+        else:
+            # Exibir resultados
+            st.success("Análise concluída!")
         
-        for i, result in enumerate(results):
-            st.subheader(f"Pessoa {i+1}")
+            for i, result in enumerate(results):
+                st.subheader(f"Pessoa {i+1}")
             
-            col1, col2 = st.columns(2)
+                col1, col2 = st.columns(2)
             
-            with col1:
-                st.markdown("**Análise Facial**")
-                adjustment = result['adjustment']
-                st.metric(
-                    label="Emoção detectada",
-                    value=adjustment['original_emotion'],
-                    delta=f"{adjustment['original_confidence']:.1f}%"
-                )
+                with col1:
+                    st.markdown("**Análise Facial**")
+                    adjustment = result['adjustment']
+                    st.metric(
+                        label="Emoção detectada",
+                        value=adjustment['original_emotion'],
+                        delta=f"{adjustment['original_confidence']:.1f}%"
+                    )
             
-            with col2:
-                st.markdown("**Análise Contextual**")
-                st.metric(
-                    label="Emoção ajustada",
-                    value=adjustment['adjusted_emotion'],
-                    delta=f"{adjustment['adjusted_confidence']:.1f}%"
-                )
+                with col2:
+                    st.markdown("**Análise Contextual**")
+                    st.metric(
+                        label="Emoção ajustada",
+                        value=adjustment['adjusted_emotion'],
+                        delta=f"{adjustment['adjusted_confidence']:.1f}%"
+                    )
             
-            st.markdown("**Contexto detectado:**")
-            st.info(", ".join(result['context']))
+                st.markdown("**Contexto detectado:**")
+                st.info(", ".join(result['context']))
             
-            st.markdown("**Justificativa do ajuste:**")
-            st.write(adjustment['reason'])
+                st.markdown("**Justificativa do ajuste:**")
+                st.write(adjustment['reason'])
             
-            st.markdown("---")
+                st.markdown("---")
 
-# Seção de explicação do projeto
-with st.expander("ℹ️ Sobre este projeto"):
-    st.markdown("""
-    ## Como funciona este sistema?
+    # Seção de explicação do projeto
+    with st.expander("ℹ️ Sobre este projeto"):
+        st.markdown("""
+        ## Como funciona este sistema?
     
-    Este projeto demonstra um sistema de reconhecimento de emoções que considera o contexto da imagem
-    para melhorar a precisão da análise. A implementação combina:
+        Este projeto demonstra um sistema de reconhecimento de emoções que considera o contexto da imagem
+        para melhorar a precisão da análise. A implementação combina:
     
-    1. **Detecção facial** usando OpenCV através da biblioteca DeepFace
-    2. **Reconhecimento de emoções** usando modelos deep learning pré-treinados
-    3. **Análise de contexto** simplificada para detectar ambiente e objetos
-    4. **Lógica de ajuste** que modera a emoção detectada com base no contexto
+        1. **Detecção facial** usando OpenCV através da biblioteca DeepFace
+        2. **Reconhecimento de emoções** usando modelos deep learning pré-treinados
+        3. **Análise de contexto** simplificada para detectar ambiente e objetos
+        4. **Lógica de ajuste** que modera a emoção detectada com base no contexto
     
-    ## Tecnologias utilizadas
+        ## Tecnologias utilizadas
     
-    - Python
-    - OpenCV para processamento de imagem
-    - DeepFace para análise facial e de emoções
-    - Streamlit para interface web
-    - Técnicas de visão computacional para análise contextual simplificada
+        - Python
+        - OpenCV para processamento de imagem
+        - DeepFace para análise facial e de emoções
+        - Streamlit para interface web
+        - Técnicas de visão computacional para análise contextual simplificada
     
-    ## Aplicações práticas
+        ## Aplicações práticas
     
-    Sistemas como este podem ser aplicados em:
-    - Análise de satisfação de clientes em lojas
-    - Monitoramento de bem-estar em ambientes de trabalho
-    - Pesquisas de mercado e análise de comportamento
-    - Sistemas de recomendação sensíveis ao estado emocional
-    """)
+        Sistemas como este podem ser aplicados em:
+        - Análise de satisfação de clientes em lojas
+        - Monitoramento de bem-estar em ambientes de trabalho
+        - Pesquisas de mercado e análise de comportamento
+        - Sistemas de recomendação sensíveis ao estado emocional
+        """)
+
+    # Nota de rodapé
+    st.markdown("---")
 
-# Nota de rodapé
-st.markdown("---")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
\ No newline at end of file
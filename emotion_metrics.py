@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+import numpy as np
+
+# Instrumentação do EmoScan: duração por etapa, tamanho da imagem e número
+# de faces de cada análise
+#
+# As durações vão para histogramas com buckets fixos (mesmo modelo do
+# Prometheus), exportados em texto no formato de exposição do Prometheus,
+# seja sob demanda ou, se EMOSCAN_METRICS_FILE estiver definido, num arquivo
+# reescrito a cada requisição (para o textfile collector do node_exporter).
+# As últimas requisições ficam também em memória para o painel do app.
+#
+# O SamplingProfiler é um profiler por amostragem simples: uma thread lê
+# sys._current_frames() em intervalos fixos e conta em quantas amostras
+# cada função aparecia na pilha das outras threads (tempo acumulado). Custa
+# pouco o bastante para ser ligado em produção.
+
+# Limites superiores dos buckets (segundos)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Megapixels e número de faces por imagem
+MEGAPIXEL_BUCKETS = (0.1, 0.3, 1, 2, 5, 8, 12, 24, 50)
+FACE_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+# Arquivos onde uma thread ociosa fica parada (fila, lock, select)
+IDLE_FILES = {"threading.py", "queue.py", "selectors.py", "socket.py", "ssl.py"}
+# Infraestrutura de threads presente em toda pilha; não entra na contagem
+PLUMBING_FILES = {"threading.py", "thread.py"}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def prometheus_lines(self, name, labels=""):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class RequestTrace:
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    # Função para cronometrar uma etapa (pode ser usada de threads diferentes)
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            self.metrics.observe_stage(name, elapsed)
+
+
+class StageMetrics:
+    def __init__(self, export_path=None, keep_recent=500):
+        self.export_path = export_path
+        self.stages = {}
+        self.total = Histogram(LATENCY_BUCKETS)
+        self.megapixels = Histogram(MEGAPIXEL_BUCKETS)
+        self.faces = Histogram(FACE_BUCKETS)
+        self.errors = 0
+        self.recent = deque(maxlen=keep_recent)
+        self._lock = threading.Lock()
+
+    def trace(self):
+        return RequestTrace(self)
+
+    def observe_stage(self, name, seconds):
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = Histogram(LATENCY_BUCKETS)
+            self.stages[name].observe(seconds)
+
+    # Função para fechar uma requisição: registra tamanho, faces e tempo total
+    def finish(self, trace, image_shape, face_count, error=None):
+        elapsed = time.perf_counter() - trace.started
+        height, width = image_shape[:2]
+        with self._lock:
+            self.total.observe(elapsed)
+            self.megapixels.observe(width * height / 1e6)
+            self.faces.observe(face_count)
+            if error:
+                self.errors += 1
+            self.recent.append({
+                "timestamp": time.time(),
+                "width": width,
+                "height": height,
+                "faces": face_count,
+                "total_seconds": elapsed,
+                "stages": dict(trace.stages),
+                "error": error,
+            })
+        if self.export_path:
+            self.export(self.export_path)
+
+    def to_prometheus(self):
+        with self._lock:
+            lines = [
+                "# HELP emoscan_stage_seconds Duração de cada etapa da análise",
+                "# TYPE emoscan_stage_seconds histogram",
+            ]
+            for name, histogram in sorted(self.stages.items()):
+                lines += histogram.prometheus_lines("emoscan_stage_seconds", f'stage="{name}"')
+            for metric, histogram, text in (
+                    ("emoscan_request_seconds", self.total, "Duração total da análise"),
+                    ("emoscan_image_megapixels", self.megapixels, "Tamanho das imagens analisadas"),
+                    ("emoscan_faces_per_image", self.faces, "Faces detectadas por imagem")):
+                lines += [f"# HELP {metric} {text}", f"# TYPE {metric} histogram"]
+                lines += histogram.prometheus_lines(metric)
+            lines += [
+                "# HELP emoscan_errors_total Análises que terminaram em erro",
+                "# TYPE emoscan_errors_total counter",
+                f"emoscan_errors_total {self.errors}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    # Função para gravar as métricas num arquivo (escrita atômica, para coletores que leem a qualquer momento)
+    def export(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    # Função para resumir cada etapa; percentis exatos sobre as últimas requisições
+    def summary(self):
+        with self._lock:
+            recent = [r["stages"] for r in self.recent]
+            summary = {}
+            for name, histogram in sorted(self.stages.items()):
+                values = [stages[name] for stages in recent if name in stages]
+                if not values:
+                    continue
+                summary[name] = {
+                    "count": histogram.count,
+                    "mean_ms": 1000 * histogram.total / histogram.count,
+                    "p50_ms": 1000 * float(np.percentile(values, 50)),
+                    "p95_ms": 1000 * float(np.percentile(values, 95)),
+                }
+            return summary
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self.total = 0
+        # A thread de amostragem escreve enquanto a interface lê `top()`
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="emoscan-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                # Threads paradas esperando trabalho não interessam
+                if thread_id == own or os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    continue
+                # Tempo acumulado: cada função da pilha conta uma vez por amostra
+                seen = set()
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_name, code.co_firstlineno)
+                    if os.path.basename(code.co_filename) not in PLUMBING_FILES:
+                        seen.add(key)
+                    frame = frame.f_back
+                with self._lock:
+                    self.samples.update(seen)
+                    self.total += 1
+
+    def top(self, n=20):
+        with self._lock:
+            most_common, total = self.samples.most_common(n), self.total
+        return [
+            {"function": name, "file": os.path.basename(filename), "line": line,
+             "samples": count, "share": count / total}
+            for (filename, name, line), count in most_common
+        ]
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.total = 0
+
+
+METRICS = StageMetrics(export_path=os.environ.get("EMOSCAN_METRICS_FILE"))
+PROFILER = SamplingProfiler()
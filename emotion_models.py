@@ -0,0 +1,149 @@
+import os
+import time
+import resource
+import threading
+import numpy as np
+from deepface import DeepFace
+from deepface.modules.preprocessing import resize_image
+
+# Registro dos modelos usados pelo EmoScan
+#
+# O DeepFace já guarda os modelos construídos num cache global do módulo,
+# mas só os carrega na primeira análise, e o primeiro predict do TensorFlow
+# ainda paga a montagem do grafo. O registro carrega o detector de faces e
+# a rede de emoções uma vez por processo, faz uma inferência de aquecimento
+# e guarda quanto tempo e memória cada etapa custou.
+
+DETECTOR_BACKEND = "opencv"
+EMOTION_MODEL = "Emotion"
+# Mesma ordem das saídas da rede de emoções do DeepFace
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+
+
+# Função para ler o RSS atual do processo (em bytes)
+def current_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Fora do Linux usamos o pico (ru_maxrss vem em KiB no Linux e bytes no macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Função para construir um modelo em versões novas e antigas do DeepFace
+def build_deepface_model(task, model_name):
+    try:
+        return DeepFace.build_model(task=task, model_name=model_name)
+    except TypeError:
+        # Versões antigas não têm o parâmetro `task`
+        return DeepFace.build_model(model_name)
+
+
+class ModelRegistry:
+    def __init__(self, detector_backend=DETECTOR_BACKEND, emotion_model=EMOTION_MODEL):
+        self.detector_backend = detector_backend
+        self.emotion_model_name = emotion_model
+        self._models = {}
+        self._lock = threading.Lock()
+        # O CascadeClassifier do OpenCV não pode ser usado por duas threads ao
+        # mesmo tempo, e o DeepFace guarda um único detector para o processo
+        self._detect_lock = threading.Lock()
+        self.stats = {}
+
+    # Função para carregar (uma única vez) e medir um modelo
+    def _load(self, key, loader):
+        with self._lock:
+            if key not in self._models:
+                rss_before = current_rss()
+                start = time.perf_counter()
+                self._models[key] = loader()
+                self.stats[key] = {
+                    "load_seconds": time.perf_counter() - start,
+                    "rss_delta_bytes": current_rss() - rss_before,
+                }
+            return self._models[key]
+
+    def detector(self):
+        return self._load("detector", lambda: build_deepface_model("face_detector", self.detector_backend))
+
+    def emotion_model(self):
+        return self._load("emotion", lambda: build_deepface_model("facial_attribute", self.emotion_model_name))
+
+    # Função para carregar tudo e rodar uma inferência de aquecimento
+    def warm_up(self):
+        self.detector()
+        model = self.emotion_model()
+        with self._lock:
+            if "warm_up" not in self.stats:
+                start = time.perf_counter()
+                model.predict(np.zeros((224, 224, 3), dtype=np.float32))
+                with self._detect_lock:
+                    DeepFace.extract_faces(np.zeros((64, 64, 3), dtype=np.uint8),
+                                           detector_backend=self.detector_backend,
+                                           enforce_detection=False)
+                self.stats["warm_up"] = {"load_seconds": time.perf_counter() - start, "rss_delta_bytes": 0}
+        return self
+
+    # Função para detectar faces; retorna [(region, crop BGR)] (lista vazia se não houver faces)
+    def detect_faces(self, image):
+        self.detector()
+        with self._detect_lock:
+            faces = DeepFace.extract_faces(image, detector_backend=self.detector_backend,
+                                           enforce_detection=False, normalize_face=False)
+        detected = []
+        for face in faces:
+            # Sem detecção o DeepFace devolve a imagem inteira com confiança 0
+            if face.get("confidence", 0) <= 0:
+                continue
+            area = face["facial_area"]
+            region = {k: int(area[k]) for k in ("x", "y", "w", "h")}
+            # A face alinhada vem em RGB; o modelo de emoções espera BGR
+            crop = np.ascontiguousarray(face["face"][:, :, ::-1])
+            if crop.size:
+                detected.append((region, crop))
+        return detected
+
+    # Função para classificar vários recortes de face numa única chamada ao modelo
+    # Retorna uma matriz (n, 7) de probabilidades em % (mesma escala do DeepFace.analyze)
+    def predict_emotions(self, crops):
+        if not len(crops):
+            return np.zeros((0, len(EMOTION_LABELS)), dtype=np.float32)
+        model = self.emotion_model()
+        # Mesmo pré-processamento do DeepFace.analyze: 224x224 com borda, escala 0-1
+        batch = np.concatenate([resize_image(crop, (224, 224)) for crop in crops])
+        predictions = np.asarray(model.predict(batch), dtype=np.float32).reshape(len(crops), -1)
+        return 100 * predictions / predictions.sum(axis=1, keepdims=True)
+
+    # Função para identificar os modelos em uso (invalida caches de resultados quando muda)
+    def model_version(self):
+        version = getattr(DeepFace, "__version__", None)
+        if version is None:
+            from importlib.metadata import version as package_version
+            version = package_version("deepface")
+        return f"deepface-{version}/{self.detector_backend}/{self.emotion_model_name}"
+
+    def report(self):
+        return {
+            "models": dict(self.stats),
+            "total_load_seconds": sum(s["load_seconds"] for s in self.stats.values()),
+            "rss_bytes": current_rss(),
+        }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+# Função para obter o registro do processo (compartilhado entre sessões)
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+if __name__ == "__main__":
+    # Aquecimento fora do Streamlit (ex.: no build da imagem, para baixar os pesos)
+    import json
+    print(json.dumps(get_registry().warm_up().report(), indent=2))
@@ -0,0 +1,153 @@
+import json
+import hashlib
+import numpy as np
+from emotion_models import EMOTION_LABELS
+
+# Regras de ajuste emoção x contexto do EmoScan, declaradas como dados
+#
+# Cada regra diz: com `context` presente na cena, a massa de probabilidade
+# de `emotion` passa para `adjusted`, multiplicada por `weight` e somada a
+# `bonus` (limitada a MAX_CONFIDENCE). A ordem da lista é a prioridade: se
+# várias regras valem para a mesma emoção, vence a primeira.
+#
+# As regras são compiladas numa tabela (emoções x contextos) com o índice da
+# regra; o contexto de cada face vira uma linha de uma matriz booleana de
+# presença (faces x contextos), sem limite no número de contextos. Aplicar
+# as regras a N faces é um min sobre essa tabela e algumas operações
+# vetorizadas, cujo custo depende do número de emoções e contextos, não do
+# número de regras.
+
+MAX_CONFIDENCE = 95
+NO_ADJUSTMENT_REASON = "O contexto não alterou significativamente a interpretação da emoção"
+
+DEFAULT_RULES = [
+    {
+        "context": "escritório", "emotion": "sad", "adjusted": "concentrado", "bonus": 10,
+        "reason": "Em ambiente de trabalho, expressões sérias são frequentemente concentração",
+    },
+    {
+        "context": "festa", "emotion": "angry", "adjusted": "animado", "bonus": 5,
+        "reason": "Em festas, expressões intensas podem indicar animação",
+    },
+    {
+        "context": "natureza", "emotion": "neutral", "adjusted": "pensativo", "bonus": 8,
+        "reason": "Em ambientes naturais, neutralidade pode refletir contemplação",
+    },
+]
+
+
+class ContextRules:
+    def __init__(self, rules=DEFAULT_RULES, emotions=EMOTION_LABELS):
+        self.rules = [dict(rule) for rule in rules]
+        self.emotions = list(emotions)
+        self.contexts = list(dict.fromkeys(rule["context"] for rule in self.rules))
+        # Rótulos de saída: as emoções do modelo mais os rótulos novos das regras
+        self.labels = self.emotions + [label for label in dict.fromkeys(r["adjusted"] for r in self.rules)
+                                       if label not in self.emotions]
+        self._emotion_index = {label: i for i, label in enumerate(self.emotions)}
+        self._context_index = {context: i for i, context in enumerate(self.contexts)}
+        label_index = {label: i for i, label in enumerate(self.labels)}
+
+        # Índice `len(rules)` é a "regra nula" (sem ajuste), usada como sentinela
+        n = len(self.rules)
+        self.table = np.full((len(self.emotions), len(self.contexts)), n, dtype=np.int32)
+        # Percorre de trás para frente para a primeira regra prevalecer
+        for i in range(n - 1, -1, -1):
+            rule = self.rules[i]
+            if rule["emotion"] in self._emotion_index:
+                self.table[self._emotion_index[rule["emotion"]], self._context_index[rule["context"]]] = i
+        self.target = np.array([label_index[r["adjusted"]] for r in self.rules] + [0], dtype=np.int64)
+        self.weight = np.array([r.get("weight", 1.0) for r in self.rules] + [1.0])
+        self.bonus = np.array([r.get("bonus", 0.0) for r in self.rules] + [0.0])
+
+    # Função para ler as regras de um JSON (lista de objetos como em DEFAULT_RULES)
+    # O arquivo substitui DEFAULT_RULES; para mantê-las, copie-as para o JSON
+    @classmethod
+    def from_file(cls, path, emotions=EMOTION_LABELS):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), emotions)
+
+    # Função para identificar as regras em uso (entra na chave do cache de resultados)
+    def fingerprint(self):
+        data = json.dumps([self.rules, self.emotions], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()[:12]
+
+    # Função para converter as listas de contextos de N imagens na matriz de presença (N x contextos)
+    def context_presence(self, contexts):
+        contexts = list(contexts)
+        present = np.zeros((len(contexts), len(self.contexts)), dtype=bool)
+        for i, context in enumerate(contexts):
+            columns = [self._context_index[item] for item in context if item in self._context_index]
+            present[i, columns] = True
+        return present
+
+    # Função para aplicar as regras a N vetores de probabilidade (N x emoções, em %)
+    # Retorna (regra por face e emoção (N x E), vetores ajustados (N x rótulos))
+    def apply(self, probabilities, present):
+        probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1, len(self.emotions))
+        present = np.asarray(present, dtype=bool).reshape(len(probabilities), len(self.contexts))
+        n_rules = len(self.rules)
+        if not n_rules:
+            # Sem regras não há contextos nem o que ajustar (a tabela fica vazia)
+            return np.full(probabilities.shape, n_rules, dtype=np.int32), probabilities.copy()
+        rule = np.where(present[:, None, :], self.table[None, :, :], n_rules).min(axis=2)  # N x E
+        fired = rule < n_rules
+
+        adjusted = np.zeros((len(probabilities), len(self.labels)))
+        adjusted[:, :len(self.emotions)] = np.where(fired, 0.0, probabilities)
+        rows, cols = np.nonzero(fired)
+        if len(rows):
+            rule_ids = rule[rows, cols]
+            moved = np.minimum(MAX_CONFIDENCE, probabilities[rows, cols] * self.weight[rule_ids] + self.bonus[rule_ids])
+            np.add.at(adjusted, (rows, self.target[rule_ids]), moved)
+        return rule, adjusted
+
+    # Função para gerar os ajustes (mesmo formato de `adjust_emotion`) de várias faces de uma vez
+    def adjust_batch(self, probabilities, contexts):
+        probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1, len(self.emotions))
+        rule, adjusted = self.apply(probabilities, self.context_presence(contexts))
+        dominant = probabilities.argmax(axis=1)
+        adjustments = []
+        for i, e in enumerate(dominant):
+            r = rule[i, e]
+            confidence = float(probabilities[i, e])
+            if r < len(self.rules):
+                label = self.labels[self.target[r]]
+                adjustments.append({
+                    "original_emotion": self.emotions[e],
+                    "original_confidence": confidence,
+                    "adjusted_emotion": label,
+                    "adjusted_confidence": float(min(MAX_CONFIDENCE, confidence * self.weight[r] + self.bonus[r])),
+                    "reason": self.rules[r]["reason"],
+                    "adjusted_probabilities": dict(zip(self.labels, map(float, adjusted[i]))),
+                })
+            else:
+                adjustments.append({
+                    "original_emotion": self.emotions[e],
+                    "original_confidence": confidence,
+                    "adjusted_emotion": self.emotions[e],
+                    "adjusted_confidence": confidence,
+                    "reason": NO_ADJUSTMENT_REASON,
+                    "adjusted_probabilities": dict(zip(self.labels, map(float, adjusted[i]))),
+                })
+        return adjustments
+
+    # Função para ajustar só a emoção dominante (interface antiga de `adjust_emotion`)
+    def adjust(self, emotion, confidence, context):
+        result = {
+            "original_emotion": emotion,
+            "original_confidence": confidence,
+            "adjusted_emotion": emotion,
+            "adjusted_confidence": confidence,
+            "reason": NO_ADJUSTMENT_REASON,
+        }
+        e = self._emotion_index.get(emotion)
+        if e is None:
+            return result
+        present = [self._context_index[c] for c in context if c in self._context_index]
+        r = int(self.table[e, present].min()) if present else len(self.rules)
+        if r < len(self.rules):
+            result["adjusted_emotion"] = self.rules[r]["adjusted"]
+            result["adjusted_confidence"] = float(min(MAX_CONFIDENCE, confidence * self.weight[r] + self.bonus[r]))
+            result["reason"] = self.rules[r]["reason"]
+        return result
@@ -0,0 +1,242 @@
+import os
+
+# Só CPU: esconde GPUs antes de o TensorFlow ser importado pelo DeepFace
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+
+import sys
+import json
+import time
+import argparse
+import cv2
+import numpy as np
+from emotion_models import get_registry, EMOTION_LABELS
+
+# Modo vídeo do EmoScan (câmera ou arquivo), sem Streamlit
+#
+#   python emotion_video.py video.mp4 --detect-every 5 --batch 16 --saida frames.jsonl
+#   python emotion_video.py 0 --target-fps 15          # câmera 0
+#
+# O detector de faces roda só a cada `detect_every` frames; entre uma
+# detecção e outra as faces são seguidas por template matching numa janela
+# em volta da posição anterior, que custa bem menos que o detector. Os
+# recortes de vários frames são agrupados e passam pela rede de emoções em
+# lote. Se o processamento não acompanha o `target_fps`, frames são
+# descartados com `grab()` (sem decodificar) até o atraso sumir.
+
+
+# Função para calcular a interseção sobre união de duas regiões
+def iou(a, b):
+    x1, y1 = max(a["x"], b["x"]), max(a["y"], b["y"])
+    x2 = min(a["x"] + a["w"], b["x"] + b["w"])
+    y2 = min(a["y"] + a["h"], b["y"] + b["h"])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = a["w"] * a["h"] + b["w"] * b["h"] - inter
+    return inter / union if union else 0.0
+
+
+class FaceTracker:
+    def __init__(self, search_margin=0.5, min_score=0.5, min_iou=0.3):
+        self.search_margin = search_margin
+        self.min_score = min_score
+        self.min_iou = min_iou
+        self.tracks = {}
+        self._next_id = 0
+
+    # Função para substituir as faces seguidas pelas detectadas, mantendo os ids por IoU
+    def update_detections(self, gray, regions):
+        new_tracks = {}
+        free = dict(self.tracks)
+        for region in regions:
+            best = max(free, key=lambda t: iou(free[t]["region"], region), default=None)
+            if best is not None and iou(free[best]["region"], region) >= self.min_iou:
+                track_id = best
+                del free[best]
+            else:
+                track_id = self._next_id
+                self._next_id += 1
+            new_tracks[track_id] = self._make_track(gray, region)
+        self.tracks = new_tracks
+        return list(new_tracks.items())
+
+    def _make_track(self, gray, region):
+        x, y, w, h = region["x"], region["y"], region["w"], region["h"]
+        return {"region": region, "template": gray[y:y + h, x:x + w].copy()}
+
+    # Função para seguir cada face no frame novo; faces perdidas são descartadas
+    def track(self, gray):
+        height, width = gray.shape[:2]
+        for track_id in list(self.tracks):
+            track = self.tracks[track_id]
+            region, template = track["region"], track["template"]
+            mx, my = int(region["w"] * self.search_margin), int(region["h"] * self.search_margin)
+            x0, y0 = max(0, region["x"] - mx), max(0, region["y"] - my)
+            x1 = min(width, region["x"] + region["w"] + mx)
+            y1 = min(height, region["y"] + region["h"] + my)
+            window = gray[y0:y1, x0:x1]
+            if window.shape[0] < template.shape[0] or window.shape[1] < template.shape[1]:
+                del self.tracks[track_id]
+                continue
+            scores = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (dx, dy) = cv2.minMaxLoc(scores)
+            if score < self.min_score:
+                del self.tracks[track_id]
+                continue
+            track["region"] = {"x": x0 + dx, "y": y0 + dy, "w": region["w"], "h": region["h"]}
+        return list(self.tracks.items())
+
+
+class StageTimes:
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def summary(self):
+        return {
+            stage: {
+                "count": len(values),
+                "mean_ms": 1000 * float(np.mean(values)),
+                "p50_ms": 1000 * float(np.percentile(values, 50)),
+                "p95_ms": 1000 * float(np.percentile(values, 95)),
+            }
+            for stage, values in self.samples.items() if values
+        }
+
+
+# Função para abrir câmera (índice numérico) ou arquivo de vídeo
+def open_source(source):
+    capture = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if not capture.isOpened():
+        raise ValueError(f"Não foi possível abrir a fonte de vídeo: {source}")
+    return capture
+
+
+def process_stream(source, detect_every=5, batch_size=16, max_buffered_frames=4,
+                   target_fps=None, max_frames=None, registry=None, stats=None):
+    registry = registry or get_registry().warm_up()
+    stats = stats if stats is not None else StageTimes()
+    capture = open_source(source)
+    if target_fps is None:
+        # Para arquivos o alvo é a taxa do próprio vídeo; para câmera, 0 = sem limite
+        target_fps = capture.get(cv2.CAP_PROP_FPS) or 0
+    budget = 1.0 / target_fps if target_fps else 0.0
+
+    tracker = FaceTracker()
+    buffered, crops_count = [], 0
+    frame_index, processed, skipped = -1, 0, 0
+    frame_cost = 0.0
+
+    # Função para classificar os recortes acumulados e liberar os frames do buffer
+    def flush():
+        crops = [crop for item in buffered for _, _, crop in item["faces"]]
+        start = time.perf_counter()
+        probabilities = registry.predict_emotions(crops)
+        stats.add("emotion_batch", time.perf_counter() - start)
+        row = 0
+        for item in buffered:
+            faces = []
+            for track_id, region, _ in item["faces"]:
+                emotion = dict(zip(EMOTION_LABELS, map(float, probabilities[row])))
+                faces.append({
+                    "track_id": int(track_id),
+                    "region": {k: int(v) for k, v in region.items()},
+                    "emotion": emotion,
+                    "dominant_emotion": max(emotion, key=emotion.get),
+                })
+                row += 1
+            yield {"frame": item["frame"], "timestamp": item["timestamp"],
+                   "detected": item["detected"], "faces": faces}
+
+    try:
+        while max_frames is None or processed < max_frames:
+            start = time.perf_counter()
+            # Descarta frames sem decodificar enquanto o processamento estiver atrasado
+            if budget and frame_cost > budget:
+                to_skip = int(frame_cost / budget) - 1
+                for _ in range(to_skip):
+                    if not capture.grab():
+                        break
+                    frame_index += 1
+                    skipped += 1
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frame_index += 1
+            stats.add("decode", time.perf_counter() - start)
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            detected = processed % detect_every == 0
+            stage_start = time.perf_counter()
+            if detected:
+                faces = registry.detect_faces(frame)
+                tracks = tracker.update_detections(gray, [region for region, _ in faces])
+                items = [(track_id, track["region"], crop) for (track_id, track), (_, crop) in zip(tracks, faces)]
+                stats.add("detect", time.perf_counter() - stage_start)
+            else:
+                tracks = tracker.track(gray)
+                items = [(track_id, track["region"],
+                          frame[track["region"]["y"]:track["region"]["y"] + track["region"]["h"],
+                                track["region"]["x"]:track["region"]["x"] + track["region"]["w"]])
+                         for track_id, track in tracks]
+                stats.add("track", time.perf_counter() - stage_start)
+
+            buffered.append({"frame": frame_index, "timestamp": capture.get(cv2.CAP_PROP_POS_MSEC) / 1000,
+                             "detected": detected, "faces": items})
+            crops_count += len(items)
+            processed += 1
+
+            if crops_count >= batch_size or len(buffered) >= max_buffered_frames:
+                yield from flush()
+                buffered, crops_count = [], 0
+
+            elapsed = time.perf_counter() - start
+            stats.add("frame_total", elapsed)
+            # Média móvel do custo por frame, usada para decidir o descarte
+            frame_cost = 0.8 * frame_cost + 0.2 * elapsed if frame_cost else elapsed
+
+        if buffered:
+            yield from flush()
+    finally:
+        capture.release()
+        stats.processed = processed
+        stats.skipped = skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise de emoções em vídeo (CPU)")
+    parser.add_argument("source", help="Arquivo de vídeo ou índice da câmera (ex.: 0)")
+    parser.add_argument("--detect-every", type=int, default=5, help="Roda o detector a cada N frames")
+    parser.add_argument("--batch", type=int, default=16, help="Recortes de face por lote do modelo")
+    parser.add_argument("--max-buffered-frames", type=int, default=4,
+                        help="Frames acumulados no máximo antes de rodar o lote")
+    parser.add_argument("--target-fps", type=float, help="Taxa alvo; padrão = taxa do vídeo (0 = sem descarte)")
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--saida", help="Arquivo JSONL com o resultado de cada frame")
+    args = parser.parse_args(argv)
+
+    stats = StageTimes()
+    output = open(args.saida, "w", encoding="utf-8") if args.saida else None
+    start = time.perf_counter()
+    frames = 0
+    try:
+        for result in process_stream(args.source, args.detect_every, args.batch, args.max_buffered_frames,
+                                     args.target_fps, args.max_frames, stats=stats):
+            frames += 1
+            if output:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "frames_processed": frames,
+        "frames_skipped": getattr(stats, "skipped", 0),
+        "sustained_fps": frames / elapsed if elapsed else 0.0,
+        "stages": stats.summary(),
+    }, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
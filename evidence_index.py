@@ -0,0 +1,321 @@
+import os
+import json
+import argparse
+from array import array
+from collections import Counter
+from text_core.tardio import ModuloTardio
+from text_core.tokens import STOPWORDS, tokenizar
+from text_core.sentencas import dividir_trechos
+
+np = ModuloTardio("numpy")
+
+# Índice local de evidências (BM25) para o verificador de fatos, sem rede
+#
+# Construído a partir de um dump em JSONL, um artigo por linha, com
+# "title"/"titulo", "text"/"texto" e opcionalmente "url"/"link". É o formato
+# do `wikiextractor --json`. Cada artigo é quebrado em trechos (parágrafos
+# ou sentenças) e cada trecho vira um documento do índice invertido.
+#
+# Layout do diretório:
+#   manifesto.json      parâmetros do BM25, número de trechos e granularidade
+#   vocabulario.json    termo -> id
+#   indptr.npy          início das postings de cada termo (CSR, termo x trecho)
+#   trechos.npy         id do trecho de cada posting
+#   frequencias.npy     frequência do termo no trecho
+#   comprimentos.npy    número de termos de cada trecho
+#   textos.jsonl        {"titulo", "texto", "link"} de cada trecho
+#   offsets.npy         posição de cada trecho em textos.jsonl
+#
+# Os arrays são abertos com mmap_mode='r': uma consulta só lê as postings
+# dos seus termos, e vários processos compartilham o índice pelo page cache.
+# A criação também cabe em memória limitada: as postings vão para blocos
+# ordenados em blocos.tmp/ e são intercaladas no final (ver `criar`).
+
+MANIFESTO = "manifesto.json"
+# Postings (10 bytes cada) acumuladas em memória antes de ir para um bloco em disco
+POSTINGS_POR_BLOCO = 5_000_000
+
+
+def ler_dump(caminho):
+    """Gera (título, texto, link) de um dump JSONL"""
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            if not linha.strip():
+                continue
+            registro = json.loads(linha)
+            yield (registro.get('titulo', registro.get('title', '')),
+                   registro.get('texto', registro.get('text', '')),
+                   registro.get('link', registro.get('url', '')))
+
+
+def _npy_gravavel(caminho, dtype, n):
+    """Array .npy novo de `n` posições, mapeado em memória para escrita"""
+    return np.lib.format.open_memmap(caminho, mode='w+', dtype=dtype, shape=(n,))
+
+
+def _bruto_para_npy(origem, destino, dtype, n, passo=1 << 20):
+    """Converte um arquivo binário cru (array.tofile) em .npy, em pedaços, e apaga o original"""
+    saida = _npy_gravavel(destino, dtype, n)
+    tamanho = np.dtype(dtype).itemsize
+    with open(origem, 'rb') as f:
+        for inicio in range(0, n, passo):
+            fim = min(inicio + passo, n)
+            saida[inicio:fim] = np.frombuffer(f.read((fim - inicio) * tamanho), dtype=dtype)
+    saida.flush()
+    del saida
+    os.remove(origem)
+
+
+class IndiceEvidencias:
+    """Índice invertido BM25 de trechos, mapeado em memória"""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, MANIFESTO), encoding='utf-8') as f:
+            self.manifesto = json.load(f)
+        with open(os.path.join(diretorio, "vocabulario.json"), encoding='utf-8') as f:
+            self.vocabulario = json.load(f)
+        carregar = lambda nome: np.load(os.path.join(diretorio, nome), mmap_mode='r')
+        self.indptr = carregar("indptr.npy")
+        self.trechos = carregar("trechos.npy")
+        self.frequencias = carregar("frequencias.npy")
+        self.comprimentos = carregar("comprimentos.npy")
+        self.offsets = carregar("offsets.npy")
+        self.k1 = self.manifesto['k1']
+        self.b = self.manifesto['b']
+        n = self.manifesto['trechos']
+        df = np.diff(self.indptr)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # Parte do denominador do BM25 que só depende do trecho
+        self.normalizacao = (self.k1 * (1 - self.b + self.b * self.comprimentos / self.manifesto['comprimento_medio'])
+                             ).astype(np.float32)
+        self._textos = None
+
+    @classmethod
+    def abrir(cls, diretorio):
+        return cls(diretorio)
+
+    def __len__(self):
+        return self.manifesto['trechos']
+
+    @classmethod
+    def criar(cls, diretorio, artigos, granularidade="paragrafo", k1=1.2, b=0.75,
+              postings_por_bloco=POSTINGS_POR_BLOCO):
+        """Grava um índice novo a partir de (título, texto, link)
+
+        As postings são acumuladas em arrays compactos (10 bytes cada); a
+        cada `postings_por_bloco` elas são ordenadas por termo e gravadas
+        num bloco temporário, e no final os blocos são intercalados direto
+        nos arrays finais, mapeados em memória. Comprimentos e offsets dos
+        trechos também vão para o disco conforme o dump é lido. A memória
+        fica limitada pelo bloco e pelo vocabulário (dict termo -> id, na
+        ordem de 100 bytes por termo), que é o único que cresce com o dump.
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        temporario = os.path.join(diretorio, "blocos.tmp")
+        os.makedirs(temporario, exist_ok=True)
+        vocabulario = {}
+        blocos = []
+        contagem = np.zeros(0, dtype=np.int64)
+        termos, trechos, frequencias = array('i'), array('i'), array('H')
+        comprimentos, offsets = array('i'), array('q')
+        n, total_termos = 0, 0
+        arquivo_comprimentos = open(os.path.join(temporario, "comprimentos.bin"), 'wb')
+        arquivo_offsets = open(os.path.join(temporario, "offsets.bin"), 'wb')
+
+        def despejar():
+            nonlocal contagem, termos, trechos, frequencias, comprimentos, offsets
+            comprimentos.tofile(arquivo_comprimentos)
+            offsets.tofile(arquivo_offsets)
+            comprimentos, offsets = array('i'), array('q')
+            if not termos:
+                return
+            # Dentro do bloco os trechos já estão em ordem; a ordenação estável por termo mantém isso
+            ids_termos = np.frombuffer(termos, dtype=np.int32)
+            ordem = np.argsort(ids_termos, kind='stable')
+            prefixo = os.path.join(temporario, f"{len(blocos):05d}")
+            np.save(prefixo + "_termos.npy", ids_termos[ordem])
+            np.save(prefixo + "_trechos.npy", np.frombuffer(trechos, dtype=np.int32)[ordem])
+            np.save(prefixo + "_frequencias.npy", np.frombuffer(frequencias, dtype=np.uint16)[ordem])
+            blocos.append(prefixo)
+            contagem_bloco = np.bincount(ids_termos, minlength=len(vocabulario))
+            contagem_bloco[:len(contagem)] += contagem
+            contagem = contagem_bloco
+            termos, trechos, frequencias = array('i'), array('i'), array('H')
+
+        with open(os.path.join(diretorio, "textos.jsonl"), 'wb') as f:
+            for titulo, texto, link in artigos:
+                for trecho in dividir_trechos(texto, granularidade):
+                    contagem_trecho = Counter(tokenizar(trecho))
+                    if not contagem_trecho:
+                        continue
+                    for termo, frequencia in contagem_trecho.items():
+                        termos.append(vocabulario.setdefault(termo, len(vocabulario)))
+                        trechos.append(n)
+                        frequencias.append(min(frequencia, 65535))
+                    comprimento = sum(contagem_trecho.values())
+                    comprimentos.append(comprimento)
+                    offsets.append(f.tell())
+                    n += 1
+                    total_termos += comprimento
+                    registro = {'titulo': titulo, 'texto': trecho, 'link': link}
+                    f.write(json.dumps(registro, ensure_ascii=False).encode('utf-8') + b"\n")
+                    if len(termos) >= postings_por_bloco:
+                        despejar()
+        despejar()
+        arquivo_comprimentos.close()
+        arquivo_offsets.close()
+
+        # Intercala os blocos: as postings de um termo ficam na ordem dos blocos, que é a dos trechos
+        contagem = np.concatenate([contagem, np.zeros(len(vocabulario) - len(contagem), dtype=np.int64)])
+        indptr = np.zeros(len(vocabulario) + 1, dtype=np.int64)
+        np.cumsum(contagem, out=indptr[1:])
+        postings = int(indptr[-1])
+        saida_trechos = _npy_gravavel(os.path.join(diretorio, "trechos.npy"), np.int32, postings)
+        saida_frequencias = _npy_gravavel(os.path.join(diretorio, "frequencias.npy"), np.uint16, postings)
+        escritos = np.zeros(len(vocabulario), dtype=np.int64)
+        for prefixo in blocos:
+            ids_termos = np.load(prefixo + "_termos.npy")
+            inicio_termo = np.searchsorted(ids_termos, ids_termos, side='left')
+            destino = indptr[ids_termos] + escritos[ids_termos] + (np.arange(len(ids_termos)) - inicio_termo)
+            saida_trechos[destino] = np.load(prefixo + "_trechos.npy")
+            saida_frequencias[destino] = np.load(prefixo + "_frequencias.npy")
+            escritos += np.bincount(ids_termos, minlength=len(vocabulario))
+            for sufixo in ("_termos.npy", "_trechos.npy", "_frequencias.npy"):
+                os.remove(prefixo + sufixo)
+        saida_trechos.flush()
+        saida_frequencias.flush()
+        del saida_trechos, saida_frequencias
+
+        np.save(os.path.join(diretorio, "indptr.npy"), indptr)
+        _bruto_para_npy(os.path.join(temporario, "comprimentos.bin"),
+                        os.path.join(diretorio, "comprimentos.npy"), np.int32, n)
+        _bruto_para_npy(os.path.join(temporario, "offsets.bin"), os.path.join(diretorio, "offsets.npy"), np.int64, n)
+        os.rmdir(temporario)
+        with open(os.path.join(diretorio, "vocabulario.json"), 'w', encoding='utf-8') as f:
+            json.dump(vocabulario, f, ensure_ascii=False)
+
+        manifesto = {
+            'trechos': n,
+            'termos': len(vocabulario),
+            'postings': postings,
+            'granularidade': granularidade,
+            'k1': k1,
+            'b': b,
+            'comprimento_medio': (total_termos / n) if n else 1.0,
+        }
+        # O manifesto é gravado por último: um índice sem ele está incompleto
+        with open(os.path.join(diretorio, MANIFESTO), 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f, ensure_ascii=False)
+        return cls(diretorio)
+
+    def pontuar(self, consulta):
+        """(ids dos trechos, scores BM25) de todos os trechos com algum termo da consulta"""
+        ids_termos = sorted({self.vocabulario[t] for t in tokenizar(consulta) if t in self.vocabulario})
+        if not ids_termos:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        ids, contribuicoes = [], []
+        for termo in ids_termos:
+            inicio, fim = self.indptr[termo], self.indptr[termo + 1]
+            trechos = np.asarray(self.trechos[inicio:fim])
+            tf = np.asarray(self.frequencias[inicio:fim], dtype=np.float32)
+            ids.append(trechos)
+            contribuicoes.append(self.idf[termo] * tf * (self.k1 + 1) / (tf + self.normalizacao[trechos]))
+        ids = np.concatenate(ids)
+        contribuicoes = np.concatenate(contribuicoes)
+        # Soma as contribuições de cada trecho
+        unicos, posicoes = np.unique(ids, return_inverse=True)
+        return unicos, np.bincount(posicoes, weights=contribuicoes).astype(np.float32)
+
+    def buscar(self, consulta, k=10):
+        """Os k trechos mais relevantes: lista de {id, score, titulo, texto, link}"""
+        ids, scores = self.pontuar(consulta)
+        if not len(ids):
+            return []
+        if len(ids) > k:
+            melhores = np.argpartition(-scores, k - 1)[:k]
+        else:
+            melhores = np.arange(len(ids))
+        melhores = melhores[np.argsort(-scores[melhores], kind='stable')]
+        return [{'id': int(ids[i]), 'score': float(scores[i]), **self.texto(int(ids[i]))} for i in melhores]
+
+    def texto(self, id_trecho):
+        """Lê um trecho sem carregar os demais"""
+        if self._textos is None:
+            self._textos = open(os.path.join(self.diretorio, "textos.jsonl"), 'rb')
+        self._textos.seek(int(self.offsets[id_trecho]))
+        return json.loads(self._textos.readline())
+
+    def fechar(self):
+        if self._textos is not None:
+            self._textos.close()
+            self._textos = None
+
+
+class BackendIndiceLocal:
+    """Backend do BUSCADOR que consulta o índice local em vez da Wikipedia
+
+    Consulta com a afirmação inteira (`consulta = "afirmacao"`) e devolve
+    os `k` trechos mais relevantes como fontes.
+    """
+    nome = "indice_local"
+    host = "local"
+    consulta = "afirmacao"
+
+    def __init__(self, indice, k=5, credibilidade=0.8, timeout=1.0):
+        self.indice = indice
+        self.k = k
+        self.credibilidade = credibilidade
+        self.timeout = timeout
+
+    def obter(self, titulo, cabecalhos=None, timeout=None):
+        trechos = self.indice.buscar(titulo, self.k)
+        return {"status": 200 if trechos else 404, "dados": trechos, "cabecalhos": {}}
+
+    def fontes(self, titulo, resposta):
+        return [
+            {
+                'titulo': trecho['titulo'],
+                'texto': trecho['texto'],
+                'link': trecho['link'],
+                'keyword': titulo,
+                'backend': self.nome,
+                'credibilidade': self.credibilidade,
+                'bm25': trecho['score'],
+            }
+            for trecho in resposta["dados"]
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice local de evidências (BM25) do verificador de fatos")
+    parser.add_argument("diretorio", help="Diretório do índice")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_criar = sub.add_parser("criar", help="Cria o índice a partir de um dump JSONL (title/text/url)")
+    p_criar.add_argument("dump")
+    p_criar.add_argument("--granularidade", choices=["paragrafo", "sentenca"], default="paragrafo")
+    p_criar.add_argument("--postings-por-bloco", type=int, default=POSTINGS_POR_BLOCO,
+                         help="Postings em memória antes de gravar um bloco temporário")
+
+    p_buscar = sub.add_parser("buscar", help="Mostra os trechos mais relevantes para uma consulta")
+    p_buscar.add_argument("consulta")
+    p_buscar.add_argument("-k", type=int, default=5)
+
+    sub.add_parser("info", help="Mostra o tamanho do índice")
+    args = parser.parse_args()
+
+    if args.comando == "criar":
+        indice = IndiceEvidencias.criar(args.diretorio, ler_dump(args.dump), args.granularidade,
+                                        postings_por_bloco=args.postings_por_bloco)
+    else:
+        indice = IndiceEvidencias.abrir(args.diretorio)
+        if args.comando == "buscar":
+            for trecho in indice.buscar(args.consulta, args.k):
+                print(json.dumps(trecho, ensure_ascii=False))
+            return
+    print(json.dumps(indice.manifesto, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import re
+import time
+import zlib
+import pickle
+import numpy as np
+
+# Geração de candidatos por MinHash + LSH para o detector de plágio
+#
+# Cada texto vira um conjunto de shingles de palavras; a assinatura MinHash
+# aproxima a similaridade de Jaccard entre conjuntos. A assinatura é cortada
+# em bandas e textos que coincidem em pelo menos uma banda caem no mesmo
+# balde. Só esses candidatos passam pelo cosseno TF-IDF exato.
+#
+# Mais bandas (com menos linhas cada) = mais recall e mais candidatos.
+
+PRIMO = np.uint64((1 << 61) - 1)
+PADRAO_PALAVRA = re.compile(r'\w+')
+
+
+def shingles(texto, tamanho=1):
+    """Conjunto de n-gramas de palavras (minúsculas) do texto"""
+    palavras = PADRAO_PALAVRA.findall(texto.lower())
+    if len(palavras) < tamanho:
+        return {" ".join(palavras)} if palavras else set()
+    return {" ".join(palavras[i:i + tamanho]) for i in range(len(palavras) - tamanho + 1)}
+
+
+class IndiceLSH:
+    """Índice MinHash/LSH que devolve os top-k candidatos de uma sentença"""
+
+    def __init__(self, num_permutacoes=128, bandas=32, tamanho_shingle=1, semente=42):
+        if num_permutacoes % bandas:
+            raise ValueError("num_permutacoes precisa ser múltiplo de bandas")
+        self.num_permutacoes = num_permutacoes
+        self.bandas = bandas
+        self.linhas_por_banda = num_permutacoes // bandas
+        self.tamanho_shingle = tamanho_shingle
+
+        rng = np.random.default_rng(semente)
+        self._a = rng.integers(1, 1 << 61, size=num_permutacoes, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 61, size=num_permutacoes, dtype=np.uint64)
+
+        self.baldes = [{} for _ in range(bandas)]
+        self.assinaturas = {}
+
+    def assinatura(self, texto):
+        """Assinatura MinHash (vetor uint64 de tamanho num_permutacoes)"""
+        conjunto = shingles(texto, self.tamanho_shingle)
+        if not conjunto:
+            return np.full(self.num_permutacoes, PRIMO, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in conjunto),
+                             dtype=np.uint64, count=len(conjunto))
+        # (a*x + b) mod p para todas as permutações de uma vez; o overflow
+        # de uint64 é intencional (só precisamos de uma família de hashes)
+        with np.errstate(over='ignore'):
+            valores = (hashes[:, None] * self._a[None, :] + self._b[None, :]) % PRIMO
+        return valores.min(axis=0)
+
+    def _chaves_bandas(self, assinatura):
+        r = self.linhas_por_banda
+        return [assinatura[i * r:(i + 1) * r].tobytes() for i in range(self.bandas)]
+
+    def adicionar(self, ids, textos):
+        """Insere textos no índice com os ids do índice TF-IDF correspondente"""
+        for id_texto, texto in zip(ids, textos):
+            assinatura = self.assinatura(texto)
+            self.assinaturas[int(id_texto)] = assinatura
+            for balde, chave in zip(self.baldes, self._chaves_bandas(assinatura)):
+                balde.setdefault(chave, []).append(int(id_texto))
+
+    @classmethod
+    def de_indice(cls, indice, **kwargs):
+        """Constrói o LSH sobre todos os textos ativos de um índice TF-IDF"""
+        lsh = cls(**kwargs)
+        ids, textos = [], []
+        for id_texto, texto in indice.itens():
+            ids.append(id_texto)
+            textos.append(texto)
+        lsh.adicionar(ids, textos)
+        return lsh
+
+    def candidatos(self, texto, top_k=50):
+        """Ids candidatos ordenados pela similaridade de Jaccard estimada"""
+        assinatura = self.assinatura(texto)
+        encontrados = set()
+        for balde, chave in zip(self.baldes, self._chaves_bandas(assinatura)):
+            encontrados.update(balde.get(chave, ()))
+        if not encontrados:
+            return []
+        ids = np.fromiter(encontrados, dtype=np.int64, count=len(encontrados))
+        estimativas = (np.stack([self.assinaturas[i] for i in ids]) == assinatura).mean(axis=1)
+        if len(ids) > top_k:
+            melhores = np.argpartition(-estimativas, top_k - 1)[:top_k]
+            ids, estimativas = ids[melhores], estimativas[melhores]
+        return ids[np.argsort(-estimativas, kind='stable')].tolist()
+
+    def salvar(self, caminho):
+        with open(caminho, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def carregar(caminho):
+        with open(caminho, 'rb') as f:
+            return pickle.load(f)
+
+
+def avaliar_recall(indice, lsh, sentencas, top_k=50, k_referencia=1):
+    """Compara os candidatos do LSH com a busca exaustiva
+
+    Para cada sentença pega os `k_referencia` textos mais similares pelo
+    cosseno exato (ignorando similaridade zero) e mede quantos aparecem entre
+    os candidatos. Retorna recall, média de candidatos e os tempos dos dois
+    caminhos, para ajustar bandas/top_k.
+    """
+    sentencas = list(sentencas)
+
+    inicio = time.perf_counter()
+    matriz_sim = indice.similaridades(sentencas)
+    tempo_exaustivo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lista_candidatos = [lsh.candidatos(s, top_k) for s in sentencas]
+    tempo_lsh = time.perf_counter() - inicio
+
+    acertos = total = 0
+    for similaridades, candidatos in zip(matriz_sim, lista_candidatos):
+        referencia = np.argsort(-similaridades, kind='stable')[:k_referencia]
+        referencia = [i for i in referencia if similaridades[i] > 0]
+        candidatos = set(candidatos)
+        acertos += sum(1 for i in referencia if i in candidatos)
+        total += len(referencia)
+
+    return {
+        'recall': acertos / total if total else 1.0,
+        'media_candidatos': float(np.mean([len(c) for c in lista_candidatos])) if lista_candidatos else 0.0,
+        'tamanho_corpus': len(indice),
+        'tempo_exaustivo': tempo_exaustivo,
+        'tempo_candidatos': tempo_lsh
+    }
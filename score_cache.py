@@ -0,0 +1,114 @@
+import time
+import sqlite3
+import hashlib
+import threading
+from text_core.tardio import ModuloTardio
+from text_core.tokens import normalizar
+
+np = ModuloTardio("numpy")
+
+# Cache em disco dos top-k do detector de plágio
+#
+# A chave é o hash da sentença normalizada mais a versão do índice, então
+# qualquer alteração no corpus (novo ajuste, documentos adicionados ou
+# removidos) invalida as entradas antigas automaticamente. Guardamos só os
+# scores e ids dos k mais similares: a classificação por limiar é feita
+# depois, então mudar a sensibilidade não precisa recalcular nada.
+
+
+def chave(sentenca, versao):
+    return hashlib.sha256(f"{versao}\x00{normalizar(sentenca)}".encode('utf-8')).hexdigest()
+
+
+class CacheSimilaridade:
+    """Cache SQLite (sentença, versão do índice) -> top-k, com despejo LRU"""
+
+    def __init__(self, caminho=":memory:", max_entradas=200_000):
+        self.max_entradas = max_entradas
+        self.acertos = 0
+        self.faltas = 0
+        self._lock = threading.Lock()
+        # Compartilhado entre as threads do Streamlit; o lock serializa o uso
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS resultados (
+                chave TEXT PRIMARY KEY,
+                k INTEGER NOT NULL,
+                scores BLOB NOT NULL,
+                ids BLOB NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )
+        """)
+        self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_acesso ON resultados (ultimo_acesso)")
+        self._conexao.commit()
+
+    def obter(self, sentencas, versao, top_k):
+        """Dict posição -> (scores, ids) para as sentenças que estão no cache
+        com pelo menos `top_k` resultados"""
+        chaves = [chave(s, versao) for s in sentencas]
+        encontrados = {}
+        with self._lock:
+            linhas = {}
+            # Consulta em blocos por causa do limite de parâmetros do SQLite
+            for inicio in range(0, len(chaves), 500):
+                bloco = chaves[inicio:inicio + 500]
+                marcadores = ",".join("?" * len(bloco))
+                for c, k, scores, ids in self._conexao.execute(
+                        f"SELECT chave, k, scores, ids FROM resultados WHERE chave IN ({marcadores}) AND k >= ?",
+                        (*bloco, top_k)):
+                    linhas[c] = (np.frombuffer(scores, dtype=np.float32)[:top_k],
+                                 np.frombuffer(ids, dtype=np.int64)[:top_k])
+            if linhas:
+                agora = time.time()
+                self._conexao.executemany("UPDATE resultados SET ultimo_acesso = ? WHERE chave = ?",
+                                          [(agora, c) for c in linhas])
+                self._conexao.commit()
+
+        for posicao, c in enumerate(chaves):
+            if c in linhas:
+                encontrados[posicao] = linhas[c]
+        self.acertos += len(encontrados)
+        self.faltas += len(chaves) - len(encontrados)
+        return encontrados
+
+    def guardar(self, sentencas, versao, scores, ids):
+        """Grava os top-k (linhas de `scores`/`ids`) de cada sentença"""
+        agora = time.time()
+        registros = [
+            (chave(s, versao), int(sc.shape[0]), np.asarray(sc, dtype=np.float32).tobytes(),
+             np.asarray(ii, dtype=np.int64).tobytes(), agora)
+            for s, sc, ii in zip(sentencas, scores, ids)
+        ]
+        with self._lock:
+            # Não troca uma entrada com k maior por uma com k menor
+            self._conexao.executemany("""
+                INSERT INTO resultados (chave, k, scores, ids, ultimo_acesso) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(chave) DO UPDATE SET
+                    k = excluded.k, scores = excluded.scores, ids = excluded.ids,
+                    ultimo_acesso = excluded.ultimo_acesso
+                WHERE excluded.k >= resultados.k
+            """, registros)
+            self._despejar()
+            self._conexao.commit()
+
+    def _despejar(self):
+        """Remove as entradas acessadas há mais tempo acima do limite"""
+        total = self._conexao.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+        if total > self.max_entradas:
+            self._conexao.execute("""
+                DELETE FROM resultados WHERE chave IN (
+                    SELECT chave FROM resultados ORDER BY ultimo_acesso LIMIT ?
+                )
+            """, (total - self.max_entradas,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+    def estatisticas(self):
+        return {'entradas': len(self), 'acertos': self.acertos, 'faltas': self.faltas}
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
@@ -0,0 +1,79 @@
+import os
+
+from evidence_index import IndiceEvidencias, BackendIndiceLocal, ler_dump
+
+# Testes do índice BM25 local, construído a partir de um dump JSONL pequeno
+#
+#   python -m pytest tests
+
+DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "evidencias.jsonl")
+
+
+def criar_indice(tmp_path, granularidade="paragrafo"):
+    return IndiceEvidencias.criar(str(tmp_path / "indice"), ler_dump(DUMP), granularidade)
+
+
+def test_criar_grava_um_trecho_por_paragrafo(tmp_path):
+    indice = criar_indice(tmp_path)
+    assert len(indice) == 7
+    assert indice.texto(0) == {
+        'titulo': "Python (programming language)",
+        'texto': "Python is a high-level, general-purpose programming language. "
+                 "Its design philosophy emphasizes code readability.",
+        'link': "https://en.wikipedia.org/wiki/Python_(programming_language)",
+    }
+    indice.fechar()
+
+
+def test_criar_em_blocos_grava_os_mesmos_arquivos(tmp_path):
+    inteiro = criar_indice(tmp_path)
+    em_blocos = IndiceEvidencias.criar(str(tmp_path / "blocos"), ler_dump(DUMP), postings_por_bloco=5)
+    for nome in ("indptr.npy", "trechos.npy", "frequencias.npy", "comprimentos.npy", "offsets.npy",
+                 "textos.jsonl", "vocabulario.json", "manifesto.json"):
+        assert (tmp_path / "indice" / nome).read_bytes() == (tmp_path / "blocos" / nome).read_bytes(), nome
+    assert not (tmp_path / "blocos" / "blocos.tmp").exists()
+    inteiro.fechar()
+    em_blocos.fechar()
+
+
+def test_buscar_ordena_por_relevancia(tmp_path):
+    indice = criar_indice(tmp_path)
+    resultados = indice.buscar("Guido van Rossum created Python", k=3)
+    assert [r['texto'] for r in resultados[:2]] == [
+        "Python was created by Guido van Rossum and first released in 1991.",
+        "Guido van Rossum is a Dutch programmer best known as the creator of the Python programming language.",
+    ]
+    scores = [r['score'] for r in resultados]
+    assert scores == sorted(scores, reverse=True) and scores[-1] > 0
+
+    assert indice.buscar("theory of relativity", k=1)[0]['titulo'] == "Albert Einstein"
+    # k maior que o número de trechos com algum termo devolve só esses trechos
+    assert [r['titulo'] for r in indice.buscar("Torvalds", k=10)] == ["Linux"]
+    indice.fechar()
+
+
+def test_reabrir_da_os_mesmos_resultados(tmp_path):
+    criado = criar_indice(tmp_path, "sentenca")
+    esperado = criado.buscar("Einstein Nobel Prize physics", k=5)
+    criado.fechar()
+    aberto = IndiceEvidencias.abrir(str(tmp_path / "indice"))
+    assert aberto.buscar("Einstein Nobel Prize physics", k=5) == esperado
+    aberto.fechar()
+
+
+def test_backend_local(tmp_path):
+    indice = criar_indice(tmp_path)
+    backend = BackendIndiceLocal(indice, k=2)
+
+    resposta = backend.obter("Linux kernel operating systems")
+    assert resposta["status"] == 200
+    fontes = backend.fontes("Linux kernel operating systems", resposta)
+    assert fontes[0]['titulo'] == "Linux" and fontes[0]['backend'] == "indice_local"
+    assert fontes[0]['keyword'] == "Linux kernel operating systems" and fontes[0]['bm25'] > 0
+
+    # Sem nenhum termo no vocabulário (ou só stopwords) não há fontes: 404
+    for consulta in ("quantum chromodynamics", "the of and", ""):
+        resposta = backend.obter(consulta)
+        assert resposta == {"status": 404, "dados": [], "cabecalhos": {}}
+        assert backend.fontes(consulta, resposta) == []
+    indice.fechar()
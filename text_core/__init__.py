@@ -0,0 +1,45 @@
+# Núcleo de processamento de texto compartilhado pelo detector de plágio
+# (copy_detector) e pelo verificador de fatos (agents_check)
+#
+#   tokens         normalização e tokenização (português e inglês) com cache
+#   sentencas      divisão em sentenças e trechos, também em streaming
+#   similaridade   sobreposição de palavras, cosseno e top-k em blocos
+#   tardio         importação tardia de dependências pesadas
+#
+# Nada aqui importa numpy, scipy, sklearn ou streamlit na carga do módulo:
+# essas dependências só são carregadas quando uma função que precisa delas
+# é chamada, então CLIs e workers sobem em dezenas de milissegundos. Os
+# caches de tokens são do processo, então os dois apps (e o índice BM25)
+# reaproveitam o mesmo vocabulário normalizado quando rodam juntos.
+
+import importlib
+
+_NOMES = {
+    'STOPWORDS': 'tokens',
+    'normalizar': 'tokens',
+    'termos': 'tokens',
+    'tokenizar': 'tokens',
+    'palavras': 'tokens',
+    'estatisticas_cache': 'tokens',
+    'SEPARADOR_SENTENCAS': 'sentencas',
+    'dividir_em_sentencas': 'sentencas',
+    'segmentar_fluxo': 'sentencas',
+    'dividir_trechos': 'sentencas',
+    'matriz_binaria': 'similaridade',
+    'sobreposicao': 'similaridade',
+    'cosseno': 'similaridade',
+    'topk_similares': 'similaridade',
+    'ModuloTardio': 'tardio',
+    'recurso_streamlit': 'tardio',
+}
+
+__all__ = sorted(_NOMES)
+
+
+# Função para resolver `text_core.<nome>` só quando ele é usado
+def __getattr__(nome):
+    if nome not in _NOMES:
+        raise AttributeError(f"module 'text_core' has no attribute '{nome}'")
+    valor = getattr(importlib.import_module(f"{__name__}.{_NOMES[nome]}"), nome)
+    globals()[nome] = valor
+    return valor
@@ -0,0 +1,66 @@
+import re
+
+# Divisão de textos em sentenças e trechos
+#
+# `dividir_em_sentencas` e `segmentar_fluxo` seguem o critério do detector
+# de plágio (separa em . ! ? e descarta pedaços de até 20 caracteres);
+# `dividir_trechos` quebra os artigos do índice de evidências em parágrafos
+# ou sentenças.
+
+# Regex simples para dividir sentenças
+SEPARADOR_SENTENCAS = re.compile(r'[.!?]+')
+FIM_SENTENCA = re.compile(r"(?<=[.!?])\s+")
+PARAGRAFO = re.compile(r"\n\s*\n|\n")
+MINIMO_CARACTERES = 20
+
+
+def dividir_em_sentencas(texto):
+    """Divide texto em sentenças"""
+    sentencas = SEPARADOR_SENTENCAS.split(texto)
+    # Remove sentenças muito curtas
+    sentencas = [s.strip() for s in sentencas if len(s.strip()) > MINIMO_CARACTERES]
+    return sentencas
+
+
+def segmentar_fluxo(fluxo, tamanho_bloco=1 << 16, max_sentenca=1 << 20):
+    """Gera as sentenças de um arquivo ou stream de texto lido em blocos
+
+    Mesmo critério de `dividir_em_sentencas`, mas sem carregar o texto
+    inteiro: o pedaço depois do último separador de cada bloco fica guardado
+    e é juntado ao bloco seguinte, então sentenças que cruzam a borda saem
+    inteiras. Um trecho sem separador maior que `max_sentenca` é emitido
+    mesmo assim, para a memória não crescer com o documento.
+    """
+    if isinstance(fluxo, str):
+        with open(fluxo, encoding='utf-8') as f:
+            yield from segmentar_fluxo(f, tamanho_bloco, max_sentenca)
+        return
+
+    resto = ""
+    while True:
+        bloco = fluxo.read(tamanho_bloco)
+        if not bloco:
+            break
+        partes = SEPARADOR_SENTENCAS.split(resto + bloco)
+        # A última parte pode continuar no próximo bloco
+        resto = partes.pop()
+        if len(resto) > max_sentenca:
+            partes.append(resto)
+            resto = ""
+        for parte in partes:
+            parte = parte.strip()
+            if len(parte) > MINIMO_CARACTERES:
+                yield parte
+
+    resto = resto.strip()
+    if len(resto) > MINIMO_CARACTERES:
+        yield resto
+
+
+def dividir_trechos(texto, granularidade="paragrafo", minimo_tokens=3):
+    """Quebra o texto de um artigo em parágrafos ou sentenças"""
+    separador = FIM_SENTENCA if granularidade == "sentenca" else PARAGRAFO
+    for trecho in separador.split(texto):
+        trecho = trecho.strip()
+        if len(trecho.split()) >= minimo_tokens:
+            yield trecho
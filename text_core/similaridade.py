@@ -0,0 +1,96 @@
+from array import array
+from text_core.tardio import ModuloTardio
+from text_core.tokens import palavras
+
+np = ModuloTardio("numpy")
+sp = ModuloTardio("scipy.sparse")
+
+# Primitivas de similaridade
+#
+# `sobreposicao` é a relevância do verificador de fatos: fração das
+# palavras distintas da afirmação que aparecem na fonte. Afirmações e
+# fontes viram linhas binárias esparsas sobre o vocabulário das afirmações
+# do lote (palavras que só aparecem nas fontes não contam para a
+# sobreposição, então nem entram nas colunas) e o lote inteiro é um único
+# produto de matrizes. As palavras de cada texto vêm do cache de
+# `tokens.palavras`, então uma fonte repetida não é tokenizada de novo.
+#
+# `cosseno` e `topk_similares` trabalham com linhas TF-IDF já normalizadas
+# (norma L2), como as do detector de plágio.
+
+
+def matriz_binaria(textos, vocabulario, crescer=False):
+    """Matriz CSR textos x vocabulário com 1 onde a palavra aparece no texto
+
+    Com `crescer`, palavras novas ganham uma coluna no `vocabulario` (um
+    dicionário palavra -> coluna); sem, são ignoradas.
+    """
+    colunas, indptr = array('i'), array('q', [0])
+    for texto in textos:
+        for palavra in palavras(texto):
+            coluna = vocabulario.get(palavra)
+            if coluna is None and crescer:
+                coluna = vocabulario[palavra] = len(vocabulario)
+            if coluna is not None:
+                colunas.append(coluna)
+        indptr.append(len(colunas))
+    return sp.csr_matrix(
+        (np.ones(len(colunas), dtype=np.float32), np.frombuffer(colunas, dtype=np.int32),
+         np.frombuffer(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(vocabulario)))
+
+
+def sobreposicao(consultas, textos):
+    """Fração das palavras de cada consulta que aparecem em cada texto (consultas x textos)"""
+    vocabulario = {}
+    C = matriz_binaria(consultas, vocabulario, crescer=True)
+    if not vocabulario:
+        # Nenhuma consulta tem palavras: sobreposição 0
+        return np.zeros((len(consultas), len(textos)), dtype=np.float32)
+    S = matriz_binaria(textos, vocabulario)
+    comuns = (C @ S.T).toarray()
+    tamanhos = np.diff(C.indptr).astype(np.float32)
+    return np.divide(comuns, tamanhos[:, None], out=np.zeros_like(comuns), where=tamanhos[:, None] > 0)
+
+
+def cosseno(consultas, matriz):
+    """Cosseno entre linhas já normalizadas: matriz densa consultas x base"""
+    return (consultas @ matriz.T).toarray()
+
+
+def topk_similares(consultas, indice, top_k=5, bloco_consultas=256, bloco_base=32768):
+    """Top-k textos da base para cada linha de `consultas` (já transformadas)
+
+    A similaridade é calculada em blocos de `bloco_consultas` x `bloco_base`,
+    mantendo só os k melhores de cada linha entre um bloco e outro; a matriz
+    densa consultas x base inteira nunca é montada. `indice` só precisa de
+    `blocos_base(tamanho)`, que gera (ids, linhas). Retorna (scores, ids),
+    ambos n x k, ordenados do mais similar para o menos (id -1 = vazio).
+    """
+    n = consultas.shape[0]
+    melhores_scores = np.full((n, top_k), -1.0, dtype=np.float32)
+    melhores_ids = np.full((n, top_k), -1, dtype=np.int64)
+
+    for inicio in range(0, n, bloco_consultas):
+        fim = min(inicio + bloco_consultas, n)
+        bloco = consultas[inicio:fim]
+        scores = melhores_scores[inicio:fim]
+        ids = melhores_ids[inicio:fim]
+
+        for ids_base, linhas_base in indice.blocos_base(bloco_base):
+            parcial = cosseno(bloco, linhas_base).astype(np.float32, copy=False)
+            # Junta o top-k atual com o bloco novo e fica com os k maiores
+            todos_scores = np.hstack([scores, parcial])
+            todos_ids = np.hstack([ids, np.broadcast_to(ids_base, parcial.shape)])
+            if todos_scores.shape[1] > top_k:
+                sel = np.argpartition(-todos_scores, top_k - 1, axis=1)[:, :top_k]
+                scores = np.take_along_axis(todos_scores, sel, axis=1)
+                ids = np.take_along_axis(todos_ids, sel, axis=1)
+            else:
+                scores, ids = todos_scores, todos_ids
+
+        ordem = np.argsort(-scores, axis=1, kind='stable')
+        melhores_scores[inicio:fim] = np.take_along_axis(scores, ordem, axis=1)
+        melhores_ids[inicio:fim] = np.take_along_axis(ids, ordem, axis=1)
+
+    return melhores_scores, melhores_ids
@@ -0,0 +1,45 @@
+import importlib
+import functools
+
+# Importação tardia de dependências pesadas
+#
+# `np = ModuloTardio("numpy")` no topo do módulo não custa nada; o numpy só
+# é importado no primeiro acesso a um atributo (np.zeros, np.float32...).
+# Depois disso o acesso vai direto ao módulo real.
+
+
+class ModuloTardio:
+    """Procuração de um módulo que só é importado no primeiro uso"""
+
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return getattr(self._modulo, atributo)
+
+    def __repr__(self):
+        estado = "carregado" if self._modulo is not None else "não carregado"
+        return f"<ModuloTardio {self._nome} ({estado})>"
+
+
+def recurso_streamlit(funcao=None, **opcoes):
+    """`st.cache_resource` aplicado só na chamada
+
+    O streamlit não é importado na carga do módulo, então CLIs que reutilizam
+    as funções do app não pagam por ele. Dentro do app o efeito é o mesmo do
+    decorador: o cache do streamlit é identificado pelo código da função, e
+    não pelo objeto, então sobrevive às reexecuções do script. As `opcoes`
+    (ex.: show_spinner) vão para o `st.cache_resource`:
+    `@recurso_streamlit(show_spinner="Carregando...")`.
+    """
+    if funcao is None:
+        return functools.partial(recurso_streamlit, **opcoes)
+
+    @functools.wraps(funcao)
+    def chamar(*args, **kwargs):
+        import streamlit as st
+        return st.cache_resource(**opcoes)(funcao)(*args, **kwargs)
+    return chamar
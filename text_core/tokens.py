@@ -0,0 +1,59 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Normalização e tokenização de textos em português e inglês
+#
+# `tokenizar` (usado pelo índice BM25) deixa tudo em minúsculas, tira os
+# acentos, fica só com sequências alfanuméricas e remove palavras
+# funcionais. A normalização é feita por palavra e guardada num cache LRU:
+# o vocabulário de um corpus é pequeno perto do número de ocorrências,
+# então quase toda palavra já foi normalizada antes, e só as palavras com
+# caracteres fora do ASCII passam pelo unicodedata.
+#
+# `palavras` é a tokenização do verificador de fatos (minúsculas, separadas
+# por espaço, sem repetição), com cache por texto: as mesmas fontes e
+# afirmações aparecem em várias pontuações seguidas.
+
+ESPACOS = re.compile(r'\s+')
+TOKEN = re.compile(r"\w+")
+# Palavras funcionais (português e inglês) ficam fora do índice: num corpus
+# em inglês, um "em" ou "de" de uma consulta em português seria raro e
+# ganharia um IDF alto sem dizer nada sobre o assunto
+STOPWORDS = frozenset("""
+a ao aos as com da das de do dos e em na nas no nos o os ou para pela pelo por que se um uma
+an and are as at be by for from has have in is it its of on or that the to was were which with
+""".split())
+
+
+def normalizar(texto):
+    """Minúsculas e espaços colapsados (chave de cache de sentenças)"""
+    return ESPACOS.sub(' ', texto.strip().lower())
+
+
+@lru_cache(maxsize=1 << 16)
+def termos(palavra):
+    """Termos de uma palavra (trecho sem espaços): minúsculas, sem acentos, só alfanuméricos"""
+    palavra = palavra.lower()
+    if not palavra.isascii():
+        palavra = unicodedata.normalize("NFKD", palavra)
+        palavra = "".join(c for c in palavra if not unicodedata.combining(c))
+    return tuple(TOKEN.findall(palavra))
+
+
+def tokenizar(texto, stopwords=STOPWORDS):
+    """Minúsculas, sem acentos, só sequências alfanuméricas, sem palavras funcionais"""
+    # Espaços nunca fazem parte de um termo, então cada trecho entre espaços
+    # pode ser normalizado (e guardado no cache) separadamente
+    return [token for palavra in texto.split() for token in termos(palavra) if token not in stopwords]
+
+
+@lru_cache(maxsize=4096)
+def palavras(texto):
+    """Palavras distintas do texto (minúsculas, separadas por espaço), na ordem em que aparecem"""
+    return tuple(dict.fromkeys(texto.lower().split()))
+
+
+def estatisticas_cache():
+    """Acertos e tamanho dos caches de tokens do processo"""
+    return {'termos': termos.cache_info()._asdict(), 'palavras': palavras.cache_info()._asdict()}